@@ -6,9 +6,17 @@ from app_utils.pages.vikor_page import vikor_page
 from app_utils.pages.copras_page import copras_page
 from app_utils.pages.waspas_page import waspas_page
 from app_utils.pages.taxonomy_page import taxonomy_page
+from app_utils.pages.promethee_page import promethee_page
+from app_utils.pages.pareto_page import pareto_page
+from app_utils.pages.rank_reversal_page import rank_reversal_page
 from app_utils.pages.aggregation_page import aggregation_page
 from app_utils.pages.visualizations_pages import visualizations_page
 from app_utils.pages.forecast_page import forecast_page
+from app_utils.pages.backtest_page import backtest_page
+from app_utils.pages.bootstrap_page import bootstrap_page
+from app_utils.pages.weight_optimization_page import weight_optimization_page
+from app_utils.pages.portfolio_page import portfolio_page
+from app_utils.pages.trace_panel import start_trace_panel, show_trace_panel
 
 st.set_page_config(
     page_title="SP500 Portfolio Optimization",
@@ -19,10 +27,12 @@ st.set_page_config(
 with st.sidebar:
     tabs = st.radio(
         "Navigate", 
-        ["Main Page", "Forecast", "TOPSIS", "TAXONOMY", "ARAS", "VIKOR", "COPRAS", "WASPAS", "AGGREGATION", "VISUALIZATIONS"],
+        ["Main Page", "Forecast", "TOPSIS", "TAXONOMY", "ARAS", "VIKOR", "COPRAS", "WASPAS", "PROMETHEE", "PARETO", "RANK REVERSAL", "AGGREGATION", "VISUALIZATIONS", "PORTFOLIO", "BACKTEST", "BOOTSTRAP", "WEIGHT OPTIMIZATION"],
         index=0
     )
 
+show_trace = start_trace_panel()
+
 if tabs == "Main Page":
     main_page()
 
@@ -47,8 +57,32 @@ elif tabs == "COPRAS":
 elif tabs == "WASPAS":
     waspas_page()
 
+elif tabs == "PROMETHEE":
+    promethee_page()
+
+elif tabs == "PARETO":
+    pareto_page()
+
+elif tabs == "RANK REVERSAL":
+    rank_reversal_page()
+
 elif tabs == "AGGREGATION":
     aggregation_page()
 
 elif tabs == "VISUALIZATIONS":
-    visualizations_page()
\ No newline at end of file
+    visualizations_page()
+
+elif tabs == "PORTFOLIO":
+    portfolio_page()
+
+elif tabs == "BACKTEST":
+    backtest_page()
+
+elif tabs == "BOOTSTRAP":
+    bootstrap_page()
+
+elif tabs == "WEIGHT OPTIMIZATION":
+    weight_optimization_page()
+
+if show_trace:
+    show_trace_panel()
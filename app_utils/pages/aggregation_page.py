@@ -3,28 +3,36 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 import sys
-from src.aggregation.aggregation_methods import mean_rank_method, borda_count_method, copeland_method
-from src.aggregation.process_results import create_mcdm_ranking_wrapper
+from src.aggregation.aggregation_methods import (
+    mean_rank_method, borda_count_method, copeland_method, kemeny_method, markov_chain_method, RANK_TIE_METHODS
+)
+from src.aggregation.process_results import (
+    load_mcdm_rankings, file_paths, forecasted_file_paths, method_names, output_file, forecasted_output_file,
+    MISSING_POLICIES
+)
 
 # Adding the project root directory to sys.path
 PROJECT_ROOT = Path(__file__).resolve().parents[2]  # Assumes structure: project_root -> src/
 sys.path.append(str(PROJECT_ROOT))
 
-def display_aggregation_results(rankings_file, title):
+def display_aggregation_results(source_files, rankings_file, title, missing="error", tie_method="min"):
     try:
-        rankings_df = pd.read_csv(rankings_file)
+        rankings_df = load_mcdm_rankings(source_files, rankings_file, method_names, missing)
         st.write(f"### {title} Rankings from MCDM Methods")
         st.write(f"Below is a summary of {title} rankings from individual MCDM methods.")
         st.dataframe(rankings_df)
     except FileNotFoundError:
         st.error(f"{title} rankings file not found. Please ensure the file exists.")
         return
+    except ValueError as e:
+        st.error(f"{title} rankings could not be combined: {e} Choose the 'intersect' or 'union' policy to combine them anyway.")
+        return
 
     rankings = rankings_df.iloc[:, 2:].values
     shortnames = rankings_df.iloc[:, 1].values
     alternatives = rankings_df.iloc[:, 0].values
 
-    mean_rank_agg, mean_ranks = mean_rank_method(rankings)
+    mean_rank_agg, mean_ranks = mean_rank_method(rankings, tie_method)
     st.write(f"### {title} Mean Rank Method")
     with st.expander(f"Learn more about the {title} Mean Rank Method"):
         st.write("""
@@ -44,7 +52,7 @@ def display_aggregation_results(rankings_file, title):
     }).sort_values("Final Rank (Mean Rank)")
     st.dataframe(mean_rank_df)
 
-    borda_agg, borda_scores = borda_count_method(rankings)
+    borda_agg, borda_scores = borda_count_method(rankings, tie_method)
     st.write(f"### {title} Borda Count Method")
     with st.expander(f"Learn more about the {title} Borda Count Method"):
         st.write("""
@@ -64,7 +72,7 @@ def display_aggregation_results(rankings_file, title):
     }).sort_values("Final Rank (Borda)")
     st.dataframe(borda_df)
 
-    copeland_agg, copeland_scores = copeland_method(rankings)
+    copeland_agg, copeland_scores = copeland_method(rankings, tie_method)
     st.write(f"### {title} Copeland Method")
     with st.expander(f"Learn more about the {title} Copeland Method"):
         st.write("""
@@ -85,17 +93,63 @@ def display_aggregation_results(rankings_file, title):
     }).sort_values("Final Rank (Copeland)")
     st.dataframe(copeland_df)
 
+    kemeny_agg, kemeny_scores = kemeny_method(rankings)
+    st.write(f"### {title} Kemeny-Young Method")
+    with st.expander(f"Learn more about the {title} Kemeny-Young Method"):
+        st.write("""
+        The Kemeny-Young Method looks for the consensus ranking that agrees with the individual MCDM rankings
+        on as many pairwise comparisons as possible.
+
+        **Steps**:
+        1. For each pair of alternatives, count the number of MCDM methods in which one alternative ranks higher than the other.
+        2. Start from the Copeland order and repeatedly move single alternatives to the position that increases
+           the total number of agreements, until no move helps (small problems are solved exactly).
+        3. The Agreement Score counts the pairwise method agreements of the consensus over the pairs involving each alternative.
+        """)
+    kemeny_df = pd.DataFrame({
+        "Alternative": alternatives,
+        "Company Name": shortnames,
+        "Agreement Score": kemeny_scores,
+        "Final Rank (Kemeny)": kemeny_agg
+    }).sort_values("Final Rank (Kemeny)")
+    st.dataframe(kemeny_df)
+
+    markov_agg, markov_probabilities = markov_chain_method(rankings, tie_method=tie_method)
+    st.write(f"### {title} Markov Chain Method")
+    with st.expander(f"Learn more about the {title} Markov Chain Method"):
+        st.write("""
+        The Markov Chain Method (MC4) models a random walk over the alternatives.
+
+        **Steps**:
+        1. From the current alternative, pick another alternative at random.
+        2. Move to it if a majority of the MCDM methods rank it higher; otherwise stay.
+        3. Rank the alternatives by the long-run probability of the walk being at each of them (higher is better).
+        """)
+    markov_df = pd.DataFrame({
+        "Alternative": alternatives,
+        "Company Name": shortnames,
+        "Stationary Probability": markov_probabilities,
+        "Final Rank (Markov Chain)": markov_agg
+    }).sort_values("Final Rank (Markov Chain)")
+    st.dataframe(markov_df)
+
     st.write(f"### {title} Combined Aggregated Rankings")
     st.write(f"Below is a combined table showing {title} rankings from all aggregation methods.")
     combined_df = pd.merge(mean_rank_df, borda_df, on=["Alternative","Company Name"], how="inner")
     combined_df = pd.merge(combined_df, copeland_df, on=["Alternative","Company Name"], how="inner")
+    combined_df = pd.merge(combined_df, kemeny_df, on=["Alternative","Company Name"], how="inner")
+    combined_df = pd.merge(combined_df, markov_df, on=["Alternative","Company Name"], how="inner")
     combined_df = combined_df.rename(columns={
         "Mean Rank": "Mean Rank Score",
         "Final Rank (Mean Rank)": "Rank (Mean Rank)",
         "Borda Score": "Borda Count Score",
         "Final Rank (Borda)": "Rank (Borda)",
         "Copeland Score": "Copeland Score",
-        "Final Rank (Copeland)": "Rank (Copeland)"
+        "Final Rank (Copeland)": "Rank (Copeland)",
+        "Agreement Score": "Kemeny Agreement Score",
+        "Final Rank (Kemeny)": "Rank (Kemeny)",
+        "Stationary Probability": "Markov Chain Probability",
+        "Final Rank (Markov Chain)": "Rank (Markov Chain)"
     })
     combined_df = combined_df.sort_values("Rank (Mean Rank)")  # Sort by the first method's rank
     st.dataframe(combined_df)
@@ -109,10 +163,25 @@ def display_aggregation_results(rankings_file, title):
 def aggregation_page():
     st.title("Aggregation Methods for SP500 Rankings")
 
-    create_mcdm_ranking_wrapper()
+    missing = st.selectbox(
+        "How to handle stocks missing from some MCDM results",
+        options=list(MISSING_POLICIES),
+        index=0,
+        help="error: stop if the results files rank different stocks; "
+             "intersect: keep only stocks ranked by every method; "
+             "union: keep all stocks and give a missing stock the worst rank of that method."
+    )
 
-    rankings_file = "results/normal_mcdm_rankings.csv"
-    forecasted_rankings_file = "results/forecasted_mcdm_rankings.csv"
+    tie_method = st.selectbox(
+        "How to rank alternatives with equal aggregated scores",
+        options=list(RANK_TIE_METHODS),
+        index=0,
+        help="min: tied alternatives share the best rank of their group (1, 2, 2, 4); "
+             "dense: like min but without gaps (1, 2, 2, 3); "
+             "average: tied alternatives share the mean rank of their group (1, 2.5, 2.5, 4); "
+             "ordinal: distinct ranks, ties broken by the order of the rankings file."
+    )
 
-    display_aggregation_results(rankings_file, "Normal")
-    display_aggregation_results(forecasted_rankings_file, "Forecasted")
+    # Combined rankings are rebuilt only when one of the per-method results files changed
+    display_aggregation_results(file_paths, output_file, "Normal", missing, tie_method)
+    display_aggregation_results(forecasted_file_paths, forecasted_output_file, "Forecasted", missing, tie_method)
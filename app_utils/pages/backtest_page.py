@@ -0,0 +1,82 @@
+import streamlit as st
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # Assumes structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backtest.backtest import run_backtest, summarize_backtest
+
+def backtest_page():
+    st.title("Backtest of MCDM Portfolio Selection")
+
+    with st.expander("How does the backtest work?"):
+        st.write("""
+        The backtest walks through the price history and periodically rebuilds the portfolio.
+
+        **Steps at every rebalance date**:
+        1. Compute the stock indicators over the last lookback window, as in the data preprocessing.
+        2. Build and normalize the decision matrix and score it with all six MCDM methods.
+        3. Aggregate the rankings with the Mean Rank, Borda and Copeland methods.
+        4. Hold an equal-weighted portfolio of the top-k stocks of every method until the next rebalance date.
+
+        **Interpretation**:
+        - Each strategy's returns are compared with the S&P 500 index over the same holding periods.
+        - Company fundamentals are a single current snapshot, so earlier windows use today's fundamentals.
+        """)
+
+    stocks_file = PROJECT_ROOT / "data/raw/sp500_stocks.csv"
+    companies_file = PROJECT_ROOT / "data/raw/sp500_companies.csv"
+    index_file = PROJECT_ROOT / "data/raw/sp500_index.csv"
+    results_path = PROJECT_ROOT / "results/backtest_period_returns.csv"
+    holdings_path = PROJECT_ROOT / "results/backtest_holdings.csv"
+
+    if not stocks_file.exists():
+        st.error(f"Stock data file not found at {stocks_file}")
+        return
+
+    st.write("### Select Backtest Parameters")
+    start_date = st.date_input("Start Date", value=pd.to_datetime('2016-01-01'))
+    end_date = st.date_input("End Date", value=pd.to_datetime('2024-12-20'))
+    frequency_labels = {"Weekly": "W", "Monthly": "M", "Quarterly": "Q"}
+    frequency = st.selectbox("Rebalance frequency", options=list(frequency_labels), index=0)
+    lookback_days = st.slider("Lookback window (trading days):", min_value=20, max_value=504, value=252)
+    top_k = st.slider("Number of stocks in each portfolio (top-k):", min_value=1, max_value=50, value=10)
+
+    if st.button("Run Backtest"):
+        with st.spinner("Running backtest..."):
+            try:
+                period_returns, holdings = run_backtest(
+                    stocks_file=stocks_file,
+                    companies_file=companies_file,
+                    index_file=index_file,
+                    start_date=str(start_date),
+                    end_date=str(end_date),
+                    rebalance_frequency=frequency_labels[frequency],
+                    lookback_days=lookback_days,
+                    top_k=top_k
+                )
+            except ValueError as e:
+                st.error(str(e))
+                return
+
+            results_path.parent.mkdir(parents=True, exist_ok=True)
+            period_returns.to_csv(results_path, index=False)
+            holdings.to_csv(holdings_path, index=False)
+            st.success(f"Backtest complete! Results saved to {results_path}")
+
+    if results_path.exists():
+        period_returns = pd.read_csv(results_path, parse_dates=['Rebalance Date', 'Next Rebalance Date'])
+
+        st.markdown("---")
+        st.write("## 📈 Growth of 1 USD Invested")
+        growth = (1 + period_returns.set_index('Next Rebalance Date').drop(columns=['Rebalance Date'])).cumprod()
+        st.line_chart(growth)
+
+        st.write("## 🏆 Strategy Summary")
+        st.dataframe(summarize_backtest(period_returns))
+
+        st.write("### Returns per Holding Period")
+        st.dataframe(period_returns)
@@ -0,0 +1,84 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # Assumes structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backtest.bootstrap import bootstrap_rankings
+
+def bootstrap_page():
+    st.title("Bootstrap Rank Uncertainty of SP500 Stocks")
+
+    with st.expander("How does the bootstrap work?"):
+        st.write("""
+        The stock indicators (Volatility, Average Close Price, Return, Average Volume) are estimated from a
+        single price path, so the rankings inherit their sampling noise.
+
+        **Steps of every replicate**:
+        1. Resample the trading days of the window in blocks of consecutive days (the same days for every stock).
+        2. Recompute the indicators of all stocks from the resampled days and rebuild the decision matrix.
+        3. Rank the stocks with every MCDM method.
+
+        **Interpretation**:
+        - The confidence interval shows the ranks a stock takes in most replicates; a narrow interval means
+          the rank is robust to the noise in the price data.
+        - Company fundamentals are a single snapshot and are not resampled.
+        """)
+
+    stocks_file = PROJECT_ROOT / "data/raw/sp500_stocks.csv"
+    companies_file = PROJECT_ROOT / "data/raw/sp500_companies.csv"
+    results_path = PROJECT_ROOT / "results/bootstrap_rank_intervals.csv"
+
+    if not stocks_file.exists():
+        st.error(f"Stock data file not found at {stocks_file}")
+        return
+
+    st.write("### Select Bootstrap Parameters")
+    start_date = st.date_input("Start Date", value=pd.to_datetime('2024-01-01'))
+    end_date = st.date_input("End Date", value=pd.to_datetime('2024-12-20'))
+    n_replicates = st.slider("Number of replicates:", min_value=100, max_value=5000, value=1000, step=100)
+    block_length = st.slider("Block length (trading days):", min_value=1, max_value=60, value=10)
+    confidence = st.slider("Confidence level:", min_value=0.5, max_value=0.99, value=0.9)
+    top_k = st.slider("Top group size (top-k):", min_value=1, max_value=50, value=10)
+
+    if st.button("Run Bootstrap"):
+        with st.spinner("Resampling and ranking..."):
+            try:
+                intervals = bootstrap_rankings(
+                    stocks_file=stocks_file,
+                    companies_file=companies_file,
+                    start_date=str(start_date),
+                    end_date=str(end_date),
+                    n_replicates=n_replicates,
+                    block_length=block_length,
+                    confidence=confidence,
+                    top_k=top_k
+                )
+            except ValueError as e:
+                st.error(str(e))
+                return
+
+            results_path.parent.mkdir(parents=True, exist_ok=True)
+            intervals.to_csv(results_path, index=False)
+            st.success(f"Bootstrap complete! Results saved to {results_path}")
+
+    if results_path.exists():
+        intervals = pd.read_csv(results_path)
+        method = st.selectbox("Method", options=intervals['Method'].unique())
+        method_intervals = intervals[intervals['Method'] == method].sort_values('Rank', kind='stable')
+
+        st.markdown("---")
+        st.write(f"## Rank Confidence Intervals ({method})")
+        top = method_intervals.head(30)
+        figure = px.scatter(top, x='Symbol', y='Median Rank', hover_data=['Shortname', 'Rank'],
+                            error_y=top['CI Upper'] - top['Median Rank'],
+                            error_y_minus=top['Median Rank'] - top['CI Lower'],
+                            title="Median Bootstrap Rank of the 30 Best Ranked Stocks")
+        figure.update_yaxes(autorange="reversed")
+        st.plotly_chart(figure, use_container_width=True)
+
+        st.dataframe(method_intervals)
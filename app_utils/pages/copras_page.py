@@ -7,7 +7,9 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[2]  # Assumes structure: project_root -> src/
 sys.path.append(str(PROJECT_ROOT))
 
-from src.mcdm.copras import copras
+from src.aggregation.aggregation_methods import calculate_ranks
+from app_utils.pages.criteria_editor import schema_criteria, criteria_inputs
+from app_utils.pages.rescoring_cache import page_rescore
 
 def copras_page():
     st.title("COPRAS Analysis for SP500 Stocks")
@@ -43,49 +45,24 @@ def copras_page():
         st.write(f"### {title} Decision Matrix")
         st.dataframe(data)
 
-        # Default weights and criteria types
-        default_weights = [0.2, 0.15, 0.2, 0.1, 0.15, 0.1, 0.05, 0.05]
-        default_criteria_types = ['benefit', 'benefit', 'benefit', 'benefit', 'cost', 'benefit', 'benefit', 'benefit']
+        # Criteria with their default weights and types from the criteria schema
+        criteria = schema_criteria(data)
+        if criteria is None:
+            return
 
         with st.expander(f"Edit Criteria Weights and Types for {title}"):
             st.write("You can adjust the weights (importance) and types (benefit/cost) of each criterion below.")
+            weights, criteria_types = criteria_inputs(criteria, title, data[criteria['column']].values)
 
-            weights = []
-            st.write("#### Set Criteria Weights")
-            for i, weight in enumerate(default_weights):
-                weights.append(st.number_input(f"Criterion {i + 1} Weight", min_value=0.0, max_value=1.0, value=weight, key=f"weight_{i}_{title}"))
-
-            # Automatically normalize weights to sum to 1
-            total_weight = sum(weights)
-            if total_weight > 0:
-                weights = [w / total_weight for w in weights]  # Normalize weights
-            else:
-                st.error("Total weight cannot be zero. Please adjust the weights.")
-
-            st.write("Normalized Weights (sum = 1):")
-            st.write(weights)
-
-            st.write("#### Set Criteria Types")
-            criteria_types = []
-            for i, criterion in enumerate(default_criteria_types):
-                criteria_types.append(
-                    st.selectbox(
-                        f"Criterion {i + 1} Type",
-                        options=["benefit", "cost"],
-                        index=0 if criterion == "benefit" else 1,
-                        key=f"criterion_{i}_{title}"
-                    )
-                )
-
-        decision_matrix = data.iloc[:, 2:].values
+        decision_matrix = data[criteria['column']].values
 
         # Run COPRAS
-        rankings, utility_scores = copras(decision_matrix, weights, criteria_types)
+        rankings, utility_scores = page_rescore("COPRAS", decision_matrix, weights, criteria_types, key=title)
 
         data['Utility Score (Q)'] = utility_scores
 
-        sorted_data = data.sort_values(by='Utility Score (Q)', ascending=False)
-        sorted_data['Rank'] = range(1, len(rankings) + 1)
+        sorted_data = data.sort_values(by='Utility Score (Q)', ascending=False, kind='stable')
+        sorted_data['Rank'] = calculate_ranks(sorted_data['Utility Score (Q)'].values, reverse=True)  # Tied scores share a rank
 
         st.markdown("---")
         st.write(f"## 🏆 {title} COPRAS Results")
@@ -0,0 +1,87 @@
+import streamlit as st
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.data_preprocessing.criteria_schema import decision_matrix_criteria
+from src.mcdm.weighting import objective_weights
+
+# Weighting schemes of the weights inputs: manual (schema defaults) or objective (see src/mcdm/weighting.py)
+WEIGHTING_OPTIONS = {
+    "manual": "Manual",
+    "entropy": "Entropy",
+    "critic": "CRITIC",
+    "std": "Standard deviation",
+}
+
+
+def schema_criteria(data):
+    """
+    Looks up the criteria of a decision matrix in the criteria schema (config/criteria_schema.json).
+
+    Returns:
+    - pd.DataFrame: One row per criteria column of `data` (name, column, source, direction, weight),
+      or None after showing an error when a column is missing from the schema.
+    """
+    try:
+        return decision_matrix_criteria(data)
+    except ValueError as e:
+        st.error(str(e))
+        return None
+
+
+def criteria_inputs(criteria, title, decision_matrix=None):
+    """
+    Shows the weight and type inputs of every criterion, prefilled with the schema defaults.
+
+    With a decision matrix, the weights can also come from an objective weighting scheme (entropy,
+    CRITIC or standard deviation) computed from the matrix instead of the weight inputs.
+
+    Parameters:
+    - criteria (pd.DataFrame): Criteria from `schema_criteria`.
+    - title (str): Title of the results section, used to keep the widget keys unique.
+    - decision_matrix (numpy array, optional): Decision matrix of the criteria columns.
+
+    Returns:
+    - weights (list of float): Normalized weights (sum = 1).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    """
+    scheme = "manual"
+    if decision_matrix is not None:
+        scheme = st.radio("Weighting scheme:", options=list(WEIGHTING_OPTIONS), horizontal=True,
+                          format_func=WEIGHTING_OPTIONS.get, key=f"weighting_{title}")
+
+    weights = []
+    if scheme == "manual":
+        st.write("#### Set Criteria Weights")
+        for name, column, weight in zip(criteria['name'], criteria['column'], criteria['weight']):
+            weights.append(st.number_input(f"{name} Weight", min_value=0.0, max_value=1.0, value=float(weight),
+                                           key=f"weight_{column}_{title}"))
+
+    st.write("#### Set Criteria Types")
+    criteria_types = []
+    for name, column, direction in zip(criteria['name'], criteria['column'], criteria['direction']):
+        criteria_types.append(
+            st.selectbox(
+                f"{name} Type",
+                options=["benefit", "cost"],
+                index=0 if direction == "benefit" else 1,
+                key=f"criterion_{column}_{title}"
+            )
+        )
+
+    if scheme != "manual":
+        weights = objective_weights(decision_matrix, scheme, criteria_types).tolist()
+
+    total_weight = sum(weights)
+    if total_weight > 0:
+        weights = [w / total_weight for w in weights]  # Normalize weights
+    else:
+        st.error("Total weight cannot be zero. Please adjust the weights.")
+
+    st.write(f"{WEIGHTING_OPTIONS[scheme]} Weights (sum = 1):")
+    st.write(dict(zip(criteria['name'], weights)))
+    return weights, criteria_types
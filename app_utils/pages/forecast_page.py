@@ -9,6 +9,9 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]  # structure: project_root ->
 sys.path.append(str(PROJECT_ROOT))
 
 from src.forecasting.forecast import forecast_all_columns, transform_forecast_data
+from src.forecasting.fit_telemetry import DEFAULT_TELEMETRY_FILE, load_fit_telemetry, slowest_fits, failure_report
+from src.forecasting.forecast_paths import DEFAULT_FORECAST_STATE_FILE, forecast_rank_distribution
+from src.forecasting.order_selection import DEFAULT_ORDERS_FILE
 from src.data_preprocessing.preprocess_data import preprocess_sp500_data
 
 def get_min_max_dates(stocks_file):
@@ -45,12 +48,31 @@ def forecast_page():
     # Forecasting parameters
     st.write("### Select Forecasting Parameters")
     forecast_period = st.slider("Select number of days to forecast:", min_value=1, max_value=365, value=90)
+    mode = st.radio("Forecasting mode:", options=["independent", "joint"], horizontal=True,
+                    format_func=lambda option: {"independent": "Independent (one ARIMA model per column)",
+                                                "joint": "Joint (ARIMA for Close and Volume, spreads for "
+                                                         "Adj Close, Open, High and Low)"}[option])
+    fit_timeout = st.number_input("Time budget per ARIMA fit in seconds (0 = no limit):", min_value=0.0,
+                                  max_value=600.0, value=10.0, step=1.0)
+    fallback = st.selectbox("Fallback model for fits over budget:", options=["drift", "ses"],
+                            format_func=lambda method: {"drift": "Random walk with drift",
+                                                        "ses": "Simple exponential smoothing"}[method])
+    order_selection = st.radio("ARIMA order:", options=["fixed", "aic", "bic"], horizontal=True,
+                               format_func=lambda option: {"fixed": "Fixed (1,1,1)",
+                                                           "aic": "Automatic (AIC)",
+                                                           "bic": "Automatic (BIC)"}[option],
+                               help="Automatic orders are selected once per stock, column and criterion by a stepwise "
+                                    f"search and reused from {DEFAULT_ORDERS_FILE} on later runs.")
 
     # Generate forecast
     if st.button("Generate Forecast"):
         with st.spinner("Forecasting all columns..."):
             forecast_output_file = 'data/forecasted/forecasted_stock.csv'
-            forecast_all_columns(stocks_data, forecast_period, forecast_output_file)
+            forecast_all_columns(stocks_data, forecast_period, forecast_output_file,
+                                 telemetry_file=DEFAULT_TELEMETRY_FILE, fit_timeout=fit_timeout or None,
+                                 fallback=fallback, mode=mode, state_file=DEFAULT_FORECAST_STATE_FILE,
+                                 order_selection=None if order_selection == "fixed" else order_selection,
+                                 orders_file=DEFAULT_ORDERS_FILE if order_selection != "fixed" else None)
             transform_forecast_data(forecast_output_file, forecast_output_file)
             st.success(f"Forecast complete! Results saved to {forecast_output_file}")
 
@@ -86,3 +108,44 @@ def forecast_page():
         st.dataframe(forecasted_data)
     else:
         st.warning("Forecasted data file not found. Please generate the forecast first.")
+
+    # Show the fit telemetry of the last forecast
+    if os.path.exists(DEFAULT_TELEMETRY_FILE):
+        telemetry = load_fit_telemetry(DEFAULT_TELEMETRY_FILE)
+        with st.expander("ARIMA Fit Telemetry"):
+            fitted = telemetry[telemetry['Status'] != 'skipped']
+            st.write(f"{len(fitted)} fits in {fitted['Fit Time (s)'].sum():.1f} s: "
+                     f"{(fitted['Status'] == 'failed').sum()} failed, "
+                     f"{(fitted['Status'] == 'not_converged').sum()} did not converge, "
+                     f"{(fitted['Status'] == 'timeout').sum()} timed out (forecast by the fallback model), "
+                     f"{(telemetry['Status'] == 'skipped').sum()} skipped.")
+            n_slowest = st.number_input("Number of slowest fits to show:", min_value=1, max_value=100, value=10)
+            st.write("#### Slowest Fits")
+            st.dataframe(slowest_fits(telemetry, n=int(n_slowest)))
+            st.write("#### Failure Rate by Column")
+            st.dataframe(failure_report(telemetry, by='Column'))
+            st.write("#### Failure Rate by Symbol")
+            st.dataframe(failure_report(telemetry, by='Symbol'))
+
+    # Distribution of the forecasted rankings over simulated forecast paths
+    if os.path.exists(forecast_output_file) and os.path.exists(DEFAULT_FORECAST_STATE_FILE):
+        with st.expander("Forecast Uncertainty of the Rankings"):
+            st.write("""
+            The forecasted decision matrix uses the point forecast only. Here every forecasted series gets
+            sample paths simulated from its fitted model; the indicators and the rankings of every method are
+            recomputed for each path, giving every stock a probability of landing in the top-k.
+            """)
+            n_paths = st.slider("Number of simulated paths:", min_value=50, max_value=2000, value=200, step=50)
+            top_k = st.slider("Top group size (top-k):", min_value=1, max_value=50, value=10)
+            if st.button("Simulate Forecast Paths"):
+                with st.spinner("Simulating paths and ranking..."):
+                    # Kept in the session so that picking another method does not rerun the simulation
+                    st.session_state['forecast_rank_distribution'] = forecast_rank_distribution(
+                        forecast_output_file, DEFAULT_FORECAST_STATE_FILE, 'data/raw/sp500_companies.csv',
+                        n_paths=n_paths, top_k=top_k)
+            if 'forecast_rank_distribution' in st.session_state:
+                distribution = st.session_state['forecast_rank_distribution']
+                probability_column = [col for col in distribution.columns if col.endswith('Probability')][0]
+                method = st.selectbox("Method", options=distribution['Method'].unique())
+                method_distribution = distribution[distribution['Method'] == method]
+                st.dataframe(method_distribution.sort_values(probability_column, ascending=False, kind='stable'))
@@ -1,6 +1,7 @@
 import pandas as pd
 import streamlit as st
 from src.data_preprocessing.preprocess_data import preprocess_sp500_data
+from src.data_preprocessing.incremental_update import apply_price_delta
 
 
 def get_min_max_dates(stocks_file):
@@ -44,6 +45,13 @@ def main_page():
 
     st.write(f"Selected date range: {start_date} to {end_date}")
 
+    include_portfolio_metrics = st.checkbox(
+        "Include portfolio metrics as criteria",
+        value=False,
+        help="Adds Annualized Volatility, Sharpe Ratio, Sortino Ratio, Max Drawdown and Beta to the decision matrix. "
+             "Criteria, their directions and default weights are configured in config/criteria_schema.json."
+    )
+
     if st.button('Run Preprocessing'):
         with st.spinner('Processing data...'):
             preprocess_sp500_data(
@@ -53,7 +61,34 @@ def main_page():
                 companies_file='data/raw/sp500_companies.csv',
                 output_stocks_file='data/preprocessed/sp500_stocks_clean.csv',
                 output_indicators_file='data/preprocessed/sp500_stock_indicators.csv',
-                output_decision_matrix_file='data/preprocessed/sp500_complete_decision_matrix.csv'
+                output_decision_matrix_file='data/preprocessed/sp500_complete_decision_matrix.csv',
+                output_state_file='data/preprocessed/sp500_indicator_state.csv',
+                include_portfolio_metrics=include_portfolio_metrics,
+                index_file='data/raw/sp500_index.csv'
             )
             st.success("Data preprocessing complete!")
 
+    st.write("""
+    **Incremental Update**:  
+    When new trading days are added to the stock data, upload a CSV file containing only the new rows
+    (same columns as `sp500_stocks.csv`). The indicators and decision matrix are updated from the saved
+    per-symbol state instead of reprocessing the full history.
+    """)
+    delta_file = st.file_uploader("New stock rows (CSV)", type="csv")
+    if delta_file is not None and st.button('Apply New Rows'):
+        try:
+            with st.spinner('Updating indicators...'):
+                changed_symbols = apply_price_delta(
+                    delta_file=delta_file,
+                    state_file='data/preprocessed/sp500_indicator_state.csv',
+                    companies_file='data/raw/sp500_companies.csv',
+                    output_stocks_file='data/preprocessed/sp500_stocks_clean.csv',
+                    output_indicators_file='data/preprocessed/sp500_stock_indicators.csv',
+                    output_decision_matrix_file='data/preprocessed/sp500_complete_decision_matrix.csv'
+                )
+            st.success(f"Updated indicators of {len(changed_symbols)} stocks.")
+        except FileNotFoundError:
+            st.error("Saved indicator state not found. Please run the preprocessing first.")
+        except ValueError as e:
+            st.error(str(e))
+
@@ -0,0 +1,81 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.mcdm.pareto import pareto_fronts
+from src.mcdm.batch import rank_all_methods, aggregate_rankings
+from app_utils.pages.criteria_editor import schema_criteria, criteria_inputs
+
+def pareto_page():
+    st.title("Efficient Set (Pareto Fronts) of SP500 Stocks")
+
+    with st.expander("What is the efficient set?"):
+        st.write("""
+        A stock dominates another one when it is at least as good on every criterion (higher for benefit
+        criteria, lower for cost criteria) and strictly better on at least one. The stocks no other stock
+        dominates form the first Pareto front, the efficient set.
+
+        **Fronts**:
+        - Front 1 is the efficient set; front 2 is the efficient set of the remaining stocks, and so on.
+        - A dominated stock can never be the top choice of a method that rewards better criteria values, so
+          restricting the MCDM scoring to the first few fronts shrinks the candidate set with little loss.
+        """)
+
+    decision_matrix_paths = {
+        "Normal": PROJECT_ROOT / "data/preprocessed/sp500_complete_decision_matrix.csv",
+        "Forecasted": PROJECT_ROOT / "data/forecasted_preprocessed/sp500_forecasted_complete_decision_matrix.csv",
+    }
+    title = st.selectbox("Decision matrix", options=list(decision_matrix_paths), index=0)
+    decision_matrix_path = decision_matrix_paths[title]
+    if not decision_matrix_path.exists():
+        st.error(f"Decision matrix file not found at {decision_matrix_path}")
+        return
+
+    data = pd.read_csv(decision_matrix_path)
+    criteria = schema_criteria(data)
+    if criteria is None:
+        return
+
+    with st.expander(f"Edit Criteria Weights and Types for {title}"):
+        st.write("The types decide the direction of dominance; the weights are used to rank the efficient set.")
+        weights, criteria_types = criteria_inputs(criteria, f"pareto_{title}", data[criteria['column']].values)
+
+    decision_matrix = data[criteria['column']].values
+    data['Front'] = pareto_fronts(decision_matrix, criteria_types)
+
+    st.write("### Stocks per Front")
+    st.dataframe(data['Front'].value_counts().sort_index().rename("Stocks"))
+
+    max_front = st.slider("Number of fronts to keep:", min_value=1, max_value=int(data['Front'].max()), value=1)
+    efficient = data['Front'] <= max_front
+    st.write(f"{efficient.sum()} of {len(data)} stocks are in the first {max_front} front(s).")
+
+    # Scatter plot of two criteria coloured by front
+    x_name, y_name = st.columns(2)
+    names = criteria['name'].tolist()
+    x_criterion = x_name.selectbox("X axis", options=names, index=0)
+    y_criterion = y_name.selectbox("Y axis", options=names, index=min(1, len(names) - 1))
+    column_of = dict(zip(criteria['name'], criteria['column']))
+    figure = px.scatter(data, x=column_of[x_criterion], y=column_of[y_criterion], color=data['Front'].astype(str),
+                        hover_data=['Symbol', 'Shortname'], labels={'color': 'Front'},
+                        title=f"Pareto Fronts ({title} Data)")
+    st.plotly_chart(figure, use_container_width=True)
+
+    # Rank the efficient set with all MCDM methods and the rank aggregation methods
+    st.write(f"### Aggregated Ranks of the Efficient Set ({title} Data)")
+    ranking_matrix = rank_all_methods(decision_matrix, weights, criteria_types, max_front=max_front)
+    aggregated = aggregate_rankings(ranking_matrix)
+    efficient_set = pd.concat([data[['Symbol', 'Shortname', 'Front']], aggregated], axis=1)[efficient]
+    st.dataframe(efficient_set.sort_values("Borda", kind='stable'))
+
+    results_path = PROJECT_ROOT / f"results/{title.lower()}_efficient_set.csv"
+    if st.button(f"Download {title} efficient set"):
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        efficient_set.to_csv(results_path, index=False)
+        st.success(f"Results saved to {results_path}")
@@ -0,0 +1,110 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # Assumes structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.portfolio.optimizer import (
+    AGGREGATED_RANK_COLUMNS, select_top_k, estimate_return_statistics, mean_variance_weights,
+    risk_parity_weights, efficient_frontier
+)
+
+@st.cache_data
+def load_clean_stocks(stocks_file):
+    return pd.read_csv(stocks_file)
+
+def portfolio_page():
+    st.title("Portfolio Construction from Aggregated Rankings")
+
+    with st.expander("How are the portfolio weights computed?"):
+        st.write("""
+        The top-k stocks of an aggregation method are used as portfolio candidates. Expected returns and
+        the covariance matrix are estimated from the most recent daily returns of the cleaned price data.
+
+        **Weighting schemes**:
+        - Mean-variance: maximize the expected return minus the risk aversion times half the portfolio variance,
+          with long-only weights summing to one.
+        - Risk parity: every stock contributes the same share of the portfolio risk.
+
+        **Efficient frontier**:
+        - The mean-variance problem is solved for a sweep of risk aversions; each solution warm-starts the next one.
+        """)
+
+    stocks_file = PROJECT_ROOT / "data/preprocessed/sp500_stocks_clean.csv"
+    aggregated_files = {
+        "Normal": PROJECT_ROOT / "results/normal_aggregated_rankings.csv",
+        "Forecasted": PROJECT_ROOT / "results/forecasted_aggregated_rankings.csv",
+    }
+
+    if not stocks_file.exists():
+        st.error(f"Cleaned stock data not found at {stocks_file}. Please run the preprocessing first.")
+        return
+
+    title = st.selectbox("Rankings", options=list(aggregated_files), index=0)
+    aggregated_file = aggregated_files[title]
+    if not aggregated_file.exists():
+        st.error(f"{title} aggregated rankings file not found. Please save the aggregated results first.")
+        return
+    aggregated_df = pd.read_csv(aggregated_file)
+
+    aggregation_labels = {
+        "Mean Rank": "mean_rank_method",
+        "Borda Count": "borda_count_method",
+        "Copeland": "copeland_method",
+        "Kemeny": "kemeny_method",
+        "Markov Chain": "markov_chain_method",
+    }
+    aggregation_labels = {
+        label: method for label, method in aggregation_labels.items()
+        if AGGREGATED_RANK_COLUMNS[method] in aggregated_df.columns
+    }
+    aggregation = st.selectbox("Aggregation method", options=list(aggregation_labels), index=0)
+    k = st.slider("Number of stocks (top-k):", min_value=2, max_value=min(100, len(aggregated_df)), value=min(20, len(aggregated_df)))
+    lookback_days = st.slider("Estimation window (trading days):", min_value=20, max_value=1260, value=252)
+    scheme = st.radio("Weighting scheme", options=["Mean-variance", "Risk parity"], index=0)
+
+    candidates = select_top_k(aggregated_df, aggregation_labels[aggregation], k)
+    symbols = candidates["Alternative"].tolist()
+    try:
+        expected_returns, covariance = estimate_return_statistics(load_clean_stocks(stocks_file), symbols, lookback_days)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    if scheme == "Mean-variance":
+        risk_aversion = st.number_input("Risk aversion", min_value=0.0, max_value=1000.0, value=5.0)
+        weights, _ = mean_variance_weights(expected_returns, covariance, risk_aversion)
+    else:
+        weights, _ = risk_parity_weights(covariance)
+
+    portfolio = pd.DataFrame({
+        "Symbol": symbols,
+        "Company Name": candidates["Company Name"].values,
+        "Rank": candidates[AGGREGATED_RANK_COLUMNS[aggregation_labels[aggregation]]].values,
+        "Weight": weights,
+        "Expected Return": expected_returns,
+        "Volatility": np.sqrt(np.diag(covariance)),
+    })
+
+    st.markdown("---")
+    st.write(f"## 💼 {title} {scheme} Portfolio ({aggregation}, top {k})")
+    st.write(f"Expected return: {weights @ expected_returns:.2%}, volatility: {np.sqrt(weights @ covariance @ weights):.2%}")
+    st.dataframe(portfolio.sort_values("Weight", ascending=False))
+
+    st.write(f"## 📉 Efficient Frontier ({title}, {aggregation}, top {k})")
+    frontier, _ = efficient_frontier(expected_returns, covariance, np.logspace(-1, 3, 100))
+    fig = px.line(frontier.sort_values("Volatility"), x="Volatility", y="Expected Return",
+                  hover_data=["Risk Aversion"], markers=True,
+                  title="Long-only mean-variance efficient frontier")
+    st.plotly_chart(fig, use_container_width=True)
+
+    results_path = PROJECT_ROOT / f"results/{title.lower()}_portfolio_weights.csv"
+    if st.button(f"Download {title} portfolio weights"):
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        portfolio.to_csv(results_path, index=False)
+        st.success(f"Results saved to {results_path}")
@@ -0,0 +1,93 @@
+import streamlit as st
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.aggregation.aggregation_methods import calculate_ranks
+from app_utils.pages.criteria_editor import schema_criteria, criteria_inputs
+from app_utils.pages.rescoring_cache import page_rescore
+
+def promethee_page():
+    st.title("PROMETHEE II Analysis for SP500 Stocks")
+
+    with st.expander("What is the PROMETHEE II method?"):
+        st.write("""
+        The Preference Ranking Organization Method for Enrichment Evaluations (PROMETHEE II) is an outranking
+        multi-criteria decision-making method. Instead of measuring distances to an ideal solution, it compares
+        every pair of alternatives on every criterion.
+
+        **Steps in PROMETHEE II**:
+        1. For every pair of alternatives and every criterion, compute the difference of their values
+           (reversed for cost criteria).
+        2. Turn each difference into a preference degree between 0 and 1 with a preference function:
+           - Usual: any positive difference is a full preference.
+           - Linear: the preference grows linearly from the indifference threshold q to the preference threshold p.
+           - Gaussian: the preference grows smoothly with the difference (p acts as its standard deviation).
+        3. Weight and sum the preference degrees into how much each alternative outranks the others (positive flow)
+           and is outranked by them (negative flow).
+        4. Rank the alternatives by their net flow (positive minus negative flow).
+
+        **Interpretation**:
+        - A higher net flow (between -1 and 1) indicates a better alternative.
+        """)
+
+    # Paths to the decision matrix files
+    decision_matrix_path = PROJECT_ROOT / "data/preprocessed/sp500_complete_decision_matrix.csv"
+    forecasted_decision_matrix_path = PROJECT_ROOT / "data/forecasted_preprocessed/sp500_forecasted_complete_decision_matrix.csv"
+    results_path = PROJECT_ROOT / "results/sp500_promethee_results.csv"
+    forecasted_results_path = PROJECT_ROOT / "results/sp500_forecasted_promethee_results.csv"
+
+    # Function to display PROMETHEE results
+    def display_promethee_results(decision_matrix_path, results_path, title):
+        if not decision_matrix_path.exists():
+            st.error(f"Decision matrix file not found at {decision_matrix_path}")
+            return
+
+        data = pd.read_csv(decision_matrix_path)
+        st.write(f"### {title} Decision Matrix")
+        st.dataframe(data)
+
+        # Criteria with their default weights and types from the criteria schema
+        criteria = schema_criteria(data)
+        if criteria is None:
+            return
+
+        with st.expander(f"Edit Criteria Weights and Types for {title}"):
+            st.write("You can adjust the weights (importance) and types (benefit/cost) of each criterion below.")
+            weights, criteria_types = criteria_inputs(criteria, title, data[criteria['column']].values)
+
+        st.write("#### Set Preference Function")
+        preference_function = st.selectbox(
+            "Preference function", options=["linear", "usual", "gaussian"], key=f"preference_function_{title}",
+            help="The preference threshold p of the linear and gaussian functions is the standard deviation "
+                 "of each criterion; the indifference threshold q is 0."
+        )
+
+        decision_matrix = data[criteria['column']].values
+
+        # Run PROMETHEE II
+        rankings, net_flows = page_rescore("PROMETHEE", decision_matrix, weights, criteria_types, key=title,
+                                           preference_function=preference_function)
+
+        data['PROMETHEE Net Flow'] = net_flows
+        sorted_data = data.sort_values(by='PROMETHEE Net Flow', ascending=False, kind='stable')
+        sorted_data['Rank'] = calculate_ranks(sorted_data['PROMETHEE Net Flow'].values, reverse=True)  # Tied scores share a rank
+
+        st.markdown("---")
+        st.write(f"## 🏆 {title} PROMETHEE II Results")
+        st.dataframe(sorted_data[['Symbol', 'Shortname', 'PROMETHEE Net Flow', 'Rank']])
+
+        if st.button(f"Download {title} PROMETHEE results", key=f"download_{title}"):
+            results_path.parent.mkdir(parents=True, exist_ok=True)
+            sorted_data.to_csv(results_path, index=False)
+            st.success(f"Results saved to {results_path}")
+
+    # Display PROMETHEE results for normal data
+    display_promethee_results(decision_matrix_path, results_path, "Normal")
+
+    # Display PROMETHEE results for forecasted data
+    display_promethee_results(forecasted_decision_matrix_path, forecasted_results_path, "Forecasted")
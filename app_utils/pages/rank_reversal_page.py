@@ -0,0 +1,71 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.mcdm.rank_reversal import RANK_REVERSAL_METHODS, rank_reversal_report, summarize_rank_reversal
+from app_utils.pages.criteria_editor import schema_criteria, criteria_inputs
+
+def rank_reversal_page():
+    st.title("Rank Reversal Audit of SP500 Stocks")
+
+    with st.expander("What is rank reversal?"):
+        st.write("""
+        Most MCDM methods normalize each criterion with aggregates of all alternatives (column sums,
+        norms, means, maxima). Removing one stock changes these aggregates, which can swap the order of
+        two other stocks although neither of them changed - a rank reversal.
+
+        **Leave-one-out audit**:
+        - Every stock is removed in turn and the remaining stocks are ranked again by each method.
+        - The new ranks are compared with the original ranks of the same stocks.
+        - A robust method (for the data at hand) rarely reorders the other stocks, and never changes the first place.
+        """)
+
+    decision_matrix_paths = {
+        "Normal": PROJECT_ROOT / "data/preprocessed/sp500_complete_decision_matrix.csv",
+        "Forecasted": PROJECT_ROOT / "data/forecasted_preprocessed/sp500_forecasted_complete_decision_matrix.csv",
+    }
+    title = st.selectbox("Decision matrix", options=list(decision_matrix_paths), index=0)
+    decision_matrix_path = decision_matrix_paths[title]
+    if not decision_matrix_path.exists():
+        st.error(f"Decision matrix file not found at {decision_matrix_path}")
+        return
+
+    data = pd.read_csv(decision_matrix_path)
+    criteria = schema_criteria(data)
+    if criteria is None:
+        return
+
+    with st.expander(f"Edit Criteria Weights and Types for {title}"):
+        weights, criteria_types = criteria_inputs(criteria, f"rank_reversal_{title}", data[criteria['column']].values)
+
+    method_names = st.multiselect("Methods", options=list(RANK_REVERSAL_METHODS), default=list(RANK_REVERSAL_METHODS))
+    if not method_names:
+        st.warning("Select at least one method.")
+        return
+    top_k = st.number_input("Top group size:", min_value=1, max_value=len(data), value=min(10, len(data)))
+
+    decision_matrix = data[criteria['column']].values
+    report = rank_reversal_report(decision_matrix, weights, criteria_types, method_names=method_names,
+                                  labels=data['Symbol'], top_k=int(top_k))
+
+    st.write(f"### Rank Reversal per Method ({title} Data)")
+    st.dataframe(summarize_rank_reversal(report))
+
+    figure = px.box(report, x='Method', y='Rank Changes', points='outliers', hover_data=['Removed'],
+                    title="Stocks Changing Rank when One Stock is Removed")
+    st.plotly_chart(figure, use_container_width=True)
+
+    st.write("### Most Disruptive Removals")
+    st.dataframe(report.sort_values(['Rank Changes', 'Max Rank Shift'], ascending=False, kind='stable').head(20))
+
+    results_path = PROJECT_ROOT / f"results/{title.lower()}_rank_reversal.csv"
+    if st.button(f"Download {title} rank reversal report"):
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        report.to_csv(results_path, index=False)
+        st.success(f"Report saved to {results_path}")
@@ -0,0 +1,44 @@
+import streamlit as st
+import hashlib
+import numpy as np
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.mcdm.rescoring import init_rescoring, rescore
+
+
+def page_rescore(method_name, decision_matrix, weights, criteria_types, key, **method_kwargs):
+    """
+    Scores a decision matrix with an MCDM method, keeping the rescoring state in the session so that
+    a weight change on the page only updates the scores instead of rerunning the whole method.
+
+    The state is rebuilt when the decision matrix, the criteria types or the method arguments change.
+
+    Parameters:
+    - method_name (str): MCDM method ('ARAS', 'VIKOR', 'COPRAS', 'WASPAS', 'PROMETHEE', ...).
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (list of float): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - key (str): Key of the results section, to keep one state per section.
+    - method_kwargs: Extra arguments of the method.
+
+    Returns:
+    - The same values as the method itself.
+    """
+    decision_matrix = np.ascontiguousarray(decision_matrix, dtype=float)
+    fingerprint = (
+        hashlib.blake2b(decision_matrix.tobytes(), digest_size=16).hexdigest(),
+        decision_matrix.shape,
+        tuple(criteria_types),
+        tuple(sorted(method_kwargs.items())),
+    )
+    state_key = f"rescoring_{method_name}_{key}"
+    cached = st.session_state.get(state_key)
+    if cached is None or cached[0] != fingerprint:
+        cached = (fingerprint, init_rescoring(method_name, decision_matrix, weights, criteria_types, **method_kwargs))
+        st.session_state[state_key] = cached
+    return rescore(cached[1], weights)
@@ -0,0 +1,50 @@
+import streamlit as st
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.profiling.tracing import (TraceSession, configure_tracing, reset_trace, trace_summary, trace_to_json,
+                                   trace_to_chrome)
+
+
+def start_trace_panel():
+    """
+    Shows the tracing options in the sidebar and starts a new trace for this run of the page.
+
+    The tracing session is kept in the Streamlit session state, so the options and the recorded spans
+    only apply to this browser session, not to the other users of the server.
+
+    Returns:
+    - bool: True when the breakdown of the run should be shown (see `show_trace_panel`).
+    """
+    with st.sidebar:
+        show_trace = st.checkbox("Show performance trace", value=False, key="show_trace")
+        track_memory = st.checkbox("Track peak memory (slower)", value=False, key="trace_memory",
+                                   disabled=not show_trace)
+    if 'trace_session' not in st.session_state:
+        st.session_state['trace_session'] = TraceSession()
+    session = st.session_state['trace_session']
+    configure_tracing(enabled=show_trace, memory=show_trace and track_memory, session=session)
+    reset_trace()
+    return show_trace
+
+
+def show_trace_panel():
+    """
+    Shows the per-stage breakdown of the spans recorded during this run of the page in the sidebar,
+    with downloads of the trace as JSON and in the Chrome trace format.
+    """
+    summary = trace_summary()
+    with st.sidebar:
+        st.write("### Performance Trace")
+        if summary.empty:
+            st.info("No traced work ran on this page yet.")
+            return
+        st.dataframe(summary)
+        st.download_button("Download Trace (JSON)", data=trace_to_json(), file_name="trace.json",
+                           mime="application/json")
+        st.download_button("Download Chrome Trace", data=trace_to_chrome(), file_name="trace_chrome.json",
+                           mime="application/json")
@@ -7,7 +7,9 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[2]  # Assumes structure: project_root -> src/
 sys.path.append(str(PROJECT_ROOT))
 
-from src.mcdm.waspas import waspas
+from src.aggregation.aggregation_methods import calculate_ranks
+from app_utils.pages.criteria_editor import schema_criteria, criteria_inputs
+from app_utils.pages.rescoring_cache import page_rescore
 
 def waspas_page():
     st.title("WASPAS Analysis for SP500 Stocks")
@@ -45,53 +47,30 @@ def waspas_page():
         st.write(f"### {title} Decision Matrix")
         st.dataframe(data)
 
-        # Default weights, criteria types, and lambda
-        default_weights = [0.2, 0.15, 0.2, 0.1, 0.15, 0.1, 0.05, 0.05]
-        default_criteria_types = ['benefit', 'benefit', 'benefit', 'benefit', 'cost', 'benefit', 'benefit', 'benefit']
+        # Criteria from the criteria schema, default lambda
+        criteria = schema_criteria(data)
+        if criteria is None:
+            return
         default_lambda = 0.5
 
         with st.expander(f"Edit Criteria Weights, Types, and Lambda for {title}"):
             st.write("You can adjust the weights (importance), types (benefit/cost), and the lambda parameter below.")
-
-            weights = []
-            st.write("#### Set Criteria Weights")
-            for i, weight in enumerate(default_weights):
-                weights.append(st.number_input(f"Criterion {i + 1} Weight", min_value=0.0, max_value=1.0, value=weight, key=f"weight_{i}_{title}"))
-
-            total_weight = sum(weights)
-            if total_weight > 0:
-                weights = [w / total_weight for w in weights]  # Normalize weights
-            else:
-                st.error("Total weight cannot be zero. Please adjust the weights.")
-
-            st.write("Normalized Weights (sum = 1):")
-            st.write(weights)
-
-            st.write("#### Set Criteria Types")
-            criteria_types = []
-            for i, criterion in enumerate(default_criteria_types):
-                criteria_types.append(
-                    st.selectbox(
-                        f"Criterion {i + 1} Type",
-                        options=["benefit", "cost"],
-                        index=0 if criterion == "benefit" else 1,
-                        key=f"criterion_{i}_{title}"
-                    )
-                )
+            weights, criteria_types = criteria_inputs(criteria, title, data[criteria['column']].values)
 
             lambda_param = st.slider("Set Lambda (Weighting Coefficient)", min_value=0.0, max_value=1.0, value=default_lambda, key=f"lambda_{title}")
 
-        decision_matrix = data.iloc[:, 2:].values
+        decision_matrix = data[criteria['column']].values
 
         # Run WASPAS
-        rankings, W, Q1, Q2 = waspas(decision_matrix, weights, criteria_types, lambda_param)
+        rankings, W, Q1, Q2 = page_rescore("WASPAS", decision_matrix, weights, criteria_types, key=title,
+                                          lambda_param=lambda_param)
 
         data['WASPAS Score (W)'] = W
         data['WSM Score (Q1)'] = Q1
         data['WPM Score (Q2)'] = Q2
 
-        sorted_data = data.sort_values(by='WASPAS Score (W)', ascending=False)
-        sorted_data['Rank'] = range(1, len(rankings) + 1)
+        sorted_data = data.sort_values(by='WASPAS Score (W)', ascending=False, kind='stable')
+        sorted_data['Rank'] = calculate_ranks(sorted_data['WASPAS Score (W)'].values, reverse=True)  # Tied scores share a rank
 
         st.markdown("---")
         st.write(f"## 🏆 {title} WASPAS Results")
@@ -0,0 +1,92 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # Assumes structure: project_root -> src/
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backtest.weight_optimization import optimize_weights
+from src.mcdm.batch import MCDM_METHODS, default_criteria
+
+def weight_optimization_page():
+    st.title("Criteria Weight Optimization for SP500 Stocks")
+
+    with st.expander("How does the weight optimization work?"):
+        st.write("""
+        The criteria weights of every MCDM method are searched to maximize the backtested performance of
+        its top-k portfolio (see the BACKTEST tab).
+
+        **Steps**:
+        1. Build the decision matrix and the forward returns of every rebalance window once.
+        2. Evaluate thousands of random weight vectors (uniform over the weights summing to 1) in batches.
+        3. Refine the best weights with CMA-ES (an evolution strategy adapting its search distribution).
+
+        **Interpretation**:
+        - The target is measured on the first periods only; the last periods are held out for validation.
+          A large gain on the search periods that disappears on the validation periods is overfitting.
+        - Company fundamentals are a single current snapshot, so earlier windows use today's fundamentals.
+        """)
+
+    stocks_file = PROJECT_ROOT / "data/raw/sp500_stocks.csv"
+    companies_file = PROJECT_ROOT / "data/raw/sp500_companies.csv"
+    results_path = PROJECT_ROOT / "results/optimized_weights.csv"
+
+    if not stocks_file.exists():
+        st.error(f"Stock data file not found at {stocks_file}")
+        return
+
+    st.write("### Select Optimization Parameters")
+    start_date = st.date_input("Start Date", value=pd.to_datetime('2016-01-01'))
+    end_date = st.date_input("End Date", value=pd.to_datetime('2024-12-20'))
+    target_labels = {"Sharpe ratio": "sharpe", "Annualized return": "return"}
+    target = st.selectbox("Target", options=list(target_labels), index=0)
+    frequency_labels = {"Weekly": "W", "Monthly": "M", "Quarterly": "Q"}
+    frequency = st.selectbox("Rebalance frequency", options=list(frequency_labels), index=1)
+    lookback_days = st.slider("Lookback window (trading days):", min_value=20, max_value=504, value=252)
+    top_k = st.slider("Number of stocks in each portfolio (top-k):", min_value=1, max_value=50, value=10)
+    method_names = st.multiselect("Methods", options=list(MCDM_METHODS), default=list(MCDM_METHODS))
+    n_random = st.slider("Random weight vectors:", min_value=100, max_value=20000, value=2000, step=100)
+    n_generations = st.slider("CMA-ES generations:", min_value=0, max_value=200, value=30)
+    validation_fraction = st.slider("Held-out validation share of the periods:", min_value=0.0, max_value=0.5,
+                                    value=0.3)
+
+    if st.button("Optimize Weights"):
+        with st.spinner("Searching weights..."):
+            try:
+                results = optimize_weights(
+                    stocks_file=stocks_file,
+                    companies_file=companies_file,
+                    start_date=str(start_date),
+                    end_date=str(end_date),
+                    target=target_labels[target],
+                    method_names=method_names,
+                    rebalance_frequency=frequency_labels[frequency],
+                    lookback_days=lookback_days,
+                    top_k=top_k,
+                    n_random=n_random,
+                    n_generations=n_generations,
+                    validation_fraction=validation_fraction
+                )
+            except ValueError as e:
+                st.error(str(e))
+                return
+
+            results_path.parent.mkdir(parents=True, exist_ok=True)
+            results.to_csv(results_path, index=False)
+            st.success(f"Optimization complete! Results saved to {results_path}")
+
+    if results_path.exists():
+        results = pd.read_csv(results_path)
+
+        st.markdown("---")
+        st.write("## ⚖️ Optimized Weights")
+        weights = results.melt(id_vars='Method', value_vars=[c for c in default_criteria()[0] if c in results],
+                               var_name='Criterion', value_name='Weight')
+        st.plotly_chart(px.bar(weights, x='Method', y='Weight', color='Criterion', title="Optimized Criteria Weights"),
+                        use_container_width=True)
+
+        st.write("## 🏆 Optimized vs Default Weights")
+        st.dataframe(results)
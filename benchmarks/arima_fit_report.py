@@ -0,0 +1,41 @@
+"""
+Reports the slowest ARIMA fits and the failure rates from a fit telemetry file written by
+`forecast_all_columns(..., telemetry_file=...)`.
+
+Run from the project root:
+    python benchmarks/arima_fit_report.py --telemetry-file data/forecasted/arima_fit_telemetry.csv.gz --slowest 20
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.forecasting.fit_telemetry import DEFAULT_TELEMETRY_FILE, load_fit_telemetry, slowest_fits, failure_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--telemetry-file', default=DEFAULT_TELEMETRY_FILE)
+    parser.add_argument('--slowest', type=int, default=10)
+    parser.add_argument('--by', default='Column', choices=['Column', 'Symbol', 'Exception'])
+    args = parser.parse_args()
+
+    telemetry = load_fit_telemetry(args.telemetry_file)
+    fit_times = telemetry.loc[telemetry['Status'] != 'skipped', 'Fit Time (s)']
+    print(f"{len(fit_times)} fits, {fit_times.sum():.1f} s in total; fit time percentiles (s):")
+    print(fit_times.quantile([0.5, 0.9, 0.95, 0.99, 1.0]).to_string())
+    print(f"\nStatus counts:\n{telemetry['Status'].value_counts().to_string()}")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(f"\nSlowest {args.slowest} fits:")
+        print(slowest_fits(telemetry, n=args.slowest).drop(columns='Message').to_string(index=False))
+        print(f"\nFailure rate by {args.by}:")
+        print(failure_report(telemetry, by=args.by).head(args.slowest).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
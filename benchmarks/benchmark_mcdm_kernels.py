@@ -0,0 +1,68 @@
+"""
+Benchmark of the fused TOPSIS, VIKOR and TAXONOMY kernels against the reference MCDM methods.
+
+Run from the project root:
+    python benchmarks/benchmark_mcdm_kernels.py --rows 100000 --criteria 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.mcdm.topsis import topsis
+from src.mcdm.vikor import vikor
+from src.mcdm.taxonomy import taxonomy
+from src.mcdm.kernels import numba, topsis_scores, vikor_scores, taxonomy_scores
+
+
+def best_time(function, repeats):
+    """Returns the best wall-clock time of `repeats` calls, in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--criteria', type=int, default=20)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    decision_matrix = rng.random((args.rows, args.criteria)) + 0.01
+    weights = rng.dirichlet(np.ones(args.criteria))
+    criteria_types = ['cost' if j % 4 == 3 else 'benefit' for j in range(args.criteria)]
+
+    methods = {
+        'TOPSIS': (lambda: topsis(decision_matrix, weights, criteria_types), topsis_scores),
+        'VIKOR': (lambda: vikor(decision_matrix, weights, criteria_types), vikor_scores),
+        'TAXONOMY': (lambda: taxonomy(decision_matrix, weights, criteria_types), taxonomy_scores),
+    }
+    variants = [('fused numpy', False)]
+    if numba is not None:
+        variants.append(('fused numba', True))
+
+    print(f"{args.rows} x {args.criteria} matrix, best of {args.repeats} runs (million rows/s)")
+    for name, (reference, kernel) in methods.items():
+        reference_time = best_time(reference, args.repeats)
+        line = f"{name:<9} reference {args.rows / reference_time / 1e6:7.2f}"
+        for label, use_numba in variants:
+            kernel(decision_matrix, weights, criteria_types, use_numba=use_numba)  # compile / warm up
+            kernel_time = best_time(lambda: kernel(decision_matrix, weights, criteria_types, use_numba=use_numba),
+                                    args.repeats)
+            line += f" | {label} {args.rows / kernel_time / 1e6:7.2f} ({reference_time / kernel_time:.1f}x)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
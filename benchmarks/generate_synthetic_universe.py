@@ -0,0 +1,53 @@
+"""
+Generates a synthetic universe of stock prices, company fundamentals and index levels in the format
+of the raw S&P 500 files, for load and stress testing the preprocessing, forecasting, MCDM and
+aggregation steps.
+
+Run from the project root:
+    python benchmarks/generate_synthetic_universe.py --symbols 10000 --start 2020-01-01 --end 2024-12-20 \
+        --output-dir data/synthetic
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adding the project root directory to sys.path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.data_generation.synthetic_universe import generate_synthetic_universe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=10_000)
+    parser.add_argument('--start', default='2020-01-01')
+    parser.add_argument('--end', default='2024-12-20')
+    parser.add_argument('--output-dir', default='data/synthetic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-days', type=int, default=20)
+    parser.add_argument('--float-format', default=None, help="e.g. '%%.6g' for smaller files")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    summary = generate_synthetic_universe(
+        n_symbols=args.symbols,
+        start_date=args.start,
+        end_date=args.end,
+        stocks_file=output_dir / 'synthetic_stocks.csv',
+        companies_file=output_dir / 'synthetic_companies.csv',
+        index_file=output_dir / 'synthetic_index.csv',
+        seed=args.seed,
+        chunk_days=args.chunk_days,
+        float_format=args.float_format,
+    )
+    size = (output_dir / 'synthetic_stocks.csv').stat().st_size
+    print(f"Wrote {summary['stock_rows']} stock rows ({size / 1e9:.2f} GB) for {summary['symbols']} symbols "
+          f"and {summary['companies']} companies in {time.perf_counter() - start:.1f} s to {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
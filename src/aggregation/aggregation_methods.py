@@ -1,91 +1,345 @@
+import time
+
 import numpy as np
 
-def calculate_ranks(values, reverse=False):
+from src.profiling.tracing import traced
+
+RANK_TIE_METHODS = ("min", "dense", "average", "ordinal")
+
+
+def calculate_ranks(values, reverse=False, method="min"):
     """
-    Calculate ranks for a given array of values. Handles ties by assigning the same rank to equal values.
+    Calculate ranks for a given array of values. Handles ties according to the selected strategy.
+
+    Ranks are computed along the last axis, so a 2-D array ranks every row (e.g. every scenario
+    of a batch) independently in one vectorized call. NaN values are ranked last.
 
     Parameters:
-    - values (numpy array): Array of values to rank.
+    - values (numpy array): Array of values to rank (1-D, or 2-D with one ranking per row).
     - reverse (bool): Whether higher values should have lower ranks (for scores like Borda or Copeland).
+    - method (str): Tie strategy:
+      'min' - tied values share the lowest rank of their group (1, 2, 2, 4),
+      'dense' - like 'min' but without gaps (1, 2, 2, 3),
+      'average' - tied values share the mean rank of their group (1, 2.5, 2.5, 4),
+      'ordinal' - distinct ranks, ties broken by original position (stable).
 
     Returns:
-    - ranks (numpy array): Array of ranks (starting from 1).
+    - ranks (numpy array): Array of ranks (starting from 1), same shape as `values`.
     """
-    sorted_indices = np.argsort(values)
-    if reverse:
-        sorted_indices = sorted_indices[::-1]
+    if method not in RANK_TIE_METHODS:
+        raise ValueError(f"Unknown tie method '{method}'. Use one of {RANK_TIE_METHODS}.")
+
+    values = np.asarray(values)
+    keys = -values if reverse else values
+    n_values = values.shape[-1]
+    positions = np.broadcast_to(np.arange(n_values), values.shape)
+
+    sorted_indices = np.argsort(keys, axis=-1, kind='stable')
+    if method == "ordinal":
+        ranks = np.empty(values.shape, dtype=np.int64)
+        np.put_along_axis(ranks, sorted_indices, positions + 1, axis=-1)
+        return ranks
+
+    # Mark the first element of every group of equal values in sorted order
+    sorted_keys = np.take_along_axis(keys, sorted_indices, axis=-1)
+    group_start = np.ones(values.shape, dtype=bool)
+    group_start[..., 1:] = sorted_keys[..., 1:] != sorted_keys[..., :-1]
+
+    if method == "dense":
+        sorted_ranks = np.cumsum(group_start, axis=-1)
+    else:
+        sorted_ranks = np.maximum.accumulate(np.where(group_start, positions, 0), axis=-1) + 1
+        if method == "average":
+            group_end = np.ones(values.shape, dtype=bool)
+            group_end[..., :-1] = group_start[..., 1:]
+            last = np.where(group_end, positions, n_values - 1)
+            last = np.flip(np.minimum.accumulate(np.flip(last, axis=-1), axis=-1), axis=-1) + 1
+            sorted_ranks = (sorted_ranks + last) / 2.0
 
-    ranks = np.empty_like(sorted_indices)
-    ranks[sorted_indices] = range(1, len(values) + 1)
+    ranks = np.empty(values.shape, dtype=sorted_ranks.dtype)
+    np.put_along_axis(ranks, sorted_indices, sorted_ranks, axis=-1)
     return ranks
 
 
+def _count_worse(rankings):
+    """
+    For every alternative and method, count the alternatives with a strictly larger (worse) rank.
+
+    Returns:
+    - counts (numpy array): Matrix with the same shape as `rankings`.
+    """
+    rankings = np.asarray(rankings)
+    n_alternatives = rankings.shape[0]
+    sorted_rankings = np.sort(rankings, axis=0)
+    counts = np.empty(rankings.shape, dtype=np.int64)
+    for j in range(rankings.shape[1]):
+        counts[:, j] = n_alternatives - np.searchsorted(sorted_rankings[:, j], rankings[:, j], side='right')
+    return counts
 
-def mean_rank_method(rankings):
+
+def _count_better(rankings):
+    """
+    For every alternative and method, count the alternatives with a strictly smaller (better) rank.
+
+    Returns:
+    - counts (numpy array): Matrix with the same shape as `rankings`.
+    """
+    rankings = np.asarray(rankings)
+    sorted_rankings = np.sort(rankings, axis=0)
+    counts = np.empty(rankings.shape, dtype=np.int64)
+    for j in range(rankings.shape[1]):
+        counts[:, j] = np.searchsorted(sorted_rankings[:, j], rankings[:, j], side='left')
+    return counts
+
+
+@traced(rows_arg=0)
+def mean_rank_method(rankings, tie_method="min"):
     """
     Implements the Mean Rank Method for aggregating rankings.
 
     Parameters:
     - rankings (numpy array): Matrix of rankings, where rows represent alternatives 
       and columns represent rankings from different MCDM methods.
+    - tie_method (str): Tie strategy of the final ranks (see `calculate_ranks` and RANK_TIE_METHODS).
 
     Returns:
     - aggregated_ranking (numpy array): Final aggregated ranking based on mean ranks.
     - mean_ranks (numpy array): Mean ranks for each alternative.
     """
     mean_ranks = np.mean(rankings, axis=1)
-    aggregated_ranking = calculate_ranks(mean_ranks)  # Lower mean rank is better
+    aggregated_ranking = calculate_ranks(mean_ranks, method=tie_method)  # Lower mean rank is better
     return aggregated_ranking, mean_ranks
 
 
-def borda_count_method(rankings):
+@traced(rows_arg=0)
+def borda_count_method(rankings, tie_method="min"):
     """
     Implements the Borda Count Method for aggregating rankings.
 
     Parameters:
     - rankings (numpy array): Matrix of rankings, where rows represent alternatives 
       and columns represent rankings from different MCDM methods.
+    - tie_method (str): Tie strategy of the final ranks (see `calculate_ranks` and RANK_TIE_METHODS).
 
     Returns:
     - aggregated_ranking (numpy array): Final aggregated ranking based on Borda scores.
     - borda_scores (numpy array): Borda scores for each alternative.
     """
-    n_alternatives, n_methods = rankings.shape
-    borda_scores = np.zeros(n_alternatives)
-
-    for i in range(n_alternatives):
-        for j in range(n_alternatives):
-            if i != j:
-                # Count the number of methods where alternative i is ranked better than j
-                borda_scores[i] += np.sum(rankings[i, :] < rankings[j, :])
+    # Count, per method, how many alternatives are ranked strictly worse than each alternative.
+    # Sorting each column once replaces the O(n^2) pairwise loop with binary searches.
+    borda_scores = _count_worse(rankings).sum(axis=1).astype(float)
 
-    aggregated_ranking = calculate_ranks(borda_scores, reverse=True)  # Higher Borda score is better
+    aggregated_ranking = calculate_ranks(borda_scores, reverse=True, method=tie_method)  # Higher Borda score is better
     return aggregated_ranking, borda_scores
 
 
-def copeland_method(rankings):
+@traced(rows_arg=0)
+def copeland_method(rankings, tie_method="min"):
     """
     Implements the Copeland Method for aggregating rankings.
 
     Parameters:
     - rankings (numpy array): Matrix of rankings, where rows represent alternatives 
       and columns represent rankings from different MCDM methods.
+    - tie_method (str): Tie strategy of the final ranks (see `calculate_ranks` and RANK_TIE_METHODS).
 
     Returns:
     - aggregated_ranking (numpy array): Final aggregated ranking based on Copeland scores.
     - copeland_scores (numpy array): Copeland scores for each alternative.
     """
-    n_alternatives, n_methods = rankings.shape
-    copeland_scores = np.zeros(n_alternatives)
+    # Wins: alternatives ranked strictly worse; losses: alternatives ranked strictly better.
+    wins = _count_worse(rankings).sum(axis=1)
+    losses = _count_better(rankings).sum(axis=1)
+    copeland_scores = (wins - losses).astype(float)
 
-    for i in range(n_alternatives):
-        wins = 0
-        losses = 0
-        for j in range(n_alternatives):
-            if i != j:
-                wins += np.sum(rankings[i, :] < rankings[j, :])
-                losses += np.sum(rankings[i, :] > rankings[j, :])
-        copeland_scores[i] = wins - losses
-
-    aggregated_ranking = calculate_ranks(copeland_scores, reverse=True)  # Higher Copeland score is better
+    aggregated_ranking = calculate_ranks(copeland_scores, reverse=True, method=tie_method)  # Higher Copeland score is better
     return aggregated_ranking, copeland_scores
+
+
+def pairwise_preference_matrix(rankings):
+    """
+    Builds the pairwise preference matrix of a ranking matrix.
+
+    P[i, j] is the number of methods that rank alternative i strictly better than alternative j.
+    The matrix is built with one broadcast comparison per method (O(n^2) memory, no Python loop
+    over pairs). Batched inputs of shape (scenarios, alternatives, methods) give one matrix per scenario.
+
+    Parameters:
+    - rankings (numpy array): Matrix of rankings (alternatives x methods), or a batch of them.
+
+    Returns:
+    - preferences (numpy array): (alternatives x alternatives) counts, or (scenarios x alternatives x alternatives).
+    """
+    rankings = np.asarray(rankings)
+    n_alternatives = rankings.shape[-2]
+    preferences = np.zeros(rankings.shape[:-2] + (n_alternatives, n_alternatives), dtype=np.int32)
+    for j in range(rankings.shape[-1]):
+        column = rankings[..., j]
+        preferences += column[..., :, None] < column[..., None, :]
+    return preferences
+
+
+def _kemeny_exact(preferences):
+    """
+    Exact Kemeny order by dynamic programming over subsets of alternatives (for small n).
+
+    best[S] is the largest agreement of an order whose first positions hold exactly the set S;
+    appending x to S gains the preferences of x over every alternative not yet placed.
+    """
+    n_alternatives = preferences.shape[0]
+    n_subsets = 1 << n_alternatives
+    best = np.full(n_subsets, -1, dtype=np.int64)
+    choice = np.zeros(n_subsets, dtype=np.int64)
+    best[0] = 0
+    for subset in range(n_subsets):
+        if best[subset] < 0:
+            continue
+        for x in range(n_alternatives):
+            if subset & (1 << x):
+                continue
+            extended = subset | (1 << x)
+            remaining = [y for y in range(n_alternatives) if not extended & (1 << y)]
+            gain = best[subset] + preferences[x, remaining].sum()
+            if gain > best[extended]:
+                best[extended] = gain
+                choice[extended] = x
+
+    order = []
+    subset = n_subsets - 1
+    while subset:
+        x = choice[subset]
+        order.append(x)
+        subset &= ~(1 << x)
+    return np.array(order[::-1])
+
+
+def _kemeny_local_search(preferences, order, time_budget):
+    """
+    Improves a consensus order by best-insertion local search until no move helps or time runs out.
+
+    Moving the alternative at position p to position q changes the agreement by the sum of
+    (P[x, y] - P[y, x]) over the alternatives it jumps, which a cumulative sum gives for every q at once.
+    """
+    deadline = time.perf_counter() + time_budget
+    margin = preferences - preferences.T
+    n_alternatives = len(order)
+    order = order.copy()
+    position = np.empty(n_alternatives, dtype=np.int64)
+    position[order] = np.arange(n_alternatives)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for x in range(n_alternatives):
+            p = position[x]
+            # cumulative[k]: gain of placing x before (instead of after) the first k alternatives of the order
+            cumulative = np.empty(n_alternatives + 1)
+            cumulative[0] = 0.0
+            np.cumsum(margin[x, order], out=cumulative[1:])
+            # Moving x to q < p jumps order[q:p] upwards; moving it to q > p jumps order[p+1:q+1] downwards
+            gains = np.where(np.arange(n_alternatives) < p,
+                             cumulative[p] - cumulative[:-1],
+                             cumulative[p + 1] - cumulative[1:])
+            q = int(np.argmax(gains))
+            if gains[q] > 0:
+                if q < p:
+                    order[q + 1:p + 1] = order[q:p].copy()
+                    lo, hi = q, p + 1
+                else:
+                    order[p:q] = order[p + 1:q + 1].copy()
+                    lo, hi = p, q + 1
+                order[q] = x
+                position[order[lo:hi]] = np.arange(lo, hi)
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return order
+
+
+@traced(rows_arg=0)
+def kemeny_method(rankings, time_budget=1.0, exact_threshold=10):
+    """
+    Implements Kemeny-Young consensus ranking for aggregating rankings.
+
+    The Kemeny order maximizes the number of (method, pair) agreements with the individual rankings.
+    Up to `exact_threshold` alternatives it is found exactly; above that, the Copeland order is improved
+    with best-insertion local search within the time budget.
+
+    Parameters:
+    - rankings (numpy array): Matrix of rankings, where rows represent alternatives
+      and columns represent rankings from different MCDM methods. A batch of matrices
+      (scenarios x alternatives x methods) is aggregated scenario by scenario.
+    - time_budget (float): Seconds available for the local search (shared by all scenarios of a batch).
+    - exact_threshold (int): Largest number of alternatives solved exactly.
+
+    Returns:
+    - aggregated_ranking (numpy array): Final aggregated ranking (position in the Kemeny order, which
+      has no ties, so there is no tie strategy to choose).
+    - agreement_scores (numpy array): For each alternative, the number of pairwise method agreements
+      of the consensus order over the pairs it belongs to.
+    """
+    rankings = np.asarray(rankings)
+    if rankings.ndim == 3:
+        results = [kemeny_method(batch, time_budget / len(rankings), exact_threshold) for batch in rankings]
+        return np.array([r[0] for r in results]), np.array([r[1] for r in results])
+
+    preferences = pairwise_preference_matrix(rankings)
+    n_alternatives = preferences.shape[0]
+    if n_alternatives <= exact_threshold:
+        order = _kemeny_exact(preferences)
+    else:
+        copeland_scores = (preferences - preferences.T).sum(axis=1)
+        order = np.argsort(-copeland_scores, kind='stable')
+        order = _kemeny_local_search(preferences, order, time_budget)
+
+    aggregated_ranking = np.empty(n_alternatives, dtype=np.int64)
+    aggregated_ranking[order] = np.arange(1, n_alternatives + 1)
+    ahead = aggregated_ranking[:, None] < aggregated_ranking[None, :]
+    agreement_scores = (np.where(ahead, preferences, 0).sum(axis=1)
+                        + np.where(ahead.T, preferences.T, 0).sum(axis=1)).astype(float)
+    return aggregated_ranking, agreement_scores
+
+
+@traced(rows_arg=0)
+def markov_chain_method(rankings, damping=0.15, tol=1e-12, max_iter=1000, tie_method="min"):
+    """
+    Implements the MC4 Markov-chain method for aggregating rankings.
+
+    From the current alternative i, a random walk picks an alternative j uniformly and moves to it
+    if a strict majority of the methods rank j better than i; otherwise it stays. Alternatives are ranked
+    by the stationary probability of the walk (with a small uniform teleport so it is always unique).
+    Power iteration only needs the boolean majority matrix: the transition matrix is never built.
+
+    Parameters:
+    - rankings (numpy array): Matrix of rankings, where rows represent alternatives
+      and columns represent rankings from different MCDM methods, or a batch of them
+      (scenarios x alternatives x methods), aggregated in one vectorized power iteration.
+    - damping (float): Teleport probability.
+    - tol (float): Convergence tolerance on the L1 change of the distribution.
+    - max_iter (int): Maximum number of power iterations.
+    - tie_method (str): Tie strategy of the final ranks (see `calculate_ranks` and RANK_TIE_METHODS).
+
+    Returns:
+    - aggregated_ranking (numpy array): Final aggregated ranking based on stationary probabilities.
+    - stationary_probabilities (numpy array): Stationary probability of each alternative (higher is better).
+    """
+    rankings = np.asarray(rankings)
+    n_methods = rankings.shape[-1]
+    n_alternatives = rankings.shape[-2]
+    preferences = pairwise_preference_matrix(rankings)
+
+    # beats[j, i]: a strict majority ranks j better than i (the walk moves from i to j)
+    beats = (2 * preferences > n_methods).astype(float)
+    leave_probability = beats.sum(axis=-2) / n_alternatives  # probability of leaving i
+
+    distribution = np.full(rankings.shape[:-1], 1.0 / n_alternatives)
+    for _ in range(max_iter):
+        arrivals = np.matmul(beats, distribution[..., None])[..., 0] / n_alternatives
+        updated = distribution * (1.0 - leave_probability) + arrivals
+        updated = (1.0 - damping) * updated + damping / n_alternatives
+        converged = np.max(np.abs(updated - distribution).sum(axis=-1)) < tol
+        distribution = updated
+        if converged:
+            break
+
+    aggregated_ranking = calculate_ranks(distribution, reverse=True, method=tie_method)  # Higher probability is better
+    return aggregated_ranking, distribution
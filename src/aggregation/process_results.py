@@ -1,12 +1,126 @@
+import hashlib
+import os
 import pandas as pd
 import numpy as np
 
-def process_csv_files(file_paths):
+# In-memory caches kept alive across Streamlit reruns (the module is imported once per process).
+# _source_cache: file path -> {'signature', 'hash', 'frame'} for every per-method results file read so far.
+# _rankings_cache: output file path -> {'file_paths', 'method_names', 'signatures', 'rankings_df'}.
+_source_cache = {}
+_rankings_cache = {}
+
+
+def _file_signature(file_path):
+    """Return a cheap change signature (modification time in ns, size in bytes) for a file."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_hash(file_path):
+    """Return the MD5 hex digest of a file's contents."""
+    digest = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_ranking_file(file_path):
+    """
+    Reads the Symbol, Shortname and Rank columns of a per-method results file,
+    reusing the cached frame when the file has not changed since the last read.
+
+    A changed modification time alone does not trigger a re-parse: the content hash
+    is compared first, so touching a file without editing it stays cheap.
+
+    Returns:
+    - frame (pd.DataFrame): Columns Symbol, Shortname, Rank.
+    - changed (bool): Whether the file content differs from the cached version.
+    """
+    signature = _file_signature(file_path)
+    cached = _source_cache.get(file_path)
+    if cached is not None and cached['signature'] == signature:
+        return cached['frame'], False
+
+    file_hash = _file_hash(file_path)
+    if cached is not None and cached['hash'] == file_hash:
+        cached['signature'] = signature
+        return cached['frame'], False
+
+    frame = pd.read_csv(file_path, usecols=['Symbol', 'Shortname', 'Rank'])
+    _source_cache[file_path] = {'signature': signature, 'hash': file_hash, 'frame': frame}
+    return frame, True
+
+
+MISSING_POLICIES = ("error", "intersect", "union")
+
+
+def _align_rankings(frames, missing="error"):
+    """
+    Aligns the Rank columns of several results frames on Symbol in a single pass.
+
+    All symbols are factorized at once through a hash table (order of first appearance), and each
+    method's ranks are scattered into the ranking matrix with NumPy fancy indexing, so the cost is
+    linear in the total number of rows and no per-file sorting is needed.
+
+    Parameters:
+    - frames (list of pd.DataFrame): Frames with Symbol, Shortname and Rank columns.
+    - missing (str): Policy for alternatives that are absent from some of the frames:
+      'error' raises a ValueError, 'intersect' keeps only alternatives ranked by every method,
+      'union' keeps all alternatives and gives a missing one the worst rank of that method
+      (number of alternatives the method ranked + 1).
+
+    Returns:
+    - ranking_matrix (numpy array): Matrix where rows are alternatives and columns are methods.
+    - alternatives (list): List of stock symbols (alternatives).
+    - shortnames (list): List of company shortnames.
+    """
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing-alternatives policy '{missing}'. Use one of {MISSING_POLICIES}.")
+
+    lengths = [len(df) for df in frames]
+    all_symbols = np.concatenate([df['Symbol'].values for df in frames])
+    all_shortnames = np.concatenate([df['Shortname'].values for df in frames])
+    codes, uniques = pd.factorize(all_symbols)
+    n_alternatives, n_methods = len(uniques), len(frames)
+
+    # Factorize assigns codes in order of first appearance, so the first occurrence of each code
+    # carries the shortname for that symbol.
+    first_occurrence = ~pd.Series(codes).duplicated().values
+    shortnames = all_shortnames[first_occurrence]
+
+    ranking_matrix = np.zeros((n_alternatives, n_methods), dtype=np.int64)
+    present = np.zeros((n_alternatives, n_methods), dtype=bool)
+    offsets = np.cumsum([0] + lengths)
+    for j, df in enumerate(frames):
+        positions = codes[offsets[j]:offsets[j + 1]]
+        if np.any(np.bincount(positions, minlength=n_alternatives) > 1):
+            raise ValueError(f"Duplicate symbols found in the results of method {j + 1}.")
+        ranking_matrix[positions, j] = df['Rank'].values
+        present[positions, j] = True
+
+    complete = present.all(axis=1)
+    if not complete.all():
+        if missing == "error":
+            raise ValueError("Mismatch in alternatives between files. Ensure all files have the same rows.")
+        if missing == "intersect":
+            ranking_matrix = ranking_matrix[complete]
+            uniques = uniques[complete]
+            shortnames = shortnames[complete]
+        else:
+            worst_ranks = np.asarray(lengths) + 1
+            ranking_matrix = np.where(present, ranking_matrix, worst_ranks)
+
+    return ranking_matrix, list(uniques), list(shortnames)
+
+
+def process_csv_files(file_paths, missing="error"):
     """
     Reads multiple CSV files containing rankings and creates a ranking matrix.
 
     Parameters:
     - file_paths (list of str): List of file paths to the CSV files.
+    - missing (str): Policy for alternatives missing from some files ('error', 'intersect' or 'union').
 
     Returns:
     - ranking_matrix (numpy array): Matrix where rows are alternatives (stocks)
@@ -14,45 +128,116 @@ def process_csv_files(file_paths):
     - alternatives (list): List of stock symbols (alternatives).
     - shortnames (list): List of company shortnames (names corresponding to symbols).
     """
-    rankings = []
-    alternatives = None
-    shortnames = None
+    frames = [pd.read_csv(file_path, usecols=['Symbol', 'Shortname', 'Rank']) for file_path in file_paths]
+    return _align_rankings(frames, missing)
 
-    for file_path in file_paths:
-        df = pd.read_csv(file_path)
 
-        df = df.sort_values('Symbol')
+def _rankings_dataframe(ranking_matrix, alternatives, shortnames, method_names):
+    rankings_df = pd.DataFrame(ranking_matrix, columns=method_names)
+    rankings_df.insert(0, "Shortname", shortnames)
+    rankings_df.insert(0, "Symbol", alternatives)
+    return rankings_df
 
-        if alternatives is None:
-            alternatives = df['Symbol'].tolist()
-            shortnames = df['Shortname'].tolist()
-        elif alternatives != df['Symbol'].tolist():
-            raise ValueError("Mismatch in alternatives between files. Ensure all files have the same rows.")
 
-        rankings.append(df['Rank'].values)
+def policy_output_file(output_file, missing="error"):
+    """
+    Returns the combined rankings file of a missing-alternatives policy: `output_file` itself for the
+    default 'error' policy, and e.g. 'normal_mcdm_rankings_union.csv' for the others, so rankings
+    aligned under different policies never overwrite (or get mistaken for) each other.
+    """
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing-alternatives policy '{missing}'. Use one of {MISSING_POLICIES}.")
+    if missing == "error":
+        return output_file
+    root, extension = os.path.splitext(output_file)
+    return f"{root}_{missing}{extension}"
 
-    # Combine rankings into a matrix (rows = alternatives, cols = methods)
-    ranking_matrix = np.array(rankings).T
-    return ranking_matrix, alternatives, shortnames
 
-def create_mcdm_rankings_file(file_paths, output_file, method_names):
+def create_mcdm_rankings_file(file_paths, output_file, method_names, missing="error"):
     """
     Creates a combined rankings CSV file from multiple MCDM results.
 
     Parameters:
     - file_paths (list of str): List of file paths to the CSV files.
-    - output_file (str): Path to save the combined rankings file.
+    - output_file (str): Path to save the combined rankings file (of the 'error' policy; the other
+      policies save to `policy_output_file`).
     - method_names (list of str): Names of the MCDM methods corresponding to the file paths.
+    - missing (str): Policy for alternatives missing from some files ('error', 'intersect' or 'union').
     """
-    ranking_matrix, alternatives, shortnames = process_csv_files(file_paths)
+    output_file = policy_output_file(output_file, missing)
+    ranking_matrix, alternatives, shortnames = process_csv_files(file_paths, missing)
 
-    rankings_df = pd.DataFrame(ranking_matrix, columns=method_names)
-    rankings_df.insert(0, "Shortname", shortnames)
-    rankings_df.insert(0, "Symbol", alternatives)
+    rankings_df = _rankings_dataframe(ranking_matrix, alternatives, shortnames, method_names)
+
+    rankings_df.to_csv(output_file, index=False)
+    print(f"Combined rankings saved to {output_file}")
+
+
+def load_mcdm_rankings(file_paths, output_file, method_names, missing="error"):
+    """
+    Returns the combined rankings DataFrame, rebuilding it only when a source file changed.
+
+    The combined matrix is kept in memory between calls. On each call the modification time
+    and size of every source file are checked; only files whose signature changed are hashed,
+    and only files whose content hash changed are re-parsed. The output CSV is rewritten only
+    when the combined matrix was actually rebuilt. On a cold start, an output file that is newer
+    than all of its sources is loaded as-is instead of being rebuilt. Every policy has its own output
+    file (see `policy_output_file`), so that file was always aligned under the requested policy.
+
+    Parameters:
+    - file_paths (list of str): List of file paths to the per-method results CSV files.
+    - output_file (str): Path of the combined rankings file of the 'error' policy.
+    - method_names (list of str): Names of the MCDM methods corresponding to the file paths.
+    - missing (str): Policy for alternatives missing from some files ('error', 'intersect' or 'union').
+
+    Returns:
+    - rankings_df (pd.DataFrame): Columns Symbol, Shortname and one rank column per method.
+    """
+    output_file = policy_output_file(output_file, missing)
+    signatures = [_file_signature(file_path) for file_path in file_paths]
+    cached = _rankings_cache.get(output_file)
+    if (cached is not None and cached['file_paths'] == list(file_paths)
+            and cached['method_names'] == list(method_names)
+            and cached['signatures'] == signatures and os.path.exists(output_file)):
+        return cached['rankings_df']
 
+    if cached is None and os.path.exists(output_file):
+        output_mtime = _file_signature(output_file)[0]
+        if all(signature[0] <= output_mtime for signature in signatures):
+            rankings_df = pd.read_csv(output_file)
+            if rankings_df.columns.tolist() == ["Symbol", "Shortname"] + list(method_names):
+                _rankings_cache[output_file] = {
+                    'file_paths': list(file_paths),
+                    'method_names': list(method_names),
+                    'signatures': signatures,
+                    'rankings_df': rankings_df,
+                }
+                return rankings_df
+
+    frames = []
+    any_changed = cached is None or cached['file_paths'] != list(file_paths) or cached['method_names'] != list(method_names)
+    for file_path in file_paths:
+        frame, changed = _read_ranking_file(file_path)
+        frames.append(frame)
+        any_changed = any_changed or changed
+
+    if not any_changed and os.path.exists(output_file):
+        cached['signatures'] = signatures
+        return cached['rankings_df']
+
+    ranking_matrix, alternatives, shortnames = _align_rankings(frames, missing)
+    rankings_df = _rankings_dataframe(ranking_matrix, alternatives, shortnames, method_names)
     rankings_df.to_csv(output_file, index=False)
     print(f"Combined rankings saved to {output_file}")
 
+    _rankings_cache[output_file] = {
+        'file_paths': list(file_paths),
+        'method_names': list(method_names),
+        'signatures': signatures,
+        'rankings_df': rankings_df,
+    }
+    return rankings_df
+
 file_paths = [
     "results/sp500_topsis_results.csv",
     "results/sp500_aras_results.csv",
@@ -78,3 +263,11 @@ forecasted_output_file = "results/forecasted_mcdm_rankings.csv"
 def create_mcdm_ranking_wrapper():
     create_mcdm_rankings_file(file_paths, output_file, method_names)
     create_mcdm_rankings_file(forecasted_file_paths, forecasted_output_file, method_names)
+
+def load_mcdm_rankings_wrapper(missing="error"):
+    """
+    Returns the (normal, forecasted) combined rankings DataFrames, rebuilding them only when needed.
+    """
+    normal_rankings = load_mcdm_rankings(file_paths, output_file, method_names, missing)
+    forecasted_rankings = load_mcdm_rankings(forecasted_file_paths, forecasted_output_file, method_names, missing)
+    return normal_rankings, forecasted_rankings
@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.preprocess_data import INDICATOR_COLUMNS, normalize_column, build_decision_matrix
+from src.data_preprocessing.price_panel import load_price_panel, load_index_levels
+from src.mcdm.workspace import Workspace
+from src.mcdm.batch import (
+    MCDM_METHODS, BACKTEST_AGGREGATION_METHODS, default_criteria,
+    rank_all_methods, aggregate_rankings
+)
+
+
+def build_indicator_state(panel):
+    """
+    Builds the incremental indicator state of a price panel.
+
+    The state holds prefix sums over dates of every quantity averaged by `preprocess_sp500_data`
+    (High - Low spread, Adj Close, Volume and the number of valid rows), plus, for every date,
+    the index of the next and of the last valid row of each symbol. Indicators of any
+    [start, end] window are then obtained in O(symbols) from differences of prefix sums, so
+    consecutive rebalance windows never re-read or re-aggregate the raw rows.
+
+    Parameters:
+    - panel (dict): Dense price panel from `load_price_panel`.
+
+    Returns:
+    - state (dict): Prefix sums ('count', 'spread', 'adj_close', 'volume'), each of shape
+      (dates + 1) x symbols, and the 'next_valid' / 'last_valid' index arrays (dates x symbols).
+    """
+    valid = panel['valid']
+    n_dates = valid.shape[0]
+
+    def prefix_sum(values):
+        cumulative = np.zeros((n_dates + 1, values.shape[1]))
+        np.cumsum(np.where(valid, values, 0.0), axis=0, out=cumulative[1:])
+        return cumulative
+
+    date_index = np.arange(n_dates)[:, None]
+    next_valid = np.where(valid, date_index, n_dates)
+    next_valid = np.minimum.accumulate(next_valid[::-1], axis=0)[::-1]
+    last_valid = np.maximum.accumulate(np.where(valid, date_index, -1), axis=0)
+
+    return {
+        'count': prefix_sum(valid.astype(float)),
+        'spread': prefix_sum(panel['High'] - panel['Low']),
+        'adj_close': prefix_sum(panel['Adj Close']),
+        'volume': prefix_sum(panel['Volume']),
+        'next_valid': next_valid,
+        'last_valid': last_valid,
+    }
+
+
+def window_indicators(panel, state, start_idx, end_idx):
+    """
+    Computes the raw stock indicators of the window of dates [start_idx, end_idx] (inclusive).
+
+    The values equal those of `calculate_stock_indicators` applied to the same rows.
+
+    Returns:
+    - pd.DataFrame: Indexed by Symbol with the INDICATOR_COLUMNS, only symbols with data in the window.
+    """
+    count = state['count'][end_idx + 1] - state['count'][start_idx]
+    present = count > 0
+    count = count[present]
+
+    def window_mean(key):
+        return (state[key][end_idx + 1, present] - state[key][start_idx, present]) / count
+
+    columns = np.flatnonzero(present)
+    first_close = panel['Close'][state['next_valid'][start_idx, present], columns]
+    last_close = panel['Close'][state['last_valid'][end_idx, present], columns]
+
+    return pd.DataFrame({
+        'Volatility': window_mean('spread'),
+        'Average Close Price': window_mean('adj_close'),
+        'Return': (last_close - first_close) / first_close,
+        'Average Volume': window_mean('volume'),
+    }, index=pd.Index(panel['symbols'][present], name='Symbol'))[INDICATOR_COLUMNS]
+
+
+def window_decision_matrix(panel, state, companies, start_idx, end_idx, criteria_columns=None):
+    """
+    Builds the normalized decision matrix of a window, following `preprocess_sp500_data`.
+
+    Parameters:
+    - criteria_columns (list of str, optional): Company and indicator columns of the decision matrix
+      (default: DECISION_MATRIX_COLUMNS).
+
+    Returns:
+    - pd.DataFrame: Decision matrix with Symbol, Shortname and the normalized criteria columns.
+    """
+    stock_indicators = window_indicators(panel, state, start_idx, end_idx)
+    for col in INDICATOR_COLUMNS:
+        stock_indicators[col] = normalize_column(stock_indicators[col])
+    return build_decision_matrix(companies, stock_indicators, criteria_columns)
+
+
+def rebalance_indices(dates, start_date, end_date, rebalance_frequency):
+    """
+    Returns the indices of the last trading date of every period between start_date and end_date.
+
+    Parameters:
+    - dates (pd.DatetimeIndex): Sorted trading dates of the panel.
+    - rebalance_frequency (str): Pandas period alias, e.g. 'W' (weekly), 'M' (monthly), 'Q' (quarterly).
+    """
+    in_range = np.flatnonzero((dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date)))
+    periods = dates[in_range].to_period(rebalance_frequency)
+    is_last_of_period = np.append(periods[1:] != periods[:-1], True)
+    return in_range[is_last_of_period]
+
+
+def run_backtest(stocks_file, companies_file, index_file, start_date, end_date, rebalance_frequency='W',
+                 lookback_days=252, top_k=10, weights=None, criteria_types=None, stocks=None,
+                 criteria_columns=None):
+    """
+    Runs a rolling-window backtest of top-k portfolios selected by the MCDM methods and aggregators.
+
+    At every rebalance date the decision matrix is rebuilt from the last `lookback_days` trading days,
+    scored with every MCDM method and aggregated with the Mean Rank, Borda and Copeland methods
+    (BACKTEST_AGGREGATION_METHODS). Each strategy holds an equal-weighted portfolio of its top_k stocks
+    until the next rebalance date; its forward return is compared with the S&P 500 index over the same
+    holding period.
+
+    Note that the company fundamentals (Revenuegrowth, Ebitda, Marketcap, Weight) are a single
+    snapshot, so every window uses today's fundamentals.
+
+    Parameters:
+    - stocks_file (str): Path to the raw SP500 stock data CSV file.
+    - companies_file (str): Path to the SP500 companies data CSV file.
+    - index_file (str): Path to the S&P 500 index CSV file.
+    - start_date (str): First date on which the portfolio may be rebalanced (format: 'YYYY-MM-DD').
+    - end_date (str): Last date of the backtest (format: 'YYYY-MM-DD').
+    - rebalance_frequency (str): Pandas period alias, e.g. 'W', 'M' or 'Q'.
+    - lookback_days (int): Number of trading days in each indicator window.
+    - top_k (int): Number of stocks held by each strategy.
+    - weights (list of float): Criteria weights (default: the criteria schema weights).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - stocks (pd.DataFrame): Already loaded stock data, used instead of reading `stocks_file`.
+    - criteria_columns (list of str): Company and indicator columns of the decision matrix
+      (default: the company and indicator criteria of the criteria schema).
+
+    Returns:
+    - period_returns (pd.DataFrame): One row per holding period with the return of every strategy and the benchmark.
+    - holdings (pd.DataFrame): Symbols held by every strategy in every holding period.
+    """
+    default_columns, default_weights, default_types = default_criteria()
+    if criteria_columns is None:
+        criteria_columns = default_columns
+    if weights is None:
+        weights = default_weights
+    if criteria_types is None:
+        criteria_types = default_types
+    weights = np.asarray(weights, dtype=float)
+    if not len(criteria_columns) == len(weights) == len(criteria_types):
+        raise ValueError("criteria_columns, weights and criteria_types must have the same length.")
+
+    # Step 1: Load the price history once and build the incremental indicator state
+    panel = load_price_panel(stocks_file, stocks)
+    state = build_indicator_state(panel)
+    companies = pd.read_csv(companies_file)
+    benchmark = load_index_levels(index_file, panel['dates'])
+    dates = panel['dates']
+
+    # Step 2: Pick the rebalance dates with a full lookback window behind them
+    rebalances = rebalance_indices(dates, start_date, end_date, rebalance_frequency)
+    rebalances = rebalances[rebalances >= lookback_days - 1]
+    if len(rebalances) < 2:
+        raise ValueError("Not enough rebalance dates in the selected range. Extend the range or shorten the lookback.")
+
+    symbol_position = pd.Index(panel['symbols'])
+    adj_close = panel['Adj Close']
+    strategy_names = list(MCDM_METHODS) + BACKTEST_AGGREGATION_METHODS
+    workspace = Workspace(np.float64)  # scratch buffers shared by all windows
+
+    period_rows = []
+    holding_rows = []
+    for current, following in zip(rebalances[:-1], rebalances[1:]):
+        # Step 3: Rebuild the decision matrix of the window and rank the stocks
+        decision_matrix = window_decision_matrix(panel, state, companies, current - lookback_days + 1, current,
+                                                 criteria_columns)
+        ranking_matrix = rank_all_methods(decision_matrix.iloc[:, 2:].values, weights, criteria_types,
+                                          workspace=workspace)
+        final_ranks = pd.concat([
+            pd.DataFrame(ranking_matrix, columns=list(MCDM_METHODS)),
+            aggregate_rankings(ranking_matrix, BACKTEST_AGGREGATION_METHODS),
+        ], axis=1)
+
+        # Step 4: Forward return of every stock until the next rebalance date
+        columns = symbol_position.get_indexer(decision_matrix['Symbol'])
+        entry = adj_close[state['last_valid'][current, columns], columns]
+        exit_ = adj_close[state['last_valid'][following, columns], columns]
+        forward_returns = exit_ / entry - 1
+
+        row = {'Rebalance Date': dates[current], 'Next Rebalance Date': dates[following]}
+        for name in strategy_names:
+            top = np.argsort(final_ranks[name].values, kind='stable')[:top_k]
+            row[name] = np.nanmean(forward_returns[top])
+            holding_rows.append({
+                'Rebalance Date': dates[current],
+                'Strategy': name,
+                'Holdings': ';'.join(decision_matrix['Symbol'].values[top]),
+            })
+        row['S&P500'] = benchmark[following] / benchmark[current] - 1
+        period_rows.append(row)
+
+    return pd.DataFrame(period_rows), pd.DataFrame(holding_rows)
+
+
+def summarize_backtest(period_returns):
+    """
+    Summarizes the per-period returns of a backtest.
+
+    Returns:
+    - pd.DataFrame: One row per strategy (and the benchmark) with total and annualized return,
+      annualized volatility, Sharpe ratio (zero risk-free rate) and the share of periods beating the benchmark.
+    """
+    returns = period_returns.drop(columns=['Rebalance Date', 'Next Rebalance Date'])
+    holding_days = (period_returns['Next Rebalance Date'] - period_returns['Rebalance Date']).dt.days.mean()
+    periods_per_year = 365.25 / holding_days
+
+    growth = (1 + returns).prod()
+    years = len(returns) / periods_per_year
+    volatility = returns.std() * np.sqrt(periods_per_year)
+    annualized_return = growth ** (1 / years) - 1
+    return pd.DataFrame({
+        'Total Return': growth - 1,
+        'Annualized Return': annualized_return,
+        'Annualized Volatility': volatility,
+        'Sharpe Ratio': annualized_return / volatility,
+        'Beat Benchmark (%)': returns.gt(returns['S&P500'], axis=0).mean() * 100,
+    })
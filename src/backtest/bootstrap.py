@@ -0,0 +1,376 @@
+import os
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.preprocess_data import INDICATOR_COLUMNS, FUNDAMENTAL_COLUMNS
+from src.data_preprocessing.price_panel import load_price_panel
+from src.mcdm.workspace import Workspace
+from src.mcdm.batch import MCDM_METHODS, default_criteria, rank_all_methods
+from src.profiling.tracing import traced
+
+# Daily quantities whose block sums give the resampled indicators
+BOOTSTRAP_QUANTITIES = ['count', 'spread', 'adj_close', 'volume', 'log_return']
+
+
+def daily_quantities(panel, start_idx, end_idx):
+    """
+    Computes the daily quantities behind the stock indicators over the window [start_idx, end_idx].
+
+    The indicators of `preprocess_sp500_data` are all sums of daily quantities: the valid-row count, the
+    High - Low spread, Adj Close and Volume (averaged over the valid rows), and the daily log return of
+    Close (summed into the window return). Missing rows contribute zero; the log return of a row links it
+    to the previous valid Close of the window, so the returns of a window sum to log(last / first Close).
+
+    Returns:
+    - dict: One (dates x symbols) array per quantity of BOOTSTRAP_QUANTITIES.
+    """
+    window = slice(start_idx, end_idx + 1)
+    valid = panel['valid'][window]
+    close = panel['Close'][window]
+    previous_close = pd.DataFrame(close).ffill().shift(1).values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_return = np.log(close / previous_close)
+    return {
+        'count': valid.astype(float),
+        'spread': np.where(valid, panel['High'][window] - panel['Low'][window], 0.0),
+        'adj_close': np.where(valid, panel['Adj Close'][window], 0.0),
+        'volume': np.where(valid, panel['Volume'][window], 0.0),
+        'log_return': np.where(np.isfinite(log_return), log_return, 0.0),
+    }
+
+
+def indicators_from_sums(sums):
+    """
+    Derives the raw indicators from the window sums of the daily quantities.
+
+    Parameters:
+    - sums (dict): Window sums of every quantity of BOOTSTRAP_QUANTITIES, arrays of any (matching) shape.
+
+    Returns:
+    - numpy array: Indicators in INDICATOR_COLUMNS order along a new last axis (NaN without valid rows).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        count = np.where(sums['count'] > 0, sums['count'], np.nan)
+        return np.stack([
+            sums['spread'] / count,  # Volatility
+            sums['adj_close'] / count,  # Average Close Price
+            np.expm1(sums['log_return']),  # Return
+            sums['volume'] / count,  # Average Volume
+        ], axis=-1)
+
+
+def block_sums(prefix_sums, starts, lengths):
+    """
+    Sums the daily quantities over resampled blocks of consecutive days.
+
+    Every replicate is the concatenation of its blocks, so the sum of a quantity over a replicate is the
+    sum of the block sums, each a difference of two prefix sums: O(replicates x blocks x symbols) instead
+    of gathering every resampled day.
+
+    Parameters:
+    - prefix_sums (numpy array): (dates + 1) x symbols prefix sums of one quantity.
+    - starts (numpy array): (replicates x blocks) first day of every block.
+    - lengths (numpy array): Length of every block (same for all replicates).
+
+    Returns:
+    - numpy array: (replicates x symbols) sums.
+    """
+    return (prefix_sums[starts + lengths] - prefix_sums[starts]).sum(axis=1)
+
+
+def _resampled_blocks(rng, n_replicates, n_dates, block_length):
+    """Moving-block bootstrap: random block starts covering n_dates days (the last block is shortened)."""
+    n_blocks = -(-n_dates // block_length)
+    lengths = np.full(n_blocks, block_length)
+    lengths[-1] = n_dates - block_length * (n_blocks - 1)
+    starts = rng.integers(0, n_dates - block_length + 1, size=(n_replicates, n_blocks))
+    return starts, lengths
+
+
+def bootstrap_rank_chunk(setup, chunk_index, n_replicates):
+    """
+    Ranks the alternatives of `n_replicates` bootstrap replicates with every method.
+
+    The chunk has its own random stream (seeded by the chunk index), so the replicates do not depend on
+    the number of workers.
+
+    Parameters:
+    - setup (dict): Shared inputs of `bootstrap_rankings`.
+    - chunk_index (int): Index of the chunk.
+    - n_replicates (int): Number of replicates in the chunk.
+
+    Returns:
+    - numpy array: (replicates x alternatives x methods) ranks.
+    """
+    rng = np.random.default_rng([setup['seed'], chunk_index])
+    starts, lengths = _resampled_blocks(rng, n_replicates, setup['n_dates'], setup['block_length'])
+    sums = {name: block_sums(prefix, starts, lengths) for name, prefix in setup['prefix_sums'].items()}
+    indicators = indicators_from_sums(sums)  # (replicates x symbols x indicators)
+
+    # Symbols without a valid resampled row keep their point estimates
+    missing = np.isnan(indicators)
+    indicators[missing] = np.broadcast_to(setup['point_indicators'], indicators.shape)[missing]
+    return rank_indicator_replicates(setup, indicators)
+
+
+def rank_indicator_replicates(setup, indicators):
+    """
+    Builds the normalized decision matrix of every replicate and ranks it with every method.
+
+    Parameters:
+    - setup (dict): Shared inputs from `indicator_setup`.
+    - indicators (numpy array): (replicates x symbols x indicators) raw indicators.
+
+    Returns:
+    - numpy array: (replicates x alternatives x methods) ranks.
+    """
+    n_replicates = indicators.shape[0]
+
+    # Min-max normalize every indicator across the stocks of each replicate, as `build_decision_matrix`
+    low = indicators.min(axis=1, keepdims=True)
+    high = indicators.max(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indicators = (indicators - low) / (high - low)
+
+    decision_matrices = np.repeat(setup['fundamentals'][None], n_replicates, axis=0)
+    decision_matrices[:, :, setup['indicator_positions']] = indicators[:, :, setup['indicator_order']]
+    decision_matrices = decision_matrices[:, setup['kept']]
+
+    workspace = Workspace(np.float64)
+    ranks = np.empty((n_replicates, decision_matrices.shape[1], len(setup['method_names'])), dtype=np.int64)
+    for replicate in range(n_replicates):
+        ranks[replicate] = rank_all_methods(decision_matrices[replicate], setup['weights'], setup['criteria_types'],
+                                            setup['method_names'], workspace=workspace)
+    return ranks
+
+
+# Shared inputs of the worker processes, set once per worker by the pool initializer
+_worker_setup = None
+
+
+def _init_worker(setup):
+    global _worker_setup
+    _worker_setup = setup
+
+
+def _worker_rank_chunk(task):
+    rank_chunk, chunk = task
+    return rank_chunk(_worker_setup, *chunk)
+
+
+def run_rank_chunks(rank_chunk, setup, n_replicates, chunk_size=50, n_workers=None):
+    """
+    Runs `rank_chunk(setup, chunk_index, n_replicates)` over chunks of replicates, across worker processes.
+
+    The setup is sent once to every worker (by the pool initializer), and every chunk only sends back its
+    ranks. With one worker the chunks run in this process.
+
+    Parameters:
+    - rank_chunk (function): Module-level function returning the (replicates x alternatives x methods)
+      ranks of one chunk, e.g. `bootstrap_rank_chunk`.
+    - setup (dict): Shared inputs of the chunks.
+    - n_replicates (int): Total number of replicates.
+    - chunk_size (int): Number of replicates per chunk.
+    - n_workers (int, optional): Number of worker processes (default: the number of CPUs).
+
+    Yields:
+    - numpy array: Ranks of each chunk, in completion order.
+    """
+    chunks = [(index, min(chunk_size, n_replicates - start))
+              for index, start in enumerate(range(0, n_replicates, chunk_size))]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(chunks))
+    if n_workers <= 1:
+        for chunk in chunks:
+            yield rank_chunk(setup, *chunk)
+        return
+    context = multiprocessing.get_context()
+    with context.Pool(n_workers, initializer=_init_worker, initargs=(setup,)) as pool:
+        yield from pool.imap_unordered(_worker_rank_chunk, [(rank_chunk, chunk) for chunk in chunks])
+
+
+def resolve_criteria(criteria_columns=None, weights=None, criteria_types=None, method_names=None):
+    """
+    Fills in the default criteria (of the criteria schema) and methods, and checks that every criterion
+    is a company fundamental or a stock indicator (the criteria the replicates can be rebuilt for).
+
+    Returns:
+    - criteria_columns, weights, criteria_types, method_names
+    """
+    default_columns, default_weights, default_types = default_criteria()
+    if criteria_columns is None:
+        criteria_columns = default_columns
+    if weights is None:
+        weights = default_weights
+    if criteria_types is None:
+        criteria_types = default_types
+    if method_names is None:
+        method_names = list(MCDM_METHODS)
+    weights = np.asarray(weights, dtype=float)
+    criteria_columns = list(criteria_columns)
+    if not len(criteria_columns) == len(weights) == len(criteria_types):
+        raise ValueError("criteria_columns, weights and criteria_types must have the same length.")
+    unsupported = [col for col in criteria_columns if col not in INDICATOR_COLUMNS + FUNDAMENTAL_COLUMNS]
+    if unsupported:
+        raise ValueError(f"Only the stock indicators are resampled; unsupported criteria: {unsupported}.")
+    return criteria_columns, weights, criteria_types, method_names
+
+
+def indicator_setup(companies, symbols, point_indicators, criteria_columns, weights, criteria_types, method_names):
+    """
+    Prepares the inputs of `rank_indicator_replicates`: the normalized fundamentals of the stocks of the
+    decision matrix and the positions of the indicators among the criteria.
+
+    Parameters:
+    - companies (pd.DataFrame): SP500 companies data.
+    - symbols (numpy array): Symbols of the rows of `point_indicators`.
+    - point_indicators (numpy array): (symbols x INDICATOR_COLUMNS) raw point-estimate indicators (NaN
+      for symbols without data).
+
+    Returns:
+    - setup (dict): Shared inputs, with the point indicators of the merged stocks.
+    - stocks_info (pd.DataFrame): Symbol and Shortname of the alternatives of the decision matrix.
+    - symbol_rows (numpy array): Row of `point_indicators` of every merged stock.
+    """
+    with_data = ~np.isnan(point_indicators).all(axis=1)
+    stock_indicators = pd.DataFrame(point_indicators[with_data], columns=INDICATOR_COLUMNS,
+                                    index=pd.Index(np.asarray(symbols)[with_data], name='Symbol'))
+    merged = pd.merge(companies, stock_indicators, on='Symbol')
+    symbol_rows = pd.Index(symbols).get_indexer(merged['Symbol'])
+
+    # Normalize over all merged stocks, then keep the stocks without missing criteria (as `build_decision_matrix`)
+    fundamental_columns = [col for col in criteria_columns if col not in INDICATOR_COLUMNS]
+    indicator_columns = [col for col in criteria_columns if col in INDICATOR_COLUMNS]
+    fundamentals = np.zeros((len(merged), len(criteria_columns)))
+    values = merged[fundamental_columns].astype(float)
+    fundamentals[:, [criteria_columns.index(col) for col in fundamental_columns]] = (
+        (values - values.min()) / (values.max() - values.min())).values
+    kept = np.flatnonzero(merged[criteria_columns].notna().all(axis=1).values)
+
+    setup = {
+        'point_indicators': point_indicators[symbol_rows],
+        'fundamentals': fundamentals,
+        'indicator_positions': [criteria_columns.index(col) for col in indicator_columns],
+        'indicator_order': [INDICATOR_COLUMNS.index(col) for col in indicator_columns],
+        'kept': kept,
+        'weights': weights,
+        'criteria_types': criteria_types,
+        'method_names': method_names,
+    }
+    return setup, merged.iloc[kept][['Symbol', 'Shortname']].reset_index(drop=True), symbol_rows
+
+
+def _rank_quantiles(cumulative, n_replicates, level):
+    """First rank at which the cumulative rank counts reach the given share of the replicates."""
+    return np.argmax(cumulative >= level * n_replicates, axis=-1)
+
+
+def rank_distribution(rank_chunks, setup, stocks_info, n_replicates, confidence=0.9, top_k=10):
+    """
+    Summarizes the ranks of many replicates per stock and method, counting ranks as the chunks arrive
+    so that memory does not grow with the number of replicates.
+
+    Parameters:
+    - rank_chunks (iterable): (replicates x alternatives x methods) ranks of every chunk.
+    - setup (dict): Shared inputs from `indicator_setup` (the point-estimate ranks are computed from them).
+    - stocks_info (pd.DataFrame): Symbol and Shortname of the alternatives.
+    - n_replicates (int): Total number of replicates.
+    - confidence (float): Confidence level of the rank intervals.
+    - top_k (int): Size of the top group whose membership probability is reported.
+
+    Returns:
+    - pd.DataFrame: One row per stock and method with the point-estimate rank, the median rank, the
+      confidence interval of the rank and the probability of being in the top k.
+    """
+    method_names = setup['method_names']
+    n_stocks = len(stocks_info)
+    rank_counts = np.zeros((n_stocks, len(method_names), n_stocks + 1), dtype=np.int64)
+    offsets = (np.arange(n_stocks)[:, None] * len(method_names) + np.arange(len(method_names))) * (n_stocks + 1)
+    for ranks in rank_chunks:
+        rank_counts.ravel()[:] += np.bincount((offsets + ranks).ravel(), minlength=rank_counts.size)
+
+    # Rank quantiles and top-k probabilities from the cumulative rank counts
+    cumulative = np.cumsum(rank_counts, axis=2)
+    alpha = (1 - confidence) / 2
+    point_ranks = rank_indicator_replicates(setup, setup['point_indicators'][None])[0]
+    frames = []
+    for j, name in enumerate(method_names):
+        frames.append(stocks_info.assign(**{
+            'Method': name,
+            'Rank': point_ranks[:, j],
+            'Median Rank': _rank_quantiles(cumulative[:, j], n_replicates, 0.5),
+            'CI Lower': _rank_quantiles(cumulative[:, j], n_replicates, alpha),
+            'CI Upper': _rank_quantiles(cumulative[:, j], n_replicates, 1 - alpha),
+            f'Top {top_k} Probability': cumulative[:, j, min(top_k, n_stocks)] / n_replicates,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@traced()
+def bootstrap_rankings(stocks_file, companies_file, start_date, end_date, n_replicates=1000, block_length=10,
+                       confidence=0.9, top_k=10, weights=None, criteria_types=None, criteria_columns=None,
+                       method_names=None, chunk_size=50, n_workers=None, seed=0, stocks=None):
+    """
+    Bootstrap analysis of the data uncertainty of the MCDM rankings.
+
+    The stock indicators (Volatility, Average Close Price, Return, Average Volume) are point estimates
+    from one price path. Every replicate resamples the trading days of the window in blocks of
+    consecutive days (moving-block bootstrap, the same resampled days for every symbol so that the
+    cross-sectional dependence is kept), recomputes the indicators of all stocks at once from block sums,
+    rebuilds the normalized decision matrix and ranks it with every method. Company fundamentals are a
+    single snapshot and are not resampled.
+
+    Replicates are processed in chunks of `chunk_size` across `n_workers` processes and only per-stock
+    rank counts are kept, so memory does not grow with the number of replicates.
+
+    Parameters:
+    - stocks_file (str): Path to the raw SP500 stock data CSV file.
+    - companies_file (str): Path to the SP500 companies data CSV file.
+    - start_date (str): Start date of the indicator window (format: 'YYYY-MM-DD').
+    - end_date (str): End date of the indicator window (format: 'YYYY-MM-DD').
+    - n_replicates (int): Number of bootstrap replicates.
+    - block_length (int): Number of consecutive trading days in each resampled block.
+    - confidence (float): Confidence level of the rank intervals.
+    - top_k (int): Size of the top group whose membership probability is reported.
+    - weights (list of float): Criteria weights (default: the criteria schema weights).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - criteria_columns (list of str): Company and indicator columns of the decision matrix
+      (default: the company and indicator criteria of the criteria schema).
+    - method_names (list of str): Methods to rank with (default: all of MCDM_METHODS).
+    - chunk_size (int): Number of replicates per chunk.
+    - n_workers (int, optional): Number of worker processes (default: the number of CPUs).
+    - seed (int): Seed of the random streams.
+    - stocks (pd.DataFrame): Already loaded stock data, used instead of reading `stocks_file`.
+
+    Returns:
+    - pd.DataFrame: One row per stock and method with the point-estimate rank, the median bootstrap rank,
+      the confidence interval of the rank and the probability of being in the top k.
+    """
+    criteria_columns, weights, criteria_types, method_names = resolve_criteria(
+        criteria_columns, weights, criteria_types, method_names)
+
+    # Step 1: Load the price panel and restrict it to the indicator window
+    panel = load_price_panel(stocks_file, stocks)
+    in_range = np.flatnonzero((panel['dates'] >= pd.Timestamp(start_date)) & (panel['dates'] <= pd.Timestamp(end_date)))
+    if len(in_range) < 2:
+        raise ValueError("Not enough trading days in the selected range.")
+    companies = pd.read_csv(companies_file)
+
+    # Step 2: Point-estimate decision matrix and prefix sums of the daily quantities of its stocks
+    quantities = daily_quantities(panel, in_range[0], in_range[-1])
+    point_indicators = indicators_from_sums({name: values.sum(axis=0) for name, values in quantities.items()})
+    setup, stocks_info, symbol_rows = indicator_setup(companies, panel['symbols'], point_indicators, criteria_columns,
+                                                      weights, criteria_types, method_names)
+    n_dates = len(in_range)
+    setup['prefix_sums'] = {}
+    for name, daily in quantities.items():
+        prefix = np.zeros((n_dates + 1, len(symbol_rows)))
+        np.cumsum(daily[:, symbol_rows], axis=0, out=prefix[1:])
+        setup['prefix_sums'][name] = prefix
+    setup.update({'n_dates': n_dates, 'block_length': min(block_length, n_dates), 'seed': seed})
+
+    # Steps 3-4: Rank the replicates chunk by chunk and summarize the rank counts of every stock and method
+    rank_chunks = run_rank_chunks(bootstrap_rank_chunk, setup, n_replicates, chunk_size, n_workers)
+    return rank_distribution(rank_chunks, setup, stocks_info, n_replicates, confidence, top_k)
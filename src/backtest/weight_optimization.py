@@ -0,0 +1,347 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.price_panel import load_price_panel
+from src.mcdm.batch import MCDM_METHODS, default_criteria
+from src.mcdm.aras import aras_standardize
+from src.mcdm.taxonomy import taxonomy_normalize
+from src.mcdm.topsis import topsis_normalize
+from src.mcdm.vikor import vikor_normalize
+from src.mcdm.waspas import waspas_normalize
+from src.mcdm.promethee import promethee_flows
+from src.backtest.backtest import build_indicator_state, window_decision_matrix, rebalance_indices
+from src.aggregation.aggregation_methods import calculate_ranks
+from src.profiling.tracing import traced, trace_span
+
+# Targets of the weight search, computed from the per-period returns of the top-k portfolio as in
+# `summarize_backtest`: annualized return, or Sharpe ratio (zero risk-free rate)
+OPTIMIZATION_TARGETS = ('return', 'sharpe')
+# Candidates x alternatives x criteria evaluated at once by the VIKOR regret and the WASPAS product
+MAX_BLOCK_ELEMENTS = 2 ** 22
+
+
+def weight_bases(method_name, decision_matrix, criteria_types):
+    """
+    Computes the weight-independent part of an MCDM method on one decision matrix.
+
+    With non-negative weights every method's score is a simple function of matrix products with the
+    weights (or their squares): the weighted column extremes of TOPSIS, ARAS and TAXONOMY are the
+    weights times the extremes of the normalized columns, so their distances are sqrt(D @ w^2) with D the
+    squared differences to the unweighted ideal points.
+
+    Returns:
+    - dict: Arrays passed to `batch_scores`.
+    """
+    matrix = np.array(decision_matrix, dtype=float)
+    benefit = np.array([criterion == 'benefit' for criterion in criteria_types])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method_name == 'TOPSIS':
+            normalized = topsis_normalize(matrix)
+            high, low = normalized.max(axis=0), normalized.min(axis=0)
+            return {'best': (normalized - np.where(benefit, high, low)) ** 2,
+                    'worst': (normalized - np.where(benefit, low, high)) ** 2}
+        if method_name == 'TAXONOMY':
+            normalized = taxonomy_normalize(matrix, criteria_types)
+            return {'ideal': (normalized - normalized.max(axis=0)) ** 2}
+        if method_name == 'ARAS':
+            standardized = aras_standardize(matrix)
+            ideal = np.where(benefit, standardized.max(axis=0), standardized.min(axis=0))
+            return {'ratios': np.where(ideal != 0, standardized / ideal, 0.0)}
+        if method_name == 'VIKOR':
+            return {'normalized': vikor_normalize(matrix, criteria_types)}
+        if method_name == 'COPRAS':
+            signs = np.array([1.0 if c == "benefit" else -1.0 if c == "cost" else 0.0 for c in criteria_types])
+            return {'relative': matrix / np.sum(matrix, axis=0) * signs}
+        if method_name == 'WASPAS':
+            normalized = waspas_normalize(matrix, criteria_types)
+            bases = {'normalized': normalized}
+            if np.all(np.isfinite(normalized) & (normalized > 0)):
+                bases['log'] = np.log(normalized)  # The weighted product is exp(log(normalized) @ w)
+            return bases
+        if method_name == 'PROMETHEE':
+            return {'flows': promethee_flows(matrix, criteria_types).astype(float)}
+    raise ValueError(f"Unknown MCDM method '{method_name}'.")
+
+
+def batch_scores(method_name, bases, weights):
+    """
+    Scores the alternatives of one decision matrix for a batch of weight vectors.
+
+    Parameters:
+    - method_name (str): Key of MCDM_METHODS.
+    - bases (dict): Weight-independent part of the method from `weight_bases`.
+    - weights (numpy array): (candidates x criteria) non-negative weights.
+
+    Returns:
+    - numpy array: (candidates x alternatives) scores, equal to the score vector of the method run
+      with every weight vector.
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if method_name == 'TOPSIS':
+            squares = (weights ** 2).T
+            dist_best = np.sqrt(bases['best'] @ squares).T
+            dist_worst = np.sqrt(bases['worst'] @ squares).T
+            return dist_worst / (dist_best + dist_worst)
+        if method_name == 'TAXONOMY':
+            return np.sqrt(bases['ideal'] @ (weights ** 2).T).T
+        if method_name == 'ARAS':
+            return (bases['ratios'] @ (weights > 0).T.astype(float)).T
+        if method_name == 'COPRAS':
+            relative_significance = (bases['relative'] @ weights.T).T
+            return relative_significance / relative_significance.max(axis=1, keepdims=True) * 100
+        if method_name == 'PROMETHEE':
+            return (bases['flows'] @ weights.T).T
+
+        normalized = bases['normalized']
+        block = max(1, MAX_BLOCK_ELEMENTS // normalized.size)
+        if method_name == 'VIKOR':
+            S = (normalized @ weights.T).T
+            R = np.concatenate([np.max(normalized[None, :, :] * weights[start:start + block, None, :], axis=2)
+                                for start in range(0, len(weights), block)])
+            v = 0.5  # Weight of the strategy of majority rule (S), as in `vikor`
+            S_min, S_max = S.min(axis=1, keepdims=True), S.max(axis=1, keepdims=True)
+            R_min, R_max = R.min(axis=1, keepdims=True), R.max(axis=1, keepdims=True)
+            return v * (S - S_min) / (S_max - S_min) + (1 - v) * (R - R_min) / (R_max - R_min)
+        if method_name == 'WASPAS':
+            Q1 = (normalized @ weights.T).T
+            if 'log' in bases:
+                Q2 = np.exp(bases['log'] @ weights.T).T
+            else:
+                Q2 = np.concatenate([np.prod(np.power(normalized[None, :, :], weights[start:start + block, None, :]),
+                                             axis=2) for start in range(0, len(weights), block)])
+            return 0.5 * Q1 + 0.5 * Q2  # lambda_param = 0.5, as on the WASPAS page
+    raise ValueError(f"Unknown MCDM method '{method_name}'.")
+
+
+def backtest_windows(stocks_file, companies_file, start_date, end_date, rebalance_frequency='W',
+                     lookback_days=252, criteria_columns=None, stocks=None):
+    """
+    Builds the decision matrix and the forward returns of every rebalance window once, as `run_backtest`
+    does, so that any number of weight vectors can be evaluated on them.
+
+    Returns:
+    - list of dict: 'date', 'matrix' (decision matrix values) and 'forward_returns' (return of every
+      alternative until the next rebalance date) of every holding period.
+    - holding_days (float): Mean length of the holding periods in days.
+    """
+    if criteria_columns is None:
+        criteria_columns = default_criteria()[0]
+    panel = load_price_panel(stocks_file, stocks)
+    state = build_indicator_state(panel)
+    companies = pd.read_csv(companies_file)
+    dates = panel['dates']
+
+    rebalances = rebalance_indices(dates, start_date, end_date, rebalance_frequency)
+    rebalances = rebalances[rebalances >= lookback_days - 1]
+    if len(rebalances) < 2:
+        raise ValueError("Not enough rebalance dates in the selected range. Extend the range or shorten the lookback.")
+
+    symbol_position = pd.Index(panel['symbols'])
+    adj_close = panel['Adj Close']
+    windows = []
+    for current, following in zip(rebalances[:-1], rebalances[1:]):
+        decision_matrix = window_decision_matrix(panel, state, companies, current - lookback_days + 1, current,
+                                                 criteria_columns)
+        columns = symbol_position.get_indexer(decision_matrix['Symbol'])
+        entry = adj_close[state['last_valid'][current, columns], columns]
+        exit_ = adj_close[state['last_valid'][following, columns], columns]
+        windows.append({'date': dates[current], 'matrix': decision_matrix.iloc[:, 2:].values.astype(float),
+                        'forward_returns': exit_ / entry - 1})
+    holding_days = float(np.mean(np.diff(dates[rebalances]).astype('timedelta64[D]').astype(float)))
+    return windows, holding_days
+
+
+def period_returns(method_name, window_bases, windows, weights, top_k=10):
+    """
+    Returns of the top-k portfolio of a method in every holding period, for a batch of weight vectors.
+
+    Parameters:
+    - window_bases (list of dict): `weight_bases` of the method for every window.
+    - windows (list of dict): Windows from `backtest_windows`.
+    - weights (numpy array): (candidates x criteria) weights.
+
+    Returns:
+    - numpy array: (candidates x periods) equal-weighted returns of the top_k stocks.
+    """
+    higher_is_better = MCDM_METHODS[method_name][1]
+    returns = np.empty((len(weights), len(windows)))
+    for period, (bases, window) in enumerate(zip(window_bases, windows)):
+        scores = batch_scores(method_name, bases, weights)
+        # Ties are broken by position, as the stable sort of the ranks in `run_backtest`
+        held = calculate_ranks(scores, reverse=higher_is_better, method='ordinal') <= top_k
+        with np.errstate(invalid='ignore'):
+            returns[:, period] = np.nanmean(np.where(held, window['forward_returns'], np.nan), axis=1)
+    return returns
+
+
+def target_values(returns, holding_days, target='sharpe'):
+    """
+    Annualized return or Sharpe ratio of every row of per-period returns (as `summarize_backtest`).
+    """
+    periods_per_year = 365.25 / holding_days
+    years = returns.shape[1] / periods_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annualized_return = np.prod(1 + returns, axis=1) ** (1 / years) - 1
+        if target == 'return':
+            return annualized_return
+        volatility = np.std(returns, axis=1, ddof=1) * np.sqrt(periods_per_year)
+        return annualized_return / volatility
+
+
+def _simplex(z):
+    """Maps unconstrained vectors to weights on the simplex (softmax over the last axis)."""
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _cma_es(evaluate, mean, sigma, n_generations, population, rng):
+    """
+    Minimal CMA-ES (rank-mu and rank-one covariance updates, cumulative step-size adaptation) maximizing
+    `evaluate`, which scores a whole generation of candidates at once.
+
+    Returns:
+    - best (numpy array): Best candidate found.
+    - best_value (float): Its value.
+    """
+    n = len(mean)
+    mu = population // 2
+    recombination = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+    recombination /= recombination.sum()
+    mu_eff = 1 / np.sum(recombination ** 2)
+    c_sigma = (mu_eff + 2) / (n + mu_eff + 5)
+    d_sigma = 1 + 2 * max(0.0, np.sqrt((mu_eff - 1) / (n + 1)) - 1) + c_sigma
+    c_c = (4 + mu_eff / n) / (n + 4 + 2 * mu_eff / n)
+    c_1 = 2 / ((n + 1.3) ** 2 + mu_eff)
+    c_mu = min(1 - c_1, 2 * (mu_eff - 2 + 1 / mu_eff) / ((n + 2) ** 2 + mu_eff))
+    chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+    covariance = np.eye(n)
+    path_sigma, path_c = np.zeros(n), np.zeros(n)
+    best, best_value = mean.copy(), -np.inf
+    for generation in range(n_generations):
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        scale = np.sqrt(np.maximum(eigenvalues, 1e-20))
+        steps = (rng.standard_normal((population, n)) * scale) @ eigenvectors.T
+        candidates = mean + sigma * steps
+        values = np.nan_to_num(evaluate(candidates), nan=-np.inf)
+        order = np.argsort(-values, kind='stable')
+        if values[order[0]] > best_value:
+            best, best_value = candidates[order[0]].copy(), float(values[order[0]])
+
+        selected = steps[order[:mu]]
+        step = recombination @ selected
+        mean = mean + sigma * step
+        inverse_sqrt = eigenvectors @ np.diag(1 / scale) @ eigenvectors.T
+        path_sigma = (1 - c_sigma) * path_sigma + np.sqrt(c_sigma * (2 - c_sigma) * mu_eff) * inverse_sqrt @ step
+        stalled = np.linalg.norm(path_sigma) / np.sqrt(1 - (1 - c_sigma) ** (2 * (generation + 1))) >= 1.4 + 2 / (n + 1)
+        path_c = (1 - c_c) * path_c + (0.0 if stalled else np.sqrt(c_c * (2 - c_c) * mu_eff)) * step
+        covariance = ((1 - c_1 - c_mu) * covariance + c_1 * np.outer(path_c, path_c)
+                      + c_mu * (selected.T * recombination) @ selected)
+        sigma *= np.exp(c_sigma / d_sigma * (np.linalg.norm(path_sigma) / chi_n - 1))
+    return best, best_value
+
+
+@traced()
+def optimize_weights(stocks_file, companies_file, start_date, end_date, target='sharpe', method_names=None,
+                     rebalance_frequency='W', lookback_days=252, top_k=10, n_random=2000, n_generations=30,
+                     population=32, validation_fraction=0.3, criteria_columns=None, criteria_types=None,
+                     stocks=None, seed=0):
+    """
+    Searches the criteria weights that maximize the backtested performance of the top-k portfolio of
+    every MCDM method.
+
+    The decision matrices and forward returns of the rebalance windows are built once
+    (`backtest_windows`), and the weight-independent part of every method on every window once
+    (`weight_bases`); a batch of candidate weights is then scored on a window with a few matrix products
+    (`batch_scores`). The search samples `n_random` weight vectors uniformly from the simplex, then
+    refines the best one with CMA-ES over softmax-parameterized weights. The target is measured on the
+    first periods only; the last `validation_fraction` of the periods is held out to show how much of
+    the gain carries over to unseen periods.
+
+    Parameters:
+    - stocks_file (str): Path to the raw SP500 stock data CSV file.
+    - companies_file (str): Path to the SP500 companies data CSV file.
+    - start_date (str): First rebalance date (format: 'YYYY-MM-DD').
+    - end_date (str): Last date of the backtest (format: 'YYYY-MM-DD').
+    - target (str): 'return' (annualized return) or 'sharpe' (Sharpe ratio).
+    - method_names (list of str): Methods to optimize (default: all of MCDM_METHODS).
+    - rebalance_frequency (str): Pandas period alias, e.g. 'W', 'M' or 'Q'.
+    - lookback_days (int): Number of trading days in each indicator window.
+    - top_k (int): Number of stocks held by the portfolio.
+    - n_random (int): Number of random weight vectors.
+    - n_generations (int): Number of CMA-ES generations (0 to skip the refinement).
+    - population (int): Candidates per CMA-ES generation.
+    - validation_fraction (float): Share of the last periods held out from the search.
+    - criteria_columns (list of str): Company and indicator columns of the decision matrix
+      (default: the company and indicator criteria of the criteria schema).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - stocks (pd.DataFrame): Already loaded stock data, used instead of reading `stocks_file`.
+    - seed (int): Seed of the random search and CMA-ES.
+
+    Returns:
+    - pd.DataFrame: One row per method with the optimized weights, the target of the optimized and of
+      the default weights on the search and validation periods, and the number of evaluated weight vectors.
+    """
+    if target not in OPTIMIZATION_TARGETS:
+        raise ValueError(f"Unknown optimization target '{target}'. Use one of: {', '.join(OPTIMIZATION_TARGETS)}.")
+    if method_names is None:
+        method_names = list(MCDM_METHODS)
+    default_columns, schema_weights, default_types = default_criteria()
+    # A list, so that a tuple or array of the default columns still gets the schema weights
+    criteria_columns = default_columns if criteria_columns is None else list(criteria_columns)
+    if criteria_types is None:
+        criteria_types = default_types
+    default_weights = np.asarray(schema_weights if criteria_columns == default_columns
+                                 else np.full(len(criteria_columns), 1 / len(criteria_columns)), dtype=float)
+    default_weights = default_weights / default_weights.sum()
+
+    # Step 1: Decision matrices and forward returns of every window, split into search and validation periods
+    windows, holding_days = backtest_windows(stocks_file, companies_file, start_date, end_date, rebalance_frequency,
+                                             lookback_days, criteria_columns, stocks)
+    n_search = max(2, int(round(len(windows) * (1 - validation_fraction))))
+    if n_search >= len(windows) and validation_fraction > 0:
+        raise ValueError("Not enough holding periods to hold out a validation part. Extend the range.")
+
+    rng = np.random.default_rng(seed)
+    random_weights = np.vstack([default_weights, rng.dirichlet(np.ones(len(criteria_columns)), n_random)])
+    rows = []
+    for method_name in method_names:
+        # Step 2: Weight-independent part of the method on every window
+        with trace_span('weights.bases', method=method_name):
+            window_bases = [weight_bases(method_name, window['matrix'], criteria_types) for window in windows]
+        search = window_bases[:n_search], windows[:n_search]
+
+        def evaluate(weights):
+            return target_values(period_returns(method_name, *search, weights, top_k), holding_days, target)
+
+        # Step 3: Random search over the simplex, in batches
+        with trace_span('weights.random_search', method=method_name, rows=len(random_weights)):
+            values = np.nan_to_num(evaluate(random_weights), nan=-np.inf)
+        best = random_weights[np.argmax(values)]
+        best_value = float(values.max())
+
+        # Step 4: CMA-ES refinement around the best random weights
+        if n_generations > 0:
+            with trace_span('weights.cma_es', method=method_name):
+                refined, refined_value = _cma_es(lambda z: evaluate(_simplex(z)), np.log(np.maximum(best, 1e-6)),
+                                                 1.0, n_generations, population, rng)
+            if refined_value > best_value:
+                best, best_value = _simplex(refined), refined_value
+
+        # Step 5: Optimized and default weights on the search and validation periods
+        candidates = np.vstack([best, default_weights])
+        returns = period_returns(method_name, window_bases, windows, candidates, top_k)
+        search_values = target_values(returns[:, :n_search], holding_days, target)
+        validation_values = (target_values(returns[:, n_search:], holding_days, target)
+                             if n_search < len(windows) else np.full(2, np.nan))
+        rows.append({
+            'Method': method_name,
+            **dict(zip(criteria_columns, best)),
+            'Search Target': search_values[0],
+            'Default Search Target': search_values[1],
+            'Validation Target': validation_values[0],
+            'Default Validation Target': validation_values[1],
+            'Evaluations': len(random_weights) + n_generations * population,
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+STOCK_COLUMNS = ['Date', 'Symbol', 'Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']
+COMPANY_COLUMNS = [
+    'Exchange', 'Symbol', 'Shortname', 'Longname', 'Sector', 'Industry', 'Currentprice', 'Marketcap', 'Ebitda',
+    'Revenuegrowth', 'City', 'State', 'Country', 'Fulltimeemployees', 'Longbusinesssummary', 'Weight'
+]
+SECTORS = {
+    'Technology': ['Software - Infrastructure', 'Semiconductors', 'Consumer Electronics'],
+    'Industrials': ['Aerospace & Defense', 'Railroads', 'Specialty Industrial Machinery'],
+    'Financial Services': ['Banks - Diversified', 'Asset Management', 'Insurance - Diversified'],
+    'Healthcare': ['Drug Manufacturers - General', 'Medical Devices', 'Healthcare Plans'],
+    'Consumer Cyclical': ['Internet Retail', 'Auto Manufacturers', 'Restaurants'],
+    'Consumer Defensive': ['Discount Stores', 'Beverages - Non-Alcoholic', 'Household & Personal Products'],
+    'Utilities': ['Utilities - Regulated Electric', 'Utilities - Renewable'],
+    'Real Estate': ['REIT - Specialty', 'REIT - Industrial'],
+    'Communication Services': ['Internet Content & Information', 'Telecom Services'],
+    'Energy': ['Oil & Gas Integrated', 'Oil & Gas E&P'],
+    'Basic Materials': ['Specialty Chemicals', 'Gold'],
+}
+EXCHANGES = ['NYQ', 'NMS', 'NGM', 'BTS']
+EXCHANGE_SHARES = [0.69, 0.29, 0.01, 0.01]
+LOCATIONS = [
+    ('New York', 'NY', 'United States'), ('San Jose', 'CA', 'United States'), ('Chicago', 'IL', 'United States'),
+    ('Houston', 'TX', 'United States'), ('Boston', 'MA', 'United States'), ('Dublin', None, 'Ireland'),
+    ('London', None, 'United Kingdom'), ('Zurich', None, 'Switzerland'),
+]
+LOCATION_SHARES = [0.3, 0.2, 0.15, 0.15, 0.16, 0.02, 0.01, 0.01]
+
+
+def synthetic_symbols(n_symbols):
+    """
+    Returns `n_symbols` distinct, deterministic ticker symbols (AAAA, AAAB, ...; 5 letters above 26^4).
+    """
+    width = 4 if n_symbols <= 26 ** 4 else 5
+    codes = np.arange(n_symbols)
+    letters = np.empty((n_symbols, width), dtype='<U1')
+    for position in range(width - 1, -1, -1):
+        letters[:, position] = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))[codes % 26]
+        codes = codes // 26
+    return np.array([''.join(row) for row in letters])
+
+
+def _symbol_parameters(n_symbols, n_dates, seed, listed_fraction, halted_fraction, delisted_fraction):
+    """Draws the per-symbol model parameters and availability windows (O(symbols) memory)."""
+    rng = np.random.default_rng([seed, 0])
+    sectors = list(SECTORS)
+
+    # Listing (NaN rows before the first trading day), trading halts and delistings (NaN after)
+    first_day = np.where(rng.random(n_symbols) < listed_fraction, 0, rng.integers(1, max(n_dates, 2), n_symbols))
+    last_day = np.full(n_symbols, n_dates - 1)
+    delisted = rng.random(n_symbols) < delisted_fraction
+    last_day[delisted] = first_day[delisted] + rng.integers(0, max(n_dates, 1), delisted.sum())
+    last_day = np.minimum(last_day, n_dates - 1)
+    halt_start = np.where(rng.random(n_symbols) < halted_fraction, rng.integers(0, max(n_dates, 1), n_symbols), -1)
+    halt_length = rng.integers(1, 21, n_symbols)
+
+    return {
+        'sector': rng.integers(0, len(sectors), n_symbols),
+        'beta': rng.normal(1.0, 0.3, n_symbols).clip(0.1, 2.5),
+        'drift': rng.normal(0.0002, 0.0004, n_symbols),
+        'volatility': rng.lognormal(np.log(0.015), 0.35, n_symbols),
+        'log_price': np.log(rng.lognormal(np.log(60.0), 1.0, n_symbols).clip(2.0, 5000.0)),
+        'volume_scale': rng.normal(np.log(2e6), 1.2, n_symbols),
+        'dividend_yield': rng.uniform(0.0, 0.04, n_symbols),
+        'shares': rng.lognormal(np.log(3e8), 1.0, n_symbols),
+        'first_day': first_day,
+        'last_day': last_day,
+        'delisted': delisted & (last_day < n_dates - 1),
+        'halt_start': halt_start,
+        'halt_end': np.where(halt_start >= 0, halt_start + halt_length, -1),  # No halt: an empty window
+    }
+
+
+def _price_chunk(params, day_indices, n_dates, seed, missing_rate, market_state):
+    """
+    Simulates the rows of a block of trading days for all symbols, advancing the price state in place.
+
+    Every day has its own random stream (seeded by the day index), so the output does not depend on
+    the chunk size.
+
+    Returns:
+    - dict: Column name -> (days x symbols) array; NaN marks rows without a valid price.
+    """
+    n_symbols = len(params['beta'])
+    shape = (len(day_indices), n_symbols)
+    chunk = {column: np.empty(shape) for column in STOCK_COLUMNS[2:]}
+    for row, day in enumerate(day_indices):
+        rng = np.random.default_rng([seed, 1, day])
+        market_return = rng.normal(0.0003, 0.01)
+        noise = rng.standard_normal(n_symbols)
+        ranges = np.abs(rng.standard_normal((2, n_symbols))) * 0.4
+        gaps = rng.standard_normal(n_symbols) * 0.3
+        volume_noise = rng.standard_normal(n_symbols) * 0.5
+        missing = rng.random(n_symbols) < missing_rate
+
+        log_return = params['drift'] + params['beta'] * market_return + params['volatility'] * noise
+        previous_close = np.exp(params['log_price'])
+        params['log_price'] += np.where(day >= params['first_day'], log_return, 0.0)
+        market_state['log_level'] += market_return
+        market_state['levels'].append(np.exp(market_state['log_level']))
+
+        close = np.exp(params['log_price'])
+        high = close * (1 + ranges[0] * params['volatility'])
+        low = close * (1 - ranges[1] * params['volatility'])
+        chunk['Close'][row] = close
+        chunk['High'][row] = high
+        chunk['Low'][row] = low
+        chunk['Open'][row] = np.clip(previous_close * (1 + gaps * params['volatility']), low, high)
+        chunk['Adj Close'][row] = close * np.exp(-params['dividend_yield'] * (n_dates - 1 - day) / 252)
+        chunk['Volume'][row] = np.round(np.exp(params['volume_scale'] + volume_noise))
+
+        unavailable = ((day < params['first_day']) | (day > params['last_day']) | missing
+                       | ((day >= params['halt_start']) & (day < params['halt_end'])))
+        for column in chunk:
+            chunk[column][row, unavailable] = np.nan
+    return chunk
+
+
+def _companies(params, symbols, last_close, seed):
+    """Builds the companies table with the NaN patterns of sp500_companies.csv."""
+    rng = np.random.default_rng([seed, 2])
+    n_symbols = len(symbols)
+    sectors = np.array(list(SECTORS))[params['sector']]
+    industries = np.array([SECTORS[sector][i % len(SECTORS[sector])]
+                           for sector, i in zip(sectors, rng.integers(0, 6, n_symbols))])
+    locations = rng.choice(len(LOCATIONS), n_symbols, p=LOCATION_SHARES)
+    names = np.char.add(np.char.add('Synthetic ', symbols), ' Inc.')
+
+    market_cap = np.round(params['shares'] * last_close)
+    revenue = market_cap * rng.lognormal(np.log(0.3), 0.6, n_symbols)
+    ebitda = np.round(revenue * rng.normal(0.2, 0.1, n_symbols))
+    ebitda[(sectors == 'Financial Services') & (rng.random(n_symbols) < 0.4)] = np.nan
+    revenue_growth = np.round(rng.normal(0.07, 0.15, n_symbols), 3)
+    revenue_growth[rng.random(n_symbols) < 0.006] = np.nan
+    employees = np.round(rng.lognormal(np.log(2e4), 1.2, n_symbols))
+    employees[rng.random(n_symbols) < 0.02] = np.nan
+
+    companies = pd.DataFrame({
+        'Exchange': rng.choice(EXCHANGES, n_symbols, p=EXCHANGE_SHARES),
+        'Symbol': symbols,
+        'Shortname': names,
+        'Longname': names,
+        'Sector': sectors,
+        'Industry': industries,
+        'Currentprice': np.round(last_close, 2),
+        'Marketcap': market_cap,
+        'Ebitda': ebitda,
+        'Revenuegrowth': revenue_growth,
+        'City': [LOCATIONS[i][0] for i in locations],
+        'State': [LOCATIONS[i][1] for i in locations],
+        'Country': [LOCATIONS[i][2] for i in locations],
+        'Fulltimeemployees': pd.array(employees, dtype='Int64'),
+        'Longbusinesssummary': np.char.add(np.char.add(names, ' operates in the '), np.char.lower(industries)),
+        'Weight': market_cap / market_cap.sum(),
+    })
+    # Like the S&P 500 constituents file, delisted symbols only appear in the price history
+    return companies[~params['delisted']]
+
+
+def generate_synthetic_universe(n_symbols, start_date, end_date, stocks_file, companies_file, index_file=None,
+                                seed=0, chunk_days=20, missing_rate=0.001, listed_fraction=0.9,
+                                halted_fraction=0.03, delisted_fraction=0.02, float_format=None):
+    """
+    Generates a deterministic synthetic universe in the format of the raw S&P 500 files.
+
+    Prices follow a one-factor market model (per-symbol drift, beta and volatility). The stock file has
+    one row per business day and symbol, sorted by date like sp500_stocks.csv, with all price columns
+    NaN before a symbol lists, after it delists, during trading halts and on randomly missing days.
+    Rows are simulated and appended to the CSV file chunk by chunk, so memory stays O(symbols x chunk_days)
+    regardless of the file size. The same seed gives the same files for any chunk size.
+
+    Parameters:
+    - n_symbols (int): Number of securities.
+    - start_date (str): First business day (format: 'YYYY-MM-DD').
+    - end_date (str): Last business day (format: 'YYYY-MM-DD').
+    - stocks_file (str): Path of the stock price CSV file to write (schema of sp500_stocks.csv).
+    - companies_file (str): Path of the companies CSV file to write (schema of sp500_companies.csv).
+    - index_file (str, optional): Path of the index level CSV file to write (schema of sp500_index.csv).
+    - seed (int): Random seed.
+    - chunk_days (int): Number of trading days simulated and written per chunk.
+    - missing_rate (float): Probability of a randomly missing row.
+    - listed_fraction (float): Share of symbols trading from the first day (the others list later).
+    - halted_fraction (float): Share of symbols with one trading halt of 1-20 days.
+    - delisted_fraction (float): Share of symbols that delist (kept in the stock file only).
+    - float_format (str, optional): Format of the price columns, e.g. '%.6g' (smaller files, faster writes).
+
+    Returns:
+    - summary (dict): Number of dates, symbols, stock rows and companies written.
+    """
+    dates = pd.bdate_range(start_date, end_date)
+    date_strings = dates.strftime('%Y-%m-%d')
+    symbols = synthetic_symbols(n_symbols)
+    params = _symbol_parameters(n_symbols, len(dates), seed, listed_fraction, halted_fraction, delisted_fraction)
+    market_state = {'log_level': np.log(2000.0), 'levels': []}
+
+    # Step 1: Simulate and stream the price history chunk by chunk
+    last_close = np.exp(params['log_price'])
+    for start in range(0, len(dates), chunk_days):
+        day_indices = np.arange(start, min(start + chunk_days, len(dates)))
+        chunk = _price_chunk(params, day_indices, len(dates), seed, missing_rate, market_state)
+        valid = ~np.isnan(chunk['Close'])
+        last_valid_row = valid.cumsum(axis=0).argmax(axis=0)
+        last_close = np.where(valid.any(axis=0), chunk['Close'][last_valid_row, np.arange(n_symbols)], last_close)
+
+        rows = pd.DataFrame({'Date': np.repeat(date_strings[day_indices], n_symbols),
+                             'Symbol': np.tile(symbols, len(day_indices))})
+        for column in STOCK_COLUMNS[2:]:
+            rows[column] = chunk[column].ravel()
+        rows.to_csv(stocks_file, mode='w' if start == 0 else 'a', header=start == 0, index=False,
+                    float_format=float_format)
+
+    # Step 2: Company fundamentals consistent with the simulated last prices
+    companies = _companies(params, symbols, last_close, seed)
+    companies[COMPANY_COLUMNS].to_csv(companies_file, index=False)
+
+    # Step 3: Market index levels
+    if index_file is not None:
+        index_levels = pd.DataFrame({'Date': date_strings, 'S&P500': np.round(market_state['levels'], 2)})
+        index_levels.to_csv(index_file, index=False)
+
+    return {'dates': len(dates), 'symbols': n_symbols, 'stock_rows': len(dates) * n_symbols,
+            'companies': len(companies)}
@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CRITERIA_SCHEMA_FILE = PROJECT_ROOT / "config" / "criteria_schema.json"
+
+SCHEMA_FIELDS = ['name', 'column', 'source', 'direction', 'weight']
+# Where the values of a criterion come from:
+# - companies: a numeric column of the companies file (fundamentals),
+# - indicators: an indicator computed from the stock prices (INDICATOR_COLUMNS),
+# - portfolio_metrics: a return-based metric (METRIC_COLUMNS), only when preprocessing includes them.
+CRITERIA_SOURCES = ('companies', 'indicators', 'portfolio_metrics')
+BASE_SOURCES = ('companies', 'indicators')
+CRITERIA_DIRECTIONS = ('benefit', 'cost')
+IDENTIFIER_COLUMNS = ['Symbol', 'Shortname']
+
+# Parsed schema files keyed by path, with the modification time they were read at
+_schema_cache = {}
+
+
+def load_criteria_schema(schema_file=None):
+    """
+    Loads and validates the criteria schema (one entry per criterion: display name, source column,
+    source, direction and default weight).
+
+    Parameters:
+    - schema_file (str or Path, optional): Path to the schema JSON file (default: config/criteria_schema.json).
+
+    Returns:
+    - pd.DataFrame: One row per criterion with the name, column, source, direction and weight fields,
+      in the order of the decision matrix columns.
+    """
+    schema_file = Path(schema_file) if schema_file is not None else CRITERIA_SCHEMA_FILE
+    mtime = schema_file.stat().st_mtime_ns
+    cached = _schema_cache.get(schema_file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1].copy()
+
+    with open(schema_file) as file:
+        entries = json.load(file)['criteria']
+    schema = pd.DataFrame(entries)
+
+    missing_fields = [field for field in SCHEMA_FIELDS if field not in schema.columns]
+    if missing_fields:
+        raise ValueError(f"Criteria schema {schema_file} is missing the fields: {', '.join(missing_fields)}")
+    schema = schema[SCHEMA_FIELDS]
+    schema['weight'] = schema['weight'].astype(float)
+
+    errors = []
+    if schema['column'].duplicated().any():
+        errors.append(f"duplicated columns {schema.loc[schema['column'].duplicated(), 'column'].tolist()}")
+    if not schema['source'].isin(CRITERIA_SOURCES).all():
+        errors.append(f"unknown sources {sorted(set(schema['source']) - set(CRITERIA_SOURCES))}")
+    if not schema['direction'].isin(CRITERIA_DIRECTIONS).all():
+        errors.append(f"unknown directions {sorted(set(schema['direction']) - set(CRITERIA_DIRECTIONS))}")
+    if (schema['weight'] < 0).any():
+        errors.append("negative weights")
+    if errors:
+        raise ValueError(f"Invalid criteria schema {schema_file}: {'; '.join(errors)}")
+
+    _schema_cache[schema_file] = (mtime, schema)
+    return schema.copy()
+
+
+def schema_columns(schema, sources=BASE_SOURCES):
+    """
+    Returns the criteria columns of the schema whose source is one of `sources`, in schema order.
+    """
+    return schema.loc[schema['source'].isin(sources), 'column'].tolist()
+
+
+def criteria_for_columns(columns, schema=None):
+    """
+    Looks up the criteria of the given decision matrix columns.
+
+    Parameters:
+    - columns (list of str): Criteria columns of a decision matrix, in matrix order.
+    - schema (pd.DataFrame, optional): Criteria schema (default: the configured schema).
+
+    Returns:
+    - pd.DataFrame: The schema rows of `columns`, in the same order.
+    """
+    if schema is None:
+        schema = load_criteria_schema()
+    schema = schema.set_index('column', drop=False)
+    unknown = [column for column in columns if column not in schema.index]
+    if unknown:
+        raise ValueError(f"Columns missing from the criteria schema: {', '.join(unknown)}. "
+                         f"Add them to {CRITERIA_SCHEMA_FILE.name}.")
+    return schema.loc[list(columns)].reset_index(drop=True)
+
+
+def decision_matrix_criteria(decision_matrix, schema=None):
+    """
+    Looks up the criteria of a decision matrix with Symbol and Shortname identifier columns.
+
+    Returns:
+    - pd.DataFrame: The schema rows of the criteria columns, in matrix order.
+    """
+    columns = [column for column in decision_matrix.columns if column not in IDENTIFIER_COLUMNS]
+    return criteria_for_columns(columns, schema)
+
+
+def schema_defaults(schema=None, sources=BASE_SOURCES):
+    """
+    Returns the default criteria of the schema whose source is one of `sources`.
+
+    Returns:
+    - columns (list of str): Criteria columns, in schema order.
+    - weights (list of float): Default weight of each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    """
+    if schema is None:
+        schema = load_criteria_schema()
+    selected = schema[schema['source'].isin(sources)]
+    return selected['column'].tolist(), selected['weight'].tolist(), selected['direction'].tolist()
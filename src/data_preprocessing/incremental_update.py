@@ -0,0 +1,293 @@
+import pandas as pd
+
+from src.data_preprocessing.preprocess_data import (
+    INDICATOR_COLUMNS, RUNNING_STATE_COLUMNS, STATE_SETTING_COLUMNS, normalize_column, summarize_stock_rows,
+    indicators_from_running_state, state_settings
+)
+from src.data_preprocessing.criteria_schema import load_criteria_schema, schema_columns
+from src.data_preprocessing.portfolio_metrics import METRIC_COLUMNS, calculate_portfolio_metrics
+
+
+def _bounds(raw):
+    """Returns the min/max of every column together with the symbols holding them."""
+    return {
+        col: (raw[col].min(), raw[col].max(), raw[col].idxmin(), raw[col].idxmax())
+        for col in raw.columns
+    }
+
+
+def _raw_decision_matrix(companies, raw_indicators, criteria_columns):
+    """Merges companies with raw indicators, before any normalization, keyed by Symbol."""
+    merged = pd.merge(companies, raw_indicators, left_on='Symbol', right_index=True)
+    return merged[['Symbol', 'Shortname'] + criteria_columns].set_index('Symbol', drop=False)
+
+
+def _normalize_all(raw, columns):
+    normalized = raw.copy()
+    for col in columns:
+        normalized[col] = normalize_column(raw[col])
+    return normalized
+
+
+def _renormalize(raw, normalized, bounds, columns, changed):
+    """
+    Updates min-max normalized columns after the raw values of `changed` rows were modified.
+
+    The bounds are refreshed from the changed rows only, unless a changed row held the previous
+    minimum or maximum (then the column is rescanned). A column is fully renormalized only when
+    its bounds moved; otherwise only the changed rows are rewritten.
+
+    Returns:
+    - renormalized_columns (list of str): Columns whose bounds changed and were fully renormalized.
+    """
+    renormalized_columns = []
+    for col in columns:
+        old_min, old_max, min_symbol, max_symbol = bounds[col]
+        changed_values = raw.loc[changed, col]
+        if min_symbol in changed or max_symbol in changed:
+            new_bounds = (raw[col].min(), raw[col].max(), raw[col].idxmin(), raw[col].idxmax())
+        else:
+            new_bounds = (old_min, old_max, min_symbol, max_symbol)
+            if changed_values.min() < old_min:
+                new_bounds = (changed_values.min(), new_bounds[1], changed_values.idxmin(), new_bounds[3])
+            if changed_values.max() > old_max:
+                new_bounds = (new_bounds[0], changed_values.max(), new_bounds[2], changed_values.idxmax())
+        bounds[col] = new_bounds
+
+        new_min, new_max = new_bounds[0], new_bounds[1]
+        if (new_min, new_max) != (old_min, old_max):
+            normalized[col] = normalize_column(raw[col])
+            renormalized_columns.append(col)
+        else:
+            normalized.loc[changed, col] = (changed_values - new_min) / (new_max - new_min)
+    return renormalized_columns
+
+
+def _criteria_columns(criteria_columns):
+    if criteria_columns is None:
+        criteria_columns = schema_columns(load_criteria_schema())
+    return list(criteria_columns)
+
+
+def _metric_criteria(criteria_columns):
+    """Portfolio metric columns among the criteria (computed from the full return history, not running sums)."""
+    return [col for col in criteria_columns if col in METRIC_COLUMNS]
+
+
+def init_incremental_state(stocks, companies, start_date, end_date=None, criteria_columns=None, index_file=None):
+    """
+    Builds the incremental preprocessing state from the stock history.
+
+    The result matches `preprocess_sp500_data` for the period [start_date, end_date]; rows appended
+    later extend the period beyond end_date.
+
+    Parameters:
+    - stocks (pd.DataFrame): Raw SP500 stock data.
+    - companies (pd.DataFrame): SP500 companies data.
+    - start_date (str): Start date of the analysed period (format: 'YYYY-MM-DD').
+    - end_date (str, optional): End date of the analysed period (default: last available date).
+    - criteria_columns (list of str, optional): Company, indicator and portfolio metric columns of the
+      decision matrix (default: the company and indicator criteria of the criteria schema).
+    - index_file (str, optional): Path to the S&P 500 index CSV file, used for the Beta metric.
+
+    Returns:
+    - state (dict): Running per-symbol sums, raw and normalized indicators, raw and normalized
+      decision matrix and the min/max bounds used for both normalizations.
+    """
+    stocks = stocks.dropna()
+    stocks = stocks.assign(Date=pd.to_datetime(stocks['Date']))
+    stocks = stocks[stocks['Date'] >= start_date]
+    if end_date is not None:
+        stocks = stocks[stocks['Date'] <= end_date]
+
+    running = summarize_stock_rows(stocks)
+    criteria_columns = _criteria_columns(criteria_columns)
+    metrics = None
+    if _metric_criteria(criteria_columns):
+        metrics = calculate_portfolio_metrics(stocks, index_file)
+    state = {
+        'start_date': pd.Timestamp(start_date),
+        'companies': companies,
+        'criteria_columns': criteria_columns,
+        'index_file': index_file,
+        'running': running,
+        'metrics': metrics,
+    }
+    _rebuild_derived(state)
+    return state
+
+
+def _rebuild_derived(state):
+    """Recomputes indicators, decision matrix and bounds from the running state (O(symbols))."""
+    raw_indicators = indicators_from_running_state(state['running'])
+    if state.get('metrics') is not None:
+        raw_indicators = raw_indicators.join(state['metrics'])
+    state['raw_indicators'] = raw_indicators
+    state['indicators'] = _normalize_all(raw_indicators, raw_indicators.columns)
+    state['indicator_bounds'] = _bounds(raw_indicators)
+
+    criteria_columns = state['criteria_columns']
+    raw_matrix = _raw_decision_matrix(state['companies'], raw_indicators, criteria_columns)
+    state['raw_matrix'] = raw_matrix
+    state['matrix'] = _normalize_all(raw_matrix, criteria_columns)
+    state['matrix_bounds'] = _bounds(raw_matrix[criteria_columns])
+
+
+def apply_new_rows(state, new_rows, metrics=None):
+    """
+    Updates the incremental state with newly appended daily stock rows.
+
+    Only the symbols present in `new_rows` are touched: their running sums and last close are
+    updated in O(new rows), their indicators are re-derived, and normalization is redone for a
+    whole column only when its min/max bounds changed. When the criteria include portfolio metrics,
+    which depend on the whole return history, the metrics recomputed by the caller replace the old
+    ones and the derived tables are rebuilt (O(symbols)).
+
+    Parameters:
+    - state (dict): State from `init_incremental_state` or `load_incremental_state`.
+    - new_rows (pd.DataFrame): New stock rows, all dated after the last processed date of their symbol.
+    - metrics (pd.DataFrame, optional): Raw portfolio metrics of the extended period, indexed by Symbol
+      (required when the criteria include portfolio metrics).
+
+    Returns:
+    - changed_symbols (pd.Index): Symbols whose indicators were updated.
+    """
+    new_rows = new_rows.dropna()
+    new_rows = new_rows.assign(Date=pd.to_datetime(new_rows['Date']))
+    new_rows = new_rows[new_rows['Date'] >= state['start_date']].sort_values('Date', kind='stable')
+    if new_rows.empty:
+        return pd.Index([], name='Symbol')
+
+    if state.get('metrics') is not None and metrics is None:
+        raise ValueError("The criteria include portfolio metrics: pass the metrics of the extended period.")
+
+    delta = summarize_stock_rows(new_rows)
+    running = state['running']
+    known = delta.index.intersection(running.index)
+    if (delta.loc[known, 'First Date'] <= running.loc[known, 'Last Date']).any():
+        raise ValueError("New rows must be dated after the last processed date of each symbol. "
+                         "Rerun the full preprocessing to apply corrections to past rows.")
+
+    # Step 1: Update running sums and last close of known symbols, add new symbols
+    for col in ['Count', 'Spread Sum', 'Adj Close Sum', 'Volume Sum']:
+        running.loc[known, col] += delta.loc[known, col]
+    running.loc[known, ['Last Date', 'Last Close']] = delta.loc[known, ['Last Date', 'Last Close']]
+
+    new_symbols = delta.index.difference(running.index)
+    if len(new_symbols) > 0 or metrics is not None:
+        # A new symbol adds a row to every table and new metrics can move every row; rebuild the
+        # derived tables once (O(symbols))
+        state['running'] = pd.concat([running, delta.loc[new_symbols]]).sort_index()
+        if metrics is not None:
+            state['metrics'] = metrics
+        _rebuild_derived(state)
+        return delta.index
+
+    # Step 2: Re-derive the indicators of the changed symbols only
+    changed = delta.index
+    raw_indicators = state['raw_indicators']
+    raw_indicators.loc[changed] = indicators_from_running_state(running.loc[changed])
+    _renormalize(raw_indicators, state['indicators'], state['indicator_bounds'], INDICATOR_COLUMNS, changed)
+
+    # Step 3: Update the decision matrix rows of changed symbols that are SP500 companies
+    raw_matrix = state['raw_matrix']
+    changed_in_matrix = changed.intersection(raw_matrix.index)
+    matrix_indicators = [col for col in INDICATOR_COLUMNS if col in state['criteria_columns']]
+    if len(changed_in_matrix) > 0 and matrix_indicators:
+        new_values = raw_indicators.loc[changed_in_matrix, matrix_indicators].values
+        raw_matrix.loc[changed_in_matrix, matrix_indicators] = new_values
+        _renormalize(raw_matrix, state['matrix'], state['matrix_bounds'], matrix_indicators, changed_in_matrix)
+    return changed
+
+
+def decision_matrix_from_state(state):
+    """
+    Returns the normalized decision matrix in the format written by `preprocess_sp500_data`.
+    """
+    return state['matrix'].reset_index(drop=True).dropna()
+
+
+def save_incremental_state(state, state_file):
+    """
+    Saves the running per-symbol state (the only part that cannot be re-derived) to a CSV file,
+    in the same format as the `output_state_file` of `preprocess_sp500_data`: the running sums, the
+    settings of the state (STATE_SETTING_COLUMNS) and the raw portfolio metrics when they are criteria.
+    """
+    running = state['running'].assign(**state_settings(state['start_date'], state['criteria_columns'],
+                                                       state.get('index_file')))
+    if state.get('metrics') is not None:
+        running = running.join(state['metrics'])
+    running.to_csv(state_file)
+
+
+def load_incremental_state(state_file, companies, criteria_columns=None):
+    """
+    Loads the running state saved by `save_incremental_state` and re-derives the rest in O(symbols).
+
+    The decision matrix keeps the criteria columns the state was built with (stored in the state file),
+    unless `criteria_columns` is given; state files without them use the schema defaults.
+    """
+    running = pd.read_csv(state_file, index_col='Symbol', parse_dates=['First Date', 'Last Date', 'Start Date'],
+                          dtype={'Criteria Columns': str, 'Index File': str})
+    start_date = running['Start Date'].iloc[0]
+    settings = running.reindex(columns=STATE_SETTING_COLUMNS).iloc[0]
+    if criteria_columns is None and isinstance(settings['Criteria Columns'], str):
+        criteria_columns = settings['Criteria Columns'].split(';')
+    criteria_columns = _criteria_columns(criteria_columns)
+
+    metric_columns = _metric_criteria(criteria_columns)
+    missing_metrics = [col for col in metric_columns if col not in running.columns]
+    if missing_metrics:
+        raise ValueError(f"The state file has no values of the criteria {', '.join(missing_metrics)}. "
+                         "Rerun the full preprocessing.")
+    metric_columns = [col for col in METRIC_COLUMNS if col in running.columns]
+    state = {
+        'start_date': start_date,
+        'companies': companies,
+        'criteria_columns': criteria_columns,
+        'index_file': settings['Index File'] if isinstance(settings['Index File'], str) else None,
+        'running': running[RUNNING_STATE_COLUMNS],
+        'metrics': running[metric_columns] if metric_columns else None,
+    }
+    _rebuild_derived(state)
+    return state
+
+
+def apply_price_delta(delta_file, state_file, companies_file, output_stocks_file,
+                      output_indicators_file, output_decision_matrix_file):
+    """
+    Applies a file of newly appended stock rows to the preprocessed outputs without rerunning
+    `preprocess_sp500_data` over the full history.
+
+    The cleaned delta rows are appended to the cleaned stock file, the running state is updated
+    and the stock indicators and decision matrix files are rewritten.
+
+    Parameters:
+    - delta_file (str or file-like): CSV file with the new rows (same columns as the raw stock file).
+    - state_file (str): Path of the running state written by `preprocess_sp500_data` (output_state_file)
+      or by a previous call of this function.
+    - companies_file (str): Path to the SP500 companies data CSV file.
+    - output_stocks_file (str): Path of the cleaned stock data CSV file to append to.
+    - output_indicators_file (str): Path to save the stock indicators CSV file.
+    - output_decision_matrix_file (str): Path to save the complete decision matrix CSV file.
+
+    Returns:
+    - changed_symbols (pd.Index): Symbols whose indicators were updated.
+    """
+    new_rows = pd.read_csv(delta_file)
+    state = load_incremental_state(state_file, pd.read_csv(companies_file))
+    metrics = None
+    if state['metrics'] is not None:
+        # The portfolio metrics depend on the whole return history: recompute them from the cleaned rows
+        stocks = pd.concat([pd.read_csv(output_stocks_file), new_rows.dropna()], ignore_index=True)
+        stocks['Date'] = pd.to_datetime(stocks['Date'])
+        metrics = calculate_portfolio_metrics(stocks[stocks['Date'] >= state['start_date']], state['index_file'])
+    changed_symbols = apply_new_rows(state, new_rows, metrics)
+
+    new_rows.dropna().to_csv(output_stocks_file, mode='a', header=False, index=False)
+    state['indicators'].to_csv(output_indicators_file)
+    decision_matrix_from_state(state).to_csv(output_decision_matrix_file, index=False)
+    save_incremental_state(state, state_file)
+
+    print(f"Updated indicators of {len(changed_symbols)} symbols from {delta_file}")
+    return changed_symbols
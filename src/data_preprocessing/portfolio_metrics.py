@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.price_panel import load_price_panel, load_index_levels, daily_returns
+
+METRIC_COLUMNS = ['Annualized Volatility', 'Sharpe Ratio', 'Sortino Ratio', 'Max Drawdown', 'Beta']
+# Direction of every metric when used as a decision criterion
+METRIC_CRITERIA_TYPES = {
+    'Annualized Volatility': 'cost',
+    'Sharpe Ratio': 'benefit',
+    'Sortino Ratio': 'benefit',
+    'Max Drawdown': 'cost',
+    'Beta': 'cost',
+}
+TRADING_DAYS_PER_YEAR = 252
+
+
+def return_matrix(panel, price_column='Adj Close'):
+    """
+    Builds the dense (dates x symbols) matrix of daily returns of a price panel.
+
+    Returns:
+    - numpy array: (dates - 1) x symbols daily returns, NaN where a price is missing.
+    """
+    return daily_returns(panel[price_column])
+
+
+def compute_portfolio_metrics(returns, symbols, benchmark_returns=None, risk_free_rate=0.0,
+                              periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Computes risk and performance metrics of every symbol from a dense return matrix.
+
+    Every metric is computed for all symbols at once with NaN-aware NumPy reductions; missing
+    returns (listing gaps) are skipped, and are treated as a flat day for the drawdown.
+
+    Parameters:
+    - returns (numpy array): (dates x symbols) matrix of daily returns.
+    - symbols (array-like): Symbol of every column.
+    - benchmark_returns (numpy array, optional): Daily benchmark returns aligned to the rows of `returns`.
+      Beta is only computed when given.
+    - risk_free_rate (float): Annual risk-free rate used by the Sharpe and Sortino ratios.
+    - periods_per_year (int): Number of return periods per year used for annualization.
+
+    Returns:
+    - pd.DataFrame: Indexed by Symbol with the Annualized Volatility, Sharpe Ratio, Sortino Ratio,
+      Max Drawdown (positive fraction of the peak) and Beta columns.
+    """
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=0)
+    filled = np.where(valid, returns, 0.0)
+
+    # Step 1: Mean and standard deviation of daily returns
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = filled.sum(axis=0) / count
+        deviations = np.where(valid, returns - mean, 0.0)
+        std = np.sqrt(np.einsum('ij,ij->j', deviations, deviations) / (count - 1))
+
+        # Step 2: Annualized volatility, Sharpe and Sortino ratios
+        excess = mean - risk_free_rate / periods_per_year
+        downside = np.minimum(np.where(valid, returns - risk_free_rate / periods_per_year, 0.0), 0.0)
+        downside_deviation = np.sqrt(np.einsum('ij,ij->j', downside, downside) / count)
+        metrics = {
+            'Annualized Volatility': std * np.sqrt(periods_per_year),
+            'Sharpe Ratio': excess / std * np.sqrt(periods_per_year),
+            'Sortino Ratio': excess / downside_deviation * np.sqrt(periods_per_year),
+        }
+
+        # Step 3: Maximum drawdown of the cumulative wealth path
+        wealth = np.cumprod(1.0 + filled, axis=0)
+        peaks = np.maximum.accumulate(wealth, axis=0)
+        metrics['Max Drawdown'] = np.max(1.0 - wealth / peaks, axis=0)
+
+        # Step 4: Beta against the benchmark over the days both have a return
+        if benchmark_returns is not None:
+            benchmark_returns = np.asarray(benchmark_returns, dtype=float)[:, None]
+            both = valid & ~np.isnan(benchmark_returns)
+            paired_count = both.sum(axis=0)
+            market = np.where(both, benchmark_returns, 0.0)
+            stock = np.where(both, returns, 0.0)
+            market_mean = market.sum(axis=0) / paired_count
+            stock_mean = stock.sum(axis=0) / paired_count
+            market_dev = np.where(both, market - market_mean, 0.0)
+            stock_dev = np.where(both, stock - stock_mean, 0.0)
+            covariance = np.einsum('ij,ij->j', stock_dev, market_dev)
+            metrics['Beta'] = covariance / np.einsum('ij,ij->j', market_dev, market_dev)
+
+    columns = [col for col in METRIC_COLUMNS if col in metrics]
+    return pd.DataFrame(metrics, index=pd.Index(symbols, name='Symbol'))[columns]
+
+
+def covariance_matrix(returns, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Computes the annualized covariance matrix of daily returns with a single matrix product.
+
+    Missing returns are handled pairwise: each entry is divided by the number of days on which
+    both symbols have a return (columns are demeaned with their own full-sample mean).
+
+    Parameters:
+    - returns (numpy array): (dates x symbols) matrix of daily returns.
+    - periods_per_year (int): Number of return periods per year used for annualization.
+
+    Returns:
+    - numpy array: symbols x symbols annualized covariance matrix.
+    """
+    valid = ~np.isnan(returns)
+    mask = valid.astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, returns, 0.0).sum(axis=0) / valid.sum(axis=0)
+        centered = np.where(valid, returns - mean, 0.0)
+        pair_counts = mask.T @ mask
+        return (centered.T @ centered) / (pair_counts - 1) * periods_per_year
+
+
+def calculate_portfolio_metrics(filtered_stocks, index_file=None, risk_free_rate=0.0):
+    """
+    Computes the portfolio metrics of every symbol from cleaned stock rows of the analysed period.
+
+    Parameters:
+    - filtered_stocks (pd.DataFrame): Cleaned stock rows (Date, Symbol and price columns).
+    - index_file (str, optional): Path to the S&P 500 index CSV file, needed for Beta.
+    - risk_free_rate (float): Annual risk-free rate.
+
+    Returns:
+    - pd.DataFrame: Indexed by Symbol with the metric columns.
+    """
+    panel = load_price_panel(stocks=filtered_stocks)
+    returns = return_matrix(panel)
+
+    benchmark_returns = None
+    if index_file is not None:
+        benchmark_returns = daily_returns(load_index_levels(index_file, panel['dates'])[:, None])[:, 0]
+
+    return compute_portfolio_metrics(returns, panel['symbols'], benchmark_returns, risk_free_rate)
@@ -1,7 +1,129 @@
 import pandas as pd
 
+from src.data_preprocessing.portfolio_metrics import calculate_portfolio_metrics
+from src.data_preprocessing.criteria_schema import load_criteria_schema, schema_columns
+from src.profiling.tracing import traced, trace_span
+
+INDICATOR_COLUMNS = ['Volatility', 'Average Close Price', 'Return', 'Average Volume']
+FUNDAMENTAL_COLUMNS = ['Revenuegrowth', 'Ebitda', 'Marketcap', 'Weight']
+DECISION_MATRIX_COLUMNS = FUNDAMENTAL_COLUMNS + INDICATOR_COLUMNS
+
+
+def normalize_column(column):
+    """Normalize a column using min-max normalization."""
+    return (column - column.min()) / (column.max() - column.min())
+
+
+# Per-symbol running state of a period; every stock indicator can be derived from it,
+# and it can be updated with newly appended rows (see incremental_update.py).
+RUNNING_STATE_COLUMNS = ['Count', 'Spread Sum', 'Adj Close Sum', 'Volume Sum',
+                         'First Date', 'First Close', 'Last Date', 'Last Close']
+# Columns of the state file besides the running sums: the settings the state was built with, repeated
+# on every row (the raw portfolio metrics follow when they are criteria)
+STATE_SETTING_COLUMNS = ['Start Date', 'Criteria Columns', 'Index File']
+
+
+def summarize_stock_rows(filtered_stocks):
+    """
+    Aggregates cleaned stock rows (in date order) into per-symbol running state.
+
+    Parameters:
+    - filtered_stocks (pd.DataFrame): Cleaned stock rows of the analysed period, in date order.
+
+    Returns:
+    - pd.DataFrame: Indexed by Symbol with the RUNNING_STATE_COLUMNS.
+    """
+    running_state = filtered_stocks.assign(
+        Spread=filtered_stocks['High'] - filtered_stocks['Low']
+    ).groupby('Symbol').agg(
+        **{
+            'Count': ('Close', 'size'),
+            'Spread Sum': ('Spread', 'sum'),
+            'Adj Close Sum': ('Adj Close', 'sum'),
+            'Volume Sum': ('Volume', 'sum'),
+            'First Date': ('Date', 'first'),
+            'First Close': ('Close', 'first'),
+            'Last Date': ('Date', 'last'),
+            'Last Close': ('Close', 'last'),
+        }
+    )
+    return running_state[RUNNING_STATE_COLUMNS]
+
+
+def state_settings(start_date, criteria_columns, index_file=None):
+    """
+    Returns the settings columns of the state file (STATE_SETTING_COLUMNS), written by
+    `preprocess_sp500_data` and `save_incremental_state` so that a later update rebuilds the same
+    decision matrix columns.
+    """
+    return {'Start Date': start_date, 'Criteria Columns': ';'.join(criteria_columns),
+            'Index File': '' if index_file is None else str(index_file)}
+
+
+def indicators_from_running_state(running_state):
+    """
+    Derives the raw (not normalized) stock indicators from per-symbol running state.
+
+    Returns:
+    - pd.DataFrame: Indexed by Symbol with the Volatility, Average Close Price, Return and Average Volume columns.
+    """
+    count = running_state['Count']
+    return pd.DataFrame({
+        'Volatility': running_state['Spread Sum'] / count,  # Daily volatility (mean difference between High and Low)
+        'Average Close Price': running_state['Adj Close Sum'] / count,  # Average adjusted close price
+        # Percentage return (last close / first close)
+        'Return': (running_state['Last Close'] - running_state['First Close']) / running_state['First Close'],
+        'Average Volume': running_state['Volume Sum'] / count,  # Average trading volume
+    }, index=running_state.index)[INDICATOR_COLUMNS]
+
+
+def calculate_stock_indicators(filtered_stocks):
+    """
+    Computes the raw (not normalized) financial indicators for each stock symbol.
+
+    Parameters:
+    - filtered_stocks (pd.DataFrame): Cleaned stock rows of the analysed period, in date order.
+
+    Returns:
+    - pd.DataFrame: Indexed by Symbol with the Volatility, Average Close Price, Return and Average Volume columns.
+    """
+    return indicators_from_running_state(summarize_stock_rows(filtered_stocks))
+
+
+def build_decision_matrix(companies, stock_indicators, criteria_columns=None):
+    """
+    Merges company fundamentals with stock indicators and normalizes every criterion column.
+
+    Parameters:
+    - companies (pd.DataFrame): SP500 companies data.
+    - stock_indicators (pd.DataFrame): Stock indicators indexed (or keyed) by Symbol.
+    - criteria_columns (list of str, optional): Criteria columns of the decision matrix
+      (default: DECISION_MATRIX_COLUMNS).
+
+    Returns:
+    - pd.DataFrame: Decision matrix with Symbol, Shortname and the normalized criteria columns,
+      rows with missing values removed.
+    """
+    decision_matrix = pd.merge(companies, stock_indicators, on='Symbol')  # Merge companies with stock indicators
+
+    if criteria_columns is None:
+        criteria_columns = DECISION_MATRIX_COLUMNS
+
+    # Select relevant columns for the decision matrix
+    decision_matrix = decision_matrix[['Symbol', 'Shortname'] + criteria_columns]
+
+    # Normalize the columns of the decision matrix
+    for col in criteria_columns:
+        decision_matrix[col] = normalize_column(decision_matrix[col])  # Normalize the decision matrix columns
+
+    return decision_matrix.dropna()
+
+
+@traced()
 def preprocess_sp500_data(start_date: str, end_date: str, stocks_file: str, companies_file: str, 
-                          output_stocks_file: str, output_indicators_file: str, output_decision_matrix_file: str):
+                          output_stocks_file: str, output_indicators_file: str, output_decision_matrix_file: str,
+                          output_state_file: str = None, include_portfolio_metrics: bool = False,
+                          index_file: str = None, criteria_schema_file: str = None):
     """
     Preprocesses the SP500 stock data, calculates financial indicators, and generates a decision matrix.
 
@@ -22,37 +144,50 @@ def preprocess_sp500_data(start_date: str, end_date: str, stocks_file: str, comp
     output_stocks_file (str): Path to save the cleaned stock data CSV file.
     output_indicators_file (str): Path to save the stock indicators CSV file.
     output_decision_matrix_file (str): Path to save the complete decision matrix CSV file.
+    output_state_file (str, optional): Path to save the per-symbol running state, which lets
+        `apply_price_delta` update the outputs when new daily rows arrive.
+    include_portfolio_metrics (bool): Whether to add the return-based metrics (Annualized Volatility,
+        Sharpe Ratio, Sortino Ratio, Max Drawdown and Beta) as extra indicator and criteria columns.
+    index_file (str, optional): Path to the S&P 500 index CSV file, used for Beta.
+    criteria_schema_file (str, optional): Path to the criteria schema JSON file that lists the decision
+        matrix columns (default: config/criteria_schema.json).
     """
     
     # Step 1: Load and clean SP500 stock data
-    stocks = pd.read_csv(stocks_file)
+    with trace_span('preprocess.read_stocks_csv') as span:
+        stocks = pd.read_csv(stocks_file)
+        span['rows'] = len(stocks)
     stocks = stocks.dropna()  # Remove rows with NaN values
-    stocks.to_csv(output_stocks_file, index=False)  # Save cleaned stock data
+    with trace_span('preprocess.write_clean_stocks', rows=len(stocks)):
+        stocks.to_csv(output_stocks_file, index=False)  # Save cleaned stock data
 
     # Step 2: Filter stock data based on the date range
     stocks['Date'] = pd.to_datetime(stocks['Date'])  # Convert 'Date' column to datetime format
     filtered_stocks = stocks[(stocks['Date'] >= start_date) & (stocks['Date'] <= end_date)]  # Filter by date range
 
     # Step 3: Calculate financial indicators for each stock symbol
-    stock_indicators = filtered_stocks.groupby('Symbol').agg({
-        'High': lambda x: (x - filtered_stocks['Low']).mean(),  # Daily volatility (mean difference between High and Low)
-        'Adj Close': 'mean',  # Average adjusted close price
-        'Close': lambda x: (x.iloc[-1] - x.iloc[0]) / x.iloc[0],  # Percentage return (last close / first close)
-        'Volume': 'mean'  # Average trading volume
-    }).rename(columns={
-        'High': 'Volatility',
-        'Adj Close': 'Average Close Price',
-        'Close': 'Return',
-        'Volume': 'Average Volume'
-    })
+    with trace_span('preprocess.stock_indicators', rows=len(filtered_stocks)):
+        running_state = summarize_stock_rows(filtered_stocks)
+        stock_indicators = indicators_from_running_state(running_state)
+    schema = load_criteria_schema(criteria_schema_file)
+    criteria_columns = schema_columns(schema)
+    if include_portfolio_metrics:
+        with trace_span('preprocess.portfolio_metrics', rows=len(filtered_stocks)):
+            portfolio_metrics = calculate_portfolio_metrics(filtered_stocks, index_file)
+        stock_indicators = stock_indicators.join(portfolio_metrics)
+        metric_columns = schema_columns(schema, sources=['portfolio_metrics'])
+        criteria_columns = criteria_columns + [col for col in metric_columns if col in portfolio_metrics]
+
+    # The state keeps the criteria columns (and the raw metrics) so that incremental updates rebuild
+    # the same decision matrix
+    if output_state_file is not None:
+        state = running_state.assign(**state_settings(start_date, criteria_columns, index_file))
+        if include_portfolio_metrics:
+            state = state.join(portfolio_metrics)
+        state.to_csv(output_state_file)
 
     # Step 4: Normalize the calculated financial indicators
-    def normalize_column(column):
-        """Normalize a column using min-max normalization."""
-        return (column - column.min()) / (column.max() - column.min())
-    
-    columns_to_normalize = ['Volatility', 'Average Close Price', 'Return', 'Average Volume']
-    for col in columns_to_normalize:
+    for col in stock_indicators.columns:
         stock_indicators[col] = normalize_column(stock_indicators[col])  # Normalize selected columns
 
     # Step 5: Save the stock indicators to a CSV file
@@ -60,20 +195,12 @@ def preprocess_sp500_data(start_date: str, end_date: str, stocks_file: str, comp
 
     # Step 6: Load company data and merge with stock indicators
     companies = pd.read_csv(companies_file)
-    decision_matrix = pd.merge(companies, stock_indicators, on='Symbol')  # Merge companies with stock indicators
-
-    # Step 7: Select relevant columns for the decision matrix
-    decision_matrix = decision_matrix[['Symbol', 'Shortname', 'Revenuegrowth', 'Ebitda', 'Marketcap', 'Weight',
-                                       'Volatility', 'Average Close Price', 'Return', 'Average Volume']]
 
-    # Step 8: Normalize the columns of the decision matrix
-    columns_to_normalize = ['Revenuegrowth', 'Ebitda', 'Marketcap', 'Weight', 
-                            'Volatility', 'Average Close Price', 'Return', 'Average Volume']
-    for col in columns_to_normalize:
-        decision_matrix[col] = normalize_column(decision_matrix[col])  # Normalize the decision matrix columns
+    # Steps 7-8: Select and normalize the decision matrix columns
+    with trace_span('preprocess.decision_matrix', rows=len(companies)):
+        decision_matrix = build_decision_matrix(companies, stock_indicators, criteria_columns)
 
     # Step 9: Save the complete decision matrix to a CSV file
-    decision_matrix = decision_matrix.dropna()
     decision_matrix.to_csv(output_decision_matrix_file, index=False)  # Save the complete decision matrix
 
     print(decision_matrix.head())
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']
+
+
+def load_price_panel(stocks_file=None, stocks=None):
+    """
+    Loads stock data in long format (Date, Symbol, price columns) into a dense panel.
+
+    Every price column becomes a (dates x symbols) float array, with NaN where a symbol has no
+    valid row on a date. A row counts as valid only if all price columns are present, which
+    mirrors the `dropna()` cleaning done by `preprocess_sp500_data`.
+
+    Parameters:
+    - stocks_file (str): Path to a stock data CSV file. Ignored when `stocks` is given.
+    - stocks (pd.DataFrame): Already loaded stock data.
+
+    Returns:
+    - panel (dict): Keys 'dates' (DatetimeIndex), 'symbols' (numpy array), 'valid' (bool array)
+      and one (dates x symbols) array per price column.
+    """
+    if stocks is None:
+        stocks = pd.read_csv(stocks_file)
+    stocks = stocks.dropna(subset=PRICE_COLUMNS)
+
+    date_codes, dates = pd.factorize(pd.to_datetime(stocks['Date']), sort=True)
+    symbol_codes, symbols = pd.factorize(stocks['Symbol'], sort=True)
+
+    panel = {'dates': pd.DatetimeIndex(dates), 'symbols': np.asarray(symbols)}
+    shape = (len(dates), len(symbols))
+    for column in PRICE_COLUMNS:
+        values = np.full(shape, np.nan)
+        values[date_codes, symbol_codes] = stocks[column].values
+        panel[column] = values
+    panel['valid'] = ~np.isnan(panel['Close'])
+    return panel
+
+
+def daily_returns(prices):
+    """
+    Computes simple daily returns from a (dates x symbols) price array.
+
+    Gaps are not bridged: a return is NaN when either of the two consecutive prices is missing.
+
+    Returns:
+    - numpy array: (dates - 1) x symbols array of daily returns.
+    """
+    return prices[1:] / prices[:-1] - 1
+
+
+def load_index_levels(index_file, dates):
+    """
+    Loads the S&P 500 index levels aligned to the given dates (last known level on each date).
+
+    Returns:
+    - numpy array: Index level for each of `dates`.
+    """
+    index_data = pd.read_csv(index_file)
+    index_data['Date'] = pd.to_datetime(index_data['Date'])
+    levels = index_data.set_index('Date')['S&P500'].sort_index()
+    return levels.reindex(levels.index.union(dates)).ffill().reindex(dates).values
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# One row per (symbol, column) fit attempt
+TELEMETRY_COLUMNS = ['Symbol', 'Column', 'Observations', 'Status', 'Model', 'Fit Time (s)', 'Iterations',
+                     'Converged', 'AIC', 'Exception', 'Message']
+# Status of a fit attempt:
+# - ok: the optimizer converged,
+# - not_converged: the model was fitted and forecast, but the optimizer stopped before converging,
+# - failed: fitting or forecasting raised an exception (no forecast, except for Close in the joint mode,
+#   which the fallback model forecasts so that the derived price columns exist),
+# - timeout: the fit exceeded its time budget and the fallback model forecast the series instead,
+# - skipped: the symbol has too few data points to fit.
+FIT_STATUSES = ('ok', 'not_converged', 'failed', 'timeout', 'skipped')
+DEFAULT_TELEMETRY_FILE = 'data/forecasted/arima_fit_telemetry.csv.gz'
+
+
+def fit_summary(fitted_model):
+    """
+    Extracts the optimizer iterations, convergence flag and AIC of a fitted statsmodels model.
+
+    Returns:
+    - dict: 'iterations', 'converged' and 'aic' (NaN when the model does not report them).
+    """
+    retvals = getattr(fitted_model, 'mle_retvals', None) or {}
+    return {
+        'iterations': retvals.get('iterations', np.nan),
+        'converged': retvals.get('converged', np.nan),
+        'aic': getattr(fitted_model, 'aic', np.nan),
+    }
+
+
+def fit_record(symbol, column, observations, fit_time, summary=None, exception=None, status=None, model='arima'):
+    """
+    Builds the telemetry record of one fit attempt.
+
+    Parameters:
+    - symbol (str): Stock symbol.
+    - column (str): Forecasted column.
+    - observations (int): Length of the fitted series.
+    - fit_time (float): Wall time of the fit and forecast (s).
+    - summary (dict, optional): Optimizer results of the fitted model, from `fit_summary`.
+    - exception (Exception, optional): Exception raised by the fit or forecast.
+    - status (str, optional): Status override (e.g. 'skipped' or 'timeout').
+    - model (str): Model that produced the forecast ('arima' or a fallback method), None when there is none.
+
+    Returns:
+    - dict: One telemetry row with the TELEMETRY_COLUMNS keys.
+    """
+    summary = summary or {}
+    converged = summary.get('converged', np.nan)
+    if status is None:
+        if exception is not None:
+            status = 'failed'
+        else:
+            status = 'not_converged' if converged is False else 'ok'
+
+    return {
+        'Symbol': symbol,
+        'Column': column,
+        'Observations': observations,
+        'Status': status,
+        'Model': model if status != 'skipped' else None,
+        'Fit Time (s)': fit_time,
+        'Iterations': summary.get('iterations', np.nan),
+        'Converged': converged,
+        'AIC': summary.get('aic', np.nan),
+        'Exception': type(exception).__name__ if exception is not None else None,
+        'Message': str(exception) if exception is not None else None,
+    }
+
+
+def telemetry_frame(records):
+    """
+    Converts telemetry records to a compact DataFrame (categorical text columns, 32-bit numbers).
+    """
+    telemetry = pd.DataFrame(records, columns=TELEMETRY_COLUMNS)
+    for column in ['Symbol', 'Column', 'Status', 'Model', 'Exception']:
+        telemetry[column] = telemetry[column].astype('category')
+    telemetry['Observations'] = telemetry['Observations'].astype('int32')
+    telemetry['Fit Time (s)'] = telemetry['Fit Time (s)'].astype('float32')
+    telemetry['Iterations'] = telemetry['Iterations'].astype('float32')
+    telemetry['Converged'] = telemetry['Converged'].astype('boolean')
+    return telemetry
+
+
+def write_fit_telemetry(telemetry, telemetry_file=DEFAULT_TELEMETRY_FILE):
+    """
+    Writes the telemetry to a gzip-compressed CSV file (the compression follows the file extension).
+    """
+    telemetry.to_csv(telemetry_file, index=False, float_format='%.6g')
+
+
+def load_fit_telemetry(telemetry_file=DEFAULT_TELEMETRY_FILE):
+    """
+    Reads a telemetry file written by `write_fit_telemetry`.
+
+    Returns:
+    - pd.DataFrame: The telemetry with the dtypes of `telemetry_frame`.
+    """
+    text_columns = {'Symbol': str, 'Column': str, 'Model': str, 'Exception': str, 'Message': str}
+    telemetry = pd.read_csv(telemetry_file, dtype=text_columns)
+    return telemetry_frame(telemetry.to_dict('records'))
+
+
+def slowest_fits(telemetry, n=10):
+    """
+    Returns the n slowest fit attempts, slowest first.
+    """
+    fitted = telemetry[telemetry['Status'] != 'skipped']
+    return fitted.nlargest(n, 'Fit Time (s)').reset_index(drop=True)
+
+
+def failure_report(telemetry, by='Column'):
+    """
+    Summarizes the fit attempts per group.
+
+    Parameters:
+    - telemetry (pd.DataFrame): Fit telemetry.
+    - by (str): Column to group by ('Column', 'Symbol' or 'Exception').
+
+    Returns:
+    - pd.DataFrame: Per group, the number of fits, the share failed, timed out and not converged (%),
+      the mean and 95th percentile fit time (s) and the mean number of iterations, sorted by failure rate.
+    """
+    fitted = telemetry[telemetry['Status'] != 'skipped']
+    report = fitted.groupby(by, observed=True).agg(
+        fits=('Status', 'size'),
+        failed=('Status', lambda status: (status == 'failed').mean() * 100),
+        timeout=('Status', lambda status: (status == 'timeout').mean() * 100),
+        not_converged=('Status', lambda status: (status == 'not_converged').mean() * 100),
+        mean_time=('Fit Time (s)', 'mean'),
+        p95_time=('Fit Time (s)', lambda times: times.quantile(0.95)),
+        iterations=('Iterations', 'mean'),
+    )
+    report.columns = ['Fits', 'Failure Rate (%)', 'Timeout Rate (%)', 'Not Converged (%)', 'Mean Fit Time (s)',
+                      'P95 Fit Time (s)', 'Mean Iterations']
+    return report.sort_values(['Failure Rate (%)', 'Timeout Rate (%)', 'Not Converged (%)'],
+                              ascending=False).reset_index()
@@ -1,8 +1,22 @@
 import os
 import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
 import numpy as np
 
+from src.forecasting.fit_telemetry import fit_record, telemetry_frame, write_fit_telemetry
+from src.forecasting.timed_fits import (FALLBACK_METHODS, DEFAULT_ARIMA_ORDER, fit_arima, fallback_forecast,
+                                        fallback_shock_params, run_timed_fits)
+from src.forecasting.order_selection import ORDER_CRITERIA, select_orders, load_orders, write_orders
+from src.forecasting.forecast_paths import FORECAST_STATE_COLUMNS, state_record
+from src.forecasting.joint_forecast import (DERIVED_PRICE_COLUMNS, DEFAULT_SPREAD_WINDOW, price_spreads,
+                                           joint_price_forecast)
+from src.profiling.tracing import traced, trace_span
+
+# Forecasting modes:
+# - independent: one ARIMA model per column,
+# - joint: ARIMA models for Close and Volume only, with the other price columns derived from the Close
+#   forecast by spread models (see src/forecasting/joint_forecast.py).
+FORECAST_MODES = ('independent', 'joint')
+
 def filter_invalid_data(data):
     """
     Removes rows where all financial columns are NaN for a given symbol.
@@ -18,7 +32,10 @@ def filter_invalid_data(data):
     data_cleaned = data.dropna(subset=columns_to_check, how='all')
     return data_cleaned
 
-def forecast_all_columns(data, forecast_period, output_file):
+@traced(rows_arg=0)
+def forecast_all_columns(data, forecast_period, output_file, telemetry_file=None, fit_timeout=None, n_workers=None,
+                         fallback='drift', mode='independent', spread_window=DEFAULT_SPREAD_WINDOW, state_file=None,
+                         order_selection=None, orders_file=None):
     """
     Forecasts all columns for each stock using ARIMA.
 
@@ -26,59 +43,176 @@ def forecast_all_columns(data, forecast_period, output_file):
     - data (pd.DataFrame): DataFrame containing stock data with 'Symbol', 'Date', and numeric columns to forecast.
     - forecast_period (int): Number of days to forecast.
     - output_file (str): Path to save the forecasted data as a CSV file.
+    - telemetry_file (str, optional): Path to save the per-(symbol, column) fit telemetry as a gzip-compressed
+      CSV file (see src/forecasting/fit_telemetry.py).
+    - fit_timeout (float, optional): Time budget of a single ARIMA fit (s). When set, the fits run in worker
+      processes and a series whose fit exceeds the budget is forecast with the fallback model instead.
+      When None, the fits run one after another in this process without a time limit.
+    - n_workers (int, optional): Number of worker processes when `fit_timeout` is set (default: the number of CPUs).
+    - fallback (str): Fallback model of timed out fits, 'drift' (random walk with drift) or 'ses'
+      (simple exponential smoothing).
+    - mode (str): 'independent' (one ARIMA model per column) or 'joint' (ARIMA models for Close and Volume,
+      spread models for Adj Close, Open, High and Low, keeping High >= max(Open, Close) >= min(Open, Close) >= Low).
+      A failed Close fit is replaced by the fallback model, so the derived columns are still forecast.
+    - spread_window (int): Trailing days the spreads of the joint mode are estimated on.
+    - state_file (str, optional): Path to save the shock parameters of every forecasted series (AR and MA
+      coefficients and innovation variance), from which `forecast_rank_distribution` simulates sample paths.
+    - order_selection (str, optional): 'aic' or 'bic' to select the ARIMA order of every series by a
+      stepwise search (see src/forecasting/order_selection.py), in worker processes. With `fit_timeout`
+      set, each search is time-limited too, and a series whose search fails uses ARIMA(1,1,1).
+      When None, every series uses ARIMA(1,1,1).
+    - orders_file (str, optional): Path of the ARIMA orders persisted per criterion. Series with an order
+      persisted for `order_selection` only refit that order; newly selected orders are added to the file.
+
+    Returns:
+    - pd.DataFrame: Fit telemetry with the fit time, optimizer iterations, convergence flag, AIC and
+      exception of every fit attempt.
     """
+    if mode not in FORECAST_MODES:
+        raise ValueError(f"Unknown forecasting mode '{mode}'. Use one of: {', '.join(FORECAST_MODES)}.")
+    if fallback not in FALLBACK_METHODS:
+        raise ValueError(f"Unknown fallback method '{fallback}'. Use one of: {', '.join(FALLBACK_METHODS)}.")
+    if order_selection is not None and order_selection not in ORDER_CRITERIA:
+        raise ValueError(f"Unknown order selection criterion '{order_selection}'. "
+                         f"Use one of: {', '.join(ORDER_CRITERIA)}.")
+
     output_dir = os.path.dirname(output_file)
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
     data = filter_invalid_data(data)
 
-    forecast_results = []
+    fit_records = []
+    state_records = []
 
     data['Date'] = pd.to_datetime(data['Date'])
 
     columns_to_forecast = data.select_dtypes(include=[np.number]).columns.tolist()
-
+    fit_columns = columns_to_forecast
+    if mode == 'joint':
+        missing_columns = [col for col in ['Close'] + DERIVED_PRICE_COLUMNS if col not in columns_to_forecast]
+        if missing_columns:
+            raise ValueError(f"The joint forecasting mode needs the columns: {', '.join(missing_columns)}")
+        fit_columns = [col for col in columns_to_forecast if col not in DERIVED_PRICE_COLUMNS]
+
+    # Collect the series to fit, keyed by (symbol, column, last date)
+    tasks = []
+    output_keys = []  # Every forecasted series, in symbol and column order
+    joint_inputs = {}  # Last Close and price spreads of each symbol in the joint mode
     for symbol in data['Symbol'].unique():
         stock_data = data[data['Symbol'] == symbol].sort_values('Date')
 
         # Ensure there are enough data points for ARIMA
         if len(stock_data) < 10:
             print(f"Skipping {symbol}: Not enough data points for ARIMA.")
+            fit_records.extend(fit_record(symbol, column, len(stock_data), 0.0, status='skipped')
+                               for column in columns_to_forecast)
             continue
 
-        forecasted_values = {'Symbol': [], 'Date': [], 'Column': [], 'Forecasted Value': []}
-        for column in columns_to_forecast:
-            try:
-                series = stock_data[column].values
-
-                # Fit ARIMA model
-                model = ARIMA(series, order=(1, 1, 1))  # ARIMA(1,1,1) configuration
-                fitted_model = model.fit()
-                forecast = fitted_model.forecast(steps=forecast_period)
-
-                last_date = stock_data['Date'].iloc[-1]
-                forecast_dates = [last_date + pd.Timedelta(days=i) for i in range(1, forecast_period + 1)]
-
-                for date, value in zip(forecast_dates, forecast):
-                    forecasted_values['Symbol'].append(symbol)
-                    forecasted_values['Date'].append(date)
-                    forecasted_values['Column'].append(column)
-                    forecasted_values['Forecasted Value'].append(value)
-
-            except Exception as e:
-                print(f"Error forecasting {symbol}, column {column}: {e}")
+        last_date = stock_data['Date'].iloc[-1]
+        for column in fit_columns:
+            tasks.append(((symbol, column, last_date), stock_data[column].values))
+        output_keys.extend((symbol, column, last_date) for column in columns_to_forecast)
+        if mode == 'joint':
+            last_close = stock_data['Close'].dropna().iloc[-1] if stock_data['Close'].notna().any() else np.nan
+            joint_inputs[(symbol, last_date)] = (last_close, price_spreads(stock_data, spread_window))
+
+    # Orders of the series: orders persisted for the criterion first, then a stepwise search for the others
+    orders = {}
+    if order_selection is not None:
+        persisted_orders = load_orders(orders_file, order_selection)
+        orders = {key: persisted_orders[key[:2]] for key, _ in tasks if key[:2] in persisted_orders}
+        to_select = [(key, series) for key, series in tasks if key not in orders]
+        selections = {}
+        for key, selection in select_orders(to_select, order_selection, n_workers, fit_timeout):
+            if selection['order'] is None:
+                print(f"Order selection of {key[0]}, column {key[1]} failed: {selection['exception']}. "
+                      f"Using ARIMA{DEFAULT_ARIMA_ORDER}.")
                 continue
+            orders[key] = selection['order']
+            selections[key[:2]] = selection
+        if orders_file is not None and selections:
+            write_orders(selections, orders_file)
+            print(f"ARIMA orders saved to {orders_file}")
+
+    # Fit ARIMA models, in worker processes with a time budget per fit when requested
+    if fit_timeout is None:
+        results = ((key, fit_arima(series, forecast_period, orders.get(key, DEFAULT_ARIMA_ORDER)))
+                   for key, series in tasks)
+    else:
+        results = run_timed_fits(tasks, forecast_period, fit_timeout, n_workers, orders)
+
+    series_by_key = dict(tasks)
+    forecasts_by_key = {}
+    for key, result in results:
+        symbol, column, last_date = key
+        series = series_by_key[key]
+        if result is None:
+            print(f"Fit of {symbol}, column {column} exceeded {fit_timeout} s: using the {fallback} fallback.")
+            forecast = fallback_forecast(series, forecast_period, fallback)
+            fit_records.append(fit_record(symbol, column, len(series), fit_timeout, status='timeout', model=fallback))
+            model = fallback
+            shock_params = fallback_shock_params(series, fallback)
+        elif result['exception'] is not None and mode == 'joint' and column == 'Close':
+            # The derived price columns need a Close forecast: use the fallback instead of dropping them
+            print(f"Error forecasting {symbol}, column {column}: {result['exception']}. "
+                  f"Using the {fallback} fallback.")
+            forecast = fallback_forecast(series, forecast_period, fallback)
+            fit_records.append(fit_record(symbol, column, len(series), result['fit_time'], result['summary'],
+                                          exception=result['exception'], model=fallback))
+            model = fallback
+            shock_params = fallback_shock_params(series, fallback)
+        elif result['exception'] is not None:
+            print(f"Error forecasting {symbol}, column {column}: {result['exception']}")
+            fit_records.append(fit_record(symbol, column, len(series), result['fit_time'], result['summary'],
+                                          exception=result['exception'], model=None))
+            continue
+        else:
+            forecast = result['forecast']
+            fit_records.append(fit_record(symbol, column, len(series), result['fit_time'], result['summary']))
+            model = 'arima'
+            shock_params = result['shock_params']
+        state_records.append(state_record(symbol, column, model, shock_params))
+
+        forecasts_by_key[key] = pd.DataFrame({
+            'Symbol': symbol,
+            'Date': [last_date + pd.Timedelta(days=i) for i in range(1, forecast_period + 1)],
+            'Column': column,
+            'Forecasted Value': forecast,
+            'Model': model,  # Flags the series forecast by the fallback (or spread) model
+        })
+
+    # Derive the other price columns from the Close forecast in the joint mode
+    for (symbol, last_date), (last_close, spreads) in joint_inputs.items():
+        close_frame = forecasts_by_key.get((symbol, 'Close', last_date))
+        if close_frame is None:
+            continue
+        derived = joint_price_forecast(close_frame['Forecasted Value'].values, last_close, spreads)
+        for column, values in derived.items():
+            forecasts_by_key[(symbol, column, last_date)] = close_frame.assign(
+                **{'Column': column, 'Forecasted Value': values, 'Model': 'spread'})
+            state_records.append(state_record(symbol, column, 'spread'))
+
+    # Combine all forecasted data into one DataFrame (in symbol and column order) and save
+    forecast_frames = [forecasts_by_key[key] for key in output_keys if key in forecasts_by_key]
+    all_forecasts = pd.concat(forecast_frames, ignore_index=True) if forecast_frames else pd.DataFrame(
+        columns=['Symbol', 'Date', 'Column', 'Forecasted Value', 'Model'])
+    with trace_span('forecast.write_csv', rows=len(all_forecasts)):
+        all_forecasts.to_csv(output_file, index=False)
+    print(f"Forecast saved to {output_file}")
 
-        forecast_df = pd.DataFrame(forecasted_values)
-        forecast_results.append(forecast_df)
+    if state_file is not None:
+        pd.DataFrame(state_records, columns=FORECAST_STATE_COLUMNS).to_csv(state_file, index=False)
+        print(f"Forecast state saved to {state_file}")
 
-    # Combine all forecasted data into one DataFrame and save
-    all_forecasts = pd.concat(forecast_results, ignore_index=True)
-    all_forecasts.to_csv(output_file, index=False)
-    print(f"Forecast saved to {output_file}")
+    telemetry = telemetry_frame(fit_records)
+    if telemetry_file is not None:
+        write_fit_telemetry(telemetry, telemetry_file)
+        print(f"Fit telemetry saved to {telemetry_file}")
+    return telemetry
 
 
+@traced()
 def transform_forecast_data(forecast_file, output_file):
     """
     Transforms the forecast data from the format 'Symbol, Date, Column, Forecasted Value'
@@ -89,10 +223,13 @@ def transform_forecast_data(forecast_file, output_file):
     - output_file (str): Path to save the transformed data as a CSV file.
     """
     # Read the forecast data
-    forecast_data = pd.read_csv(forecast_file)
+    with trace_span('forecast.read_csv') as span:
+        forecast_data = pd.read_csv(forecast_file)
+        span['rows'] = len(forecast_data)
 
     # Pivot the data to get the desired format
-    pivot_data = forecast_data.pivot_table(index=['Date', 'Symbol'], columns='Column', values='Forecasted Value').reset_index()
+    with trace_span('forecast.pivot', rows=len(forecast_data)):
+        pivot_data = forecast_data.pivot_table(index=['Date', 'Symbol'], columns='Column', values='Forecasted Value').reset_index()
 
     # Rename columns to match the desired format
     pivot_data.columns.name = None
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.price_panel import PRICE_COLUMNS
+from src.backtest.bootstrap import (resolve_criteria, indicator_setup, rank_indicator_replicates, run_rank_chunks,
+                                    rank_distribution)
+from src.profiling.tracing import traced
+
+DEFAULT_FORECAST_STATE_FILE = 'data/forecasted/forecast_state.csv'
+# Per-(symbol, column) shock parameters of the forecast models, written by `forecast_all_columns`
+# (AR and MA hold the space-separated coefficients of every lag)
+FORECAST_STATE_COLUMNS = ['Symbol', 'Column', 'Model', 'D', 'AR', 'MA', 'Sigma2']
+
+
+def state_record(symbol, column, model, shock_params=None):
+    """
+    Builds one row of the forecast state file.
+
+    Parameters:
+    - shock_params (dict, optional): 'ar', 'ma', 'd' and 'sigma2' of the model (see `arima_shock_params`);
+      None for the spread-derived columns of the joint mode, which follow the simulated Close.
+    """
+    if shock_params is None:
+        return {'Symbol': symbol, 'Column': column, 'Model': model, 'D': np.nan, 'AR': '', 'MA': '',
+                'Sigma2': np.nan}
+    return {'Symbol': symbol, 'Column': column, 'Model': model, 'D': shock_params['d'],
+            'AR': ' '.join(repr(value) for value in shock_params['ar']),
+            'MA': ' '.join(repr(value) for value in shock_params['ma']), 'Sigma2': shock_params['sigma2']}
+
+
+def _lag_coefficients(column):
+    """(series x lags) array of space-separated coefficients, zero-padded to the longest."""
+    coefficients = [[float(value) for value in str(text).split()] if isinstance(text, str) else []
+                    for text in column]
+    lags = max([len(values) for values in coefficients] + [0])
+    padded = np.zeros((len(coefficients), lags))
+    for row, values in enumerate(coefficients):
+        padded[row, :len(values)] = values
+    return padded
+
+
+def shock_paths(ar, ma, d, sigma2, n_paths, forecast_period, rng):
+    """
+    Simulates the deviations of ARIMA(p, d, q) sample paths from their point forecast.
+
+    Future values of a linear Gaussian model are the point forecast plus the response to the future
+    shocks, which follows u_h = sum_i ar_i u_{h-i} + e_h + sum_j ma_j e_{h-j} on the differenced series
+    (no shocks before the forecast), integrated d times into levels. The recursion runs once over the
+    forecast days, vectorized over every series and path.
+
+    Parameters:
+    - ar, ma (numpy array): (series x lags) AR and MA coefficients of every series (zero-padded).
+    - d (numpy array): Differencing order of every series.
+    - sigma2 (numpy array): Innovation variance of every series.
+    - n_paths (int): Number of sample paths per series.
+    - forecast_period (int): Number of forecasted days.
+    - rng (numpy Generator): Random number generator.
+
+    Returns:
+    - numpy array: (series x paths x days) deviations from the point forecast.
+    """
+    scale = np.sqrt(np.nan_to_num(np.maximum(np.asarray(sigma2, dtype=float), 0.0)))
+    ar = np.asarray(ar, dtype=float).reshape(len(scale), -1)
+    ma = np.asarray(ma, dtype=float).reshape(len(scale), -1)
+    d = np.asarray(d, dtype=int)
+    shocks = rng.standard_normal((len(scale), n_paths, forecast_period)) * scale[:, None, None]
+
+    differences = shocks.copy()
+    for day in range(forecast_period):
+        for lag in range(1, min(ar.shape[1], day) + 1):
+            differences[:, :, day] += ar[:, lag - 1, None] * differences[:, :, day - lag]
+        for lag in range(1, min(ma.shape[1], day) + 1):
+            differences[:, :, day] += ma[:, lag - 1, None] * shocks[:, :, day - lag]
+
+    # Integrate every series d times
+    for integration in range(int(d.max(initial=0))):
+        differences = np.where((d > integration)[:, None, None], np.cumsum(differences, axis=2), differences)
+    return differences
+
+
+def path_indicators(paths, valid, first_valid, last_valid):
+    """
+    Computes the raw stock indicators of every sample path, as `preprocess_sp500_data` does for the
+    point forecast (means over the valid forecasted days, return from the first to the last Close).
+
+    Parameters:
+    - paths (dict): (symbols x paths x days) values of every price column.
+    - valid (numpy array): (symbols x days) days on which every column of the symbol is forecast.
+    - first_valid, last_valid (numpy array): First and last valid day of every symbol.
+
+    Returns:
+    - numpy array: (paths x symbols x INDICATOR_COLUMNS) indicators.
+    """
+    count = valid.sum(axis=1)[:, None]
+    valid = valid[:, None, :]
+    symbols = np.arange(len(first_valid))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_close = paths['Close'][symbols, :, first_valid]
+        last_close = paths['Close'][symbols, :, last_valid]
+        indicators = np.stack([
+            np.where(valid, paths['High'] - paths['Low'], 0.0).sum(axis=2) / count,  # Volatility
+            np.where(valid, paths['Adj Close'], 0.0).sum(axis=2) / count,  # Average Close Price
+            (last_close - first_close) / first_close,  # Return
+            np.where(valid, paths['Volume'], 0.0).sum(axis=2) / count,  # Average Volume
+        ], axis=-1)
+    return indicators.transpose(1, 0, 2)
+
+
+def forecast_rank_chunk(setup, chunk_index, n_paths):
+    """
+    Ranks the alternatives of `n_paths` simulated forecast paths with every method.
+
+    Every column with shock parameters gets its own paths around its point forecast; the spread-derived
+    columns of the joint mode move proportionally with the simulated Close. The chunk has its own random
+    stream (seeded by the chunk index), so the paths do not depend on the number of workers.
+
+    Returns:
+    - numpy array: (paths x alternatives x methods) ranks.
+    """
+    rng = np.random.default_rng([setup['seed'], chunk_index])
+    paths = {}
+    for column in PRICE_COLUMNS:
+        point = setup['point'][column][:, None, :]
+        shock = setup['shock'][column]
+        paths[column] = point + shock_paths(shock['ar'], shock['ma'], shock['d'], shock['sigma2'], n_paths,
+                                            point.shape[2], rng)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        close_ratio = paths['Close'] / setup['point']['Close'][:, None, :]
+    for column in setup['derived']:
+        derived = setup['derived'][column][:, None, None]
+        paths[column] = np.where(derived, setup['point'][column][:, None, :] * close_ratio, paths[column])
+
+    indicators = path_indicators(paths, setup['valid'], setup['first_valid'], setup['last_valid'])
+    missing = np.isnan(indicators)
+    indicators[missing] = np.broadcast_to(setup['point_indicators'], indicators.shape)[missing]
+    return rank_indicator_replicates(setup, indicators)
+
+
+@traced()
+def forecast_rank_distribution(forecast_file, state_file, companies_file, n_paths=200, confidence=0.9, top_k=10,
+                               weights=None, criteria_types=None, criteria_columns=None, method_names=None,
+                               chunk_size=20, n_workers=None, seed=0):
+    """
+    Distribution of the forecasted rankings over simulated forecast paths.
+
+    The point forecast (from `forecast_all_columns` and `transform_forecast_data`) gives a single
+    forecasted decision matrix. Here every forecasted series gets `n_paths` sample paths from the shock
+    parameters of its fitted model (see `shock_paths`); the forecasted indicators, the decision matrix
+    and the ranks of every method are computed for all paths of a chunk at once, and only per-stock rank
+    counts are kept. The chunks run across `n_workers` processes.
+
+    Parameters:
+    - forecast_file (str): Path to the forecast in the format 'Date, Symbol, Adj Close, Close, High, Low, Open, Volume'.
+    - state_file (str): Path to the forecast state file written by `forecast_all_columns`.
+    - companies_file (str): Path to the SP500 companies data CSV file.
+    - n_paths (int): Number of simulated paths.
+    - confidence (float): Confidence level of the rank intervals.
+    - top_k (int): Size of the top group whose membership probability is reported.
+    - weights (list of float): Criteria weights (default: the criteria schema weights).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - criteria_columns (list of str): Company and indicator columns of the decision matrix
+      (default: the company and indicator criteria of the criteria schema).
+    - method_names (list of str): Methods to rank with (default: all of MCDM_METHODS).
+    - chunk_size (int): Number of paths per chunk.
+    - n_workers (int, optional): Number of worker processes (default: the number of CPUs).
+    - seed (int): Seed of the random streams.
+
+    Returns:
+    - pd.DataFrame: One row per stock and method with the rank of the point forecast, the median rank
+      over the paths, the confidence interval of the rank and the probability of being in the top k.
+    """
+    criteria_columns, weights, criteria_types, method_names = resolve_criteria(
+        criteria_columns, weights, criteria_types, method_names)
+
+    # Step 1: Point forecasts as (symbols x days) arrays and the shock parameters of every series
+    forecast = pd.read_csv(forecast_file, parse_dates=['Date'])
+    state = pd.read_csv(state_file, dtype={'AR': str, 'MA': str}).set_index(['Symbol', 'Column'])
+    symbols = np.sort(forecast['Symbol'].unique())
+    dates = np.sort(forecast['Date'].unique())
+    point = {column: forecast.pivot_table(index='Symbol', columns='Date', values=column, dropna=False)
+             .reindex(index=symbols, columns=dates).values for column in PRICE_COLUMNS}
+
+    # Step 2: Point-forecast indicators, as `preprocess_sp500_data` computes them from the forecast
+    valid = np.all([np.isfinite(point[column]) for column in PRICE_COLUMNS], axis=0)
+    has_data = valid.any(axis=1)
+    first_valid = np.argmax(valid, axis=1)
+    last_valid = valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    point_indicators = path_indicators({column: values[:, None, :] for column, values in point.items()},
+                                       valid, first_valid, last_valid)[0]
+    point_indicators[~has_data] = np.nan
+
+    companies = pd.read_csv(companies_file)
+    setup, stocks_info, symbol_rows = indicator_setup(companies, symbols, point_indicators, criteria_columns,
+                                                      weights, criteria_types, method_names)
+
+    # Step 3: Shock parameters of the stocks of the decision matrix (no shocks when a series has none)
+    shock = {}
+    derived = {}
+    for column in PRICE_COLUMNS:
+        params = state.reindex(pd.MultiIndex.from_arrays([symbols[symbol_rows], [column] * len(symbol_rows)]))
+        shock[column] = {'ar': _lag_coefficients(params['AR']), 'ma': _lag_coefficients(params['MA']),
+                         'd': params['D'].fillna(0).astype(int).values, 'sigma2': params['Sigma2'].fillna(0.0).values}
+        derived[column] = (params['Model'] == 'spread').values
+    setup.update({
+        'point': {column: values[symbol_rows] for column, values in point.items()},
+        'shock': shock,
+        'derived': {column: is_derived for column, is_derived in derived.items() if is_derived.any()},
+        'valid': valid[symbol_rows],
+        'first_valid': first_valid[symbol_rows],
+        'last_valid': last_valid[symbol_rows],
+        'seed': seed,
+    })
+
+    # Steps 4-5: Rank the paths chunk by chunk and summarize the rank counts of every stock and method
+    rank_chunks = run_rank_chunks(forecast_rank_chunk, setup, n_paths, chunk_size, n_workers)
+    return rank_distribution(rank_chunks, setup, stocks_info, n_paths, confidence, top_k)
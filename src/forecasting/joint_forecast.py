@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# Columns fitted with their own ARIMA model in the joint forecasting mode
+JOINT_FIT_COLUMNS = ['Close', 'Volume']
+# Price columns derived from the Close forecast with spread models in the joint forecasting mode
+DERIVED_PRICE_COLUMNS = ['Adj Close', 'Open', 'High', 'Low']
+DEFAULT_SPREAD_WINDOW = 60  # Trailing days the mean spreads are estimated on
+
+
+def _mean_log_ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_ratio = np.log(numerator / denominator)
+    log_ratio = log_ratio.replace([np.inf, -np.inf], np.nan).mean()
+    return 0.0 if pd.isna(log_ratio) else float(log_ratio)
+
+
+def price_spreads(stock_data, window=DEFAULT_SPREAD_WINDOW):
+    """
+    Estimates the mean log spreads of the price columns relative to Close over the trailing window.
+
+    Parameters:
+    - stock_data (pd.DataFrame): Data of one stock sorted by date, with 'Adj Close', 'Close', 'High',
+      'Low' and 'Open' columns.
+    - window (int): Number of trailing days to estimate the spreads on.
+
+    Returns:
+    - dict: Mean log ratios 'adj_close' (Adj Close / Close), 'gap' (Open / previous Close), 'high'
+      (High / max(Open, Close), at least 0) and 'low' (Low / min(Open, Close), at most 0).
+    """
+    recent = stock_data.tail(window + 1)
+    close, open_ = recent['Close'], recent['Open']
+    spreads = {
+        'adj_close': _mean_log_ratio(recent['Adj Close'], close),
+        'gap': _mean_log_ratio(open_, close.shift(1)),
+        'high': _mean_log_ratio(recent['High'], np.maximum(open_, close)),
+        'low': _mean_log_ratio(recent['Low'], np.minimum(open_, close)),
+    }
+    spreads['high'] = max(spreads['high'], 0.0)
+    spreads['low'] = min(spreads['low'], 0.0)
+    return spreads
+
+
+def joint_price_forecast(close_forecast, last_close, spreads):
+    """
+    Derives the Adj Close, Open, High and Low forecasts from the Close forecast and the price spreads.
+
+    The forecasts always satisfy High >= max(Open, Close) >= min(Open, Close) >= Low.
+
+    Parameters:
+    - close_forecast (numpy array): Forecasted Close values.
+    - last_close (float): Last observed Close value (the previous Close of the first forecasted Open).
+    - spreads (dict): Mean log spreads from `price_spreads`.
+
+    Returns:
+    - dict: Forecasted values of 'Adj Close', 'Open', 'High' and 'Low'.
+    """
+    close = np.asarray(close_forecast, dtype=float)
+    previous_close = np.concatenate([[last_close], close[:-1]])
+    open_ = previous_close * np.exp(spreads['gap'])
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    # The outer maximum / minimum keep the ordering for non-positive forecasts as well
+    high = np.maximum(body_high * np.exp(spreads['high']), body_high)
+    low = np.minimum(body_low * np.exp(spreads['low']), body_low)
+    return {
+        'Adj Close': close * np.exp(spreads['adj_close']),
+        'Open': open_,
+        'High': high,
+        'Low': low,
+    }
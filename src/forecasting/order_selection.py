@@ -0,0 +1,198 @@
+import os
+import time
+import warnings
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.stattools import adfuller
+
+from src.forecasting.timed_fits import run_timed_tasks
+from src.profiling.tracing import trace_span
+
+ORDER_CRITERIA = ('aic', 'bic')
+DEFAULT_ORDERS_FILE = 'data/forecasted/arima_orders.csv'
+# Persisted order of every (symbol, column, criterion), written by `write_orders`
+ORDERS_COLUMNS = ['Symbol', 'Column', 'P', 'D', 'Q', 'Criterion', 'Score', 'Candidates']
+MAX_P, MAX_D, MAX_Q = 3, 2, 3  # Bounds of the searched (p, d, q) grid
+ADF_ALPHA = 0.05  # Significance level of the unit-root test choosing d
+MAX_CANDIDATES = 16  # Candidate fits per series before the stepwise search stops
+# Search time of a series with a fit time budget, in fit budgets: the search stops starting candidates
+# after SEARCH_TIMEOUT_FITS budgets, and is terminated one budget later (the last candidate's own budget)
+SEARCH_TIMEOUT_FITS = 4
+
+
+def differencing_order(series, max_d=MAX_D, alpha=ADF_ALPHA):
+    """
+    Chooses the differencing order d with augmented Dickey-Fuller tests: the series is differenced until
+    the test rejects a unit root at level `alpha` (or d reaches `max_d`).
+
+    Returns:
+    - d (int): Differencing order.
+    - p_value (float): p-value of the last test.
+    """
+    values = np.asarray(series, dtype=float)
+    values = values[~np.isnan(values)]
+    p_value = np.nan
+    for d in range(max_d + 1):
+        if len(values) < 10 or np.ptp(values) == 0:
+            return d, p_value
+        p_value = adfuller(values, autolag='AIC')[1]
+        if p_value < alpha or d == max_d:
+            return d, p_value
+        values = np.diff(values)
+    return max_d, p_value
+
+
+def select_order(series, criterion='aic', max_p=MAX_P, max_d=MAX_D, max_q=MAX_Q, time_budget=None):
+    """
+    Selects the ARIMA order of a series by a stepwise search over (p, q) minimizing AIC or BIC.
+
+    The differencing order comes from one unit-root test sequence (`differencing_order`), and the series
+    is differenced once: every candidate is an ARMA(p, q) fit of the same differenced series, which
+    equals the ARIMA(p, d, q) fit and keeps the information criteria comparable. The search starts from
+    (2, 2), (0, 0), (1, 0) and (0, 1), then moves to the best neighbour (p or q changed by one) until no
+    neighbour improves the criterion, fitting at most MAX_CANDIDATES candidates. Once `time_budget` is
+    spent, no new candidate is fitted and the best order so far is returned.
+
+    Parameters:
+    - series (numpy array): Series to model.
+    - criterion (str): 'aic' or 'bic'.
+    - max_p, max_d, max_q (int): Largest orders searched.
+    - time_budget (float, optional): Search time after which no new candidate is fitted (s).
+
+    Returns:
+    - dict: 'order' (p, d, q), 'criterion', 'score' (criterion value of the order), 'candidates' (number
+      of fitted candidates) and 'adf_pvalue' (p-value of the last unit-root test).
+    """
+    if criterion not in ORDER_CRITERIA:
+        raise ValueError(f"Unknown order selection criterion '{criterion}'. Use one of: {', '.join(ORDER_CRITERIA)}.")
+    d, adf_pvalue = differencing_order(series, max_d)
+    differenced = np.diff(np.asarray(series, dtype=float), n=d)
+    trend = 'c' if d == 0 else 'n'  # As ARIMA: a constant only for undifferenced series
+    scores = {}
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    def out_of_time():
+        return deadline is not None and time.perf_counter() > deadline
+
+    def score(p, q):
+        if (p, q) not in scores:
+            if scores and out_of_time():
+                return np.inf  # Not fitted: keep the best order so far
+            try:
+                with trace_span('forecast.order_candidate', rows=len(differenced)), warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    fitted_model = ARIMA(differenced, order=(p, 0, q), trend=trend).fit()
+                scores[(p, q)] = float(getattr(fitted_model, criterion))
+            except Exception:
+                scores[(p, q)] = np.inf
+        return scores[(p, q)]
+
+    starts = {(min(p, max_p), min(q, max_q)) for p, q in [(2, 2), (0, 0), (1, 0), (0, 1)]}
+    best = min(sorted(starts), key=lambda order: score(*order))
+    while len(scores) < MAX_CANDIDATES and not out_of_time():
+        p, q = best
+        neighbours = [(p + dp, q + dq) for dp, dq in [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1)]
+                      if 0 <= p + dp <= max_p and 0 <= q + dq <= max_q and (p + dp, q + dq) not in scores]
+        if not neighbours:
+            break
+        candidate = min(neighbours, key=lambda order: score(*order))
+        if scores.get(candidate, np.inf) >= scores[best]:
+            break
+        best = candidate
+
+    if not np.isfinite(scores[best]):
+        raise ValueError("No candidate ARIMA model could be fitted.")
+    return {'order': (best[0], d, best[1]), 'criterion': criterion, 'score': scores[best],
+            'candidates': len(scores), 'adf_pvalue': adf_pvalue}
+
+
+def _select_series(series, criterion, time_budget=None):
+    try:
+        return {**select_order(series, criterion, time_budget=time_budget), 'exception': None}
+    except Exception as e:
+        return {'order': None, 'exception': f"{type(e).__name__}: {e}"}
+
+
+def _select_task(task):
+    key, series, criterion = task
+    return key, _select_series(series, criterion)
+
+
+def select_orders(tasks, criterion='aic', n_workers=None, fit_timeout=None):
+    """
+    Selects the ARIMA order of many series, in worker processes.
+
+    Parameters:
+    - tasks (list of tuple): (key, series) pairs.
+    - criterion (str): 'aic' or 'bic'.
+    - n_workers (int, optional): Number of worker processes (default: the number of CPUs).
+    - fit_timeout (float, optional): Time budget of a single ARIMA fit (s). When set, the search of a
+      series stops fitting candidates after SEARCH_TIMEOUT_FITS budgets, and a search still running one
+      budget later is terminated (see `run_timed_tasks`). When None, the searches have no time limit.
+
+    Yields:
+    - (key, selection): The result of `select_order` ('order' is None, with an 'exception', when the
+      search failed or was terminated), in completion order.
+    """
+    if not tasks:
+        return
+    if fit_timeout is not None:
+        time_budget = SEARCH_TIMEOUT_FITS * fit_timeout
+        jobs = [(key, _select_series, (series, criterion, time_budget)) for key, series in tasks]
+        for key, selection in run_timed_tasks(jobs, time_budget + fit_timeout, n_workers):
+            if selection is None:
+                selection = {'order': None, 'exception': f"search exceeded {time_budget + fit_timeout} s"}
+            yield key, selection
+        return
+    jobs = [(key, series, criterion) for key, series in tasks]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(jobs))
+    if n_workers <= 1:
+        yield from map(_select_task, jobs)
+        return
+    with multiprocessing.get_context().Pool(n_workers) as pool:
+        yield from pool.imap_unordered(_select_task, jobs)
+
+
+def load_orders(orders_file, criterion):
+    """
+    Loads the ARIMA orders persisted for a selection criterion.
+
+    Parameters:
+    - orders_file (str): Path of the orders CSV file.
+    - criterion (str): 'aic' or 'bic'; the orders selected by the other criterion are ignored.
+
+    Returns:
+    - dict: (symbol, column) -> (p, d, q); empty when the file does not exist.
+    """
+    if orders_file is None or not os.path.exists(orders_file):
+        return {}
+    orders = pd.read_csv(orders_file)
+    orders = orders[orders['Criterion'] == criterion]
+    return {(symbol, column): (int(p), int(d), int(q))
+            for symbol, column, p, d, q in orders[['Symbol', 'Column', 'P', 'D', 'Q']].itertuples(index=False)}
+
+
+def write_orders(selections, orders_file):
+    """
+    Persists selected ARIMA orders, replacing the earlier orders of the same (symbol, column, criterion).
+
+    Parameters:
+    - selections (dict): (symbol, column) -> selection from `select_order`.
+    - orders_file (str): Path of the orders CSV file.
+    """
+    rows = pd.DataFrame([
+        {'Symbol': symbol, 'Column': column, 'P': selection['order'][0], 'D': selection['order'][1],
+         'Q': selection['order'][2], 'Criterion': selection['criterion'], 'Score': selection['score'],
+         'Candidates': selection['candidates']}
+        for (symbol, column), selection in selections.items()
+    ], columns=ORDERS_COLUMNS)
+    if os.path.exists(orders_file):
+        earlier = pd.read_csv(orders_file)
+        key_columns = ['Symbol', 'Column', 'Criterion']
+        replaced = earlier.set_index(key_columns).index.isin(rows.set_index(key_columns).index)
+        rows = pd.concat([earlier[~replaced], rows], ignore_index=True)
+    os.makedirs(os.path.dirname(orders_file) or '.', exist_ok=True)
+    rows.to_csv(orders_file, index=False)
@@ -0,0 +1,244 @@
+import os
+import time
+import warnings
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+from src.forecasting.fit_telemetry import fit_summary
+from src.profiling.tracing import trace_span
+
+# Cheap deterministic models used when an ARIMA fit exceeds its time budget:
+# - drift: random walk with drift (last value plus the mean step of the series per day),
+# - ses: simple exponential smoothing (flat forecast at the smoothed level).
+FALLBACK_METHODS = ('drift', 'ses')
+SES_ALPHA = 0.3  # Smoothing factor of the 'ses' fallback
+DEFAULT_ARIMA_ORDER = (1, 1, 1)  # Order of every series without a selected order (see order_selection.py)
+
+
+def fit_arima(series, forecast_period, order=DEFAULT_ARIMA_ORDER):
+    """
+    Fits an ARIMA model to a series and forecasts it.
+
+    Parameters:
+    - series (numpy array): Series to fit.
+    - forecast_period (int): Number of days to forecast.
+    - order (tuple): ARIMA order (p, d, q).
+
+    Returns:
+    - dict: 'forecast' (numpy array, or None when the fit failed), 'fit_time' (s), 'summary' (optimizer
+      results from `fit_summary`, or None), 'shock_params' (from `arima_shock_params`, or None) and
+      'exception' (the exception raised, or None).
+    """
+    fitted_model = None
+    start = time.perf_counter()
+    try:
+        # Non-convergence is recorded in the fit telemetry instead of warned about
+        with trace_span('forecast.arima_fit', rows=len(series)), warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            model = ARIMA(series, order=tuple(order))
+            fitted_model = model.fit()
+            forecast = fitted_model.forecast(steps=forecast_period)
+        return {'forecast': np.asarray(forecast), 'fit_time': time.perf_counter() - start,
+                'summary': fit_summary(fitted_model), 'shock_params': arima_shock_params(fitted_model),
+                'exception': None}
+    except Exception as e:
+        return {'forecast': None, 'fit_time': time.perf_counter() - start,
+                'summary': fit_summary(fitted_model) if fitted_model is not None else None,
+                'shock_params': None, 'exception': e}
+
+
+def arima_shock_params(fitted_model):
+    """
+    Extracts the parameters that propagate future shocks through a fitted ARIMA model.
+
+    Returns:
+    - dict: 'ar' and 'ma' coefficients (lists) of the differenced series, the differencing order 'd' and
+      the innovation variance 'sigma2'.
+    """
+    params = dict(zip(fitted_model.param_names, np.asarray(fitted_model.params, dtype=float)))
+    return {'ar': [float(value) for value in fitted_model.arparams],
+            'ma': [float(value) for value in fitted_model.maparams],
+            'd': int(fitted_model.model.k_diff), 'sigma2': params.get('sigma2', np.nan)}
+
+
+def fallback_forecast(series, forecast_period, method='drift'):
+    """
+    Forecasts a series with a cheap deterministic model (see FALLBACK_METHODS).
+
+    Parameters:
+    - series (numpy array): Series to forecast (NaN values are ignored).
+    - forecast_period (int): Number of days to forecast.
+    - method (str): 'drift' or 'ses'.
+
+    Returns:
+    - numpy array: Forecasted values.
+    """
+    values = np.asarray(series, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return np.full(forecast_period, np.nan)
+
+    if method == 'drift':
+        drift = (values[-1] - values[0]) / (len(values) - 1) if len(values) > 1 else 0.0
+        return values[-1] + drift * np.arange(1, forecast_period + 1)
+    if method == 'ses':
+        level = values[0]
+        for value in values[1:]:
+            level = SES_ALPHA * value + (1 - SES_ALPHA) * level
+        return np.full(forecast_period, level)
+    raise ValueError(f"Unknown fallback method '{method}'. Use one of: {', '.join(FALLBACK_METHODS)}.")
+
+
+def fallback_shock_params(series, method='drift'):
+    """
+    Shock parameters of a fallback model, in the form of `arima_shock_params`.
+
+    The drift model is a random walk (ARIMA(0,1,0)) and simple exponential smoothing is an ARIMA(0,1,1)
+    with MA coefficient SES_ALPHA - 1; both use the variance of the daily changes as innovation variance.
+    """
+    values = np.asarray(series, dtype=float)
+    values = values[~np.isnan(values)]
+    sigma2 = float(np.var(np.diff(values))) if len(values) > 2 else 0.0
+    if method == 'drift':
+        return {'ar': [], 'ma': [], 'd': 1, 'sigma2': sigma2}
+    if method == 'ses':
+        return {'ar': [], 'ma': [SES_ALPHA - 1], 'd': 1, 'sigma2': sigma2}
+    raise ValueError(f"Unknown fallback method '{method}'. Use one of: {', '.join(FALLBACK_METHODS)}.")
+
+
+def _task_worker(connection):
+    """Worker process: runs the function calls received on the connection until it receives None."""
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        key, function, args = task
+        result = function(*args)
+        try:
+            connection.send((key, result))
+        except Exception:
+            # The exception could not be pickled: send its description instead
+            exception = result['exception']
+            result['exception'] = RuntimeError(f"{type(exception).__name__}: {exception}")
+            connection.send((key, result))
+
+
+def _start_worker(context):
+    parent_connection, child_connection = context.Pipe()
+    process = context.Process(target=_task_worker, args=(child_connection,), daemon=True)
+    process.start()
+    child_connection.close()
+    return {'process': process, 'connection': parent_connection, 'key': None, 'started': None}
+
+
+def _stop_worker(worker, graceful=True):
+    if graceful and worker['process'].is_alive():
+        try:
+            worker['connection'].send(None)
+            worker['process'].join(timeout=1)
+        except (BrokenPipeError, OSError):
+            pass
+    if worker['process'].is_alive():
+        worker['process'].terminate()
+        worker['process'].join()
+    worker['connection'].close()
+
+
+def run_timed_tasks(jobs, timeout, n_workers=None, exit_result=None):
+    """
+    Runs function calls in worker processes, each call within a time budget.
+
+    Every worker runs one call at a time. A worker whose call exceeds `timeout` is terminated and
+    replaced, so one pathological input cannot stall the others and the total time stays bounded by
+    roughly len(jobs) / n_workers * timeout.
+
+    Parameters:
+    - jobs (list of (key, function, tuple)): Calls to run, each with a key identifying it. The functions
+      are module-level (picklable) and return a dict with an 'exception' entry.
+    - timeout (float): Time budget of a single call (s).
+    - n_workers (int, optional): Number of worker processes (default: the number of CPUs).
+    - exit_result (callable, optional): Builds the result of a call whose worker died, from the elapsed
+      time and the exception (default: {'exception': exception}).
+
+    Yields:
+    - (key, dict or None): The result of each call in completion order, or None when it timed out.
+    """
+    if not jobs:
+        return
+    n_workers = min(n_workers or os.cpu_count() or 1, len(jobs))
+    context = multiprocessing.get_context()
+    pending = deque(jobs)
+
+    def dispatch(worker):
+        if pending:
+            key, function, args = pending.popleft()
+            worker['connection'].send((key, function, args))
+            worker['key'], worker['started'] = key, time.perf_counter()
+
+    workers = [_start_worker(context) for _ in range(n_workers)]
+    try:
+        for worker in workers:
+            dispatch(worker)
+
+        while True:
+            busy = [index for index, worker in enumerate(workers) if worker['key'] is not None]
+            if not busy:
+                break
+            deadline = min(workers[index]['started'] for index in busy) + timeout
+            ready = wait([workers[index]['connection'] for index in busy],
+                         timeout=max(deadline - time.perf_counter(), 0))
+
+            for index in busy:
+                worker = workers[index]
+                key = worker['key']
+                if worker['connection'] in ready:
+                    try:
+                        key, result = worker['connection'].recv()
+                    except EOFError:
+                        # The worker died (e.g. killed by the OS): report the call as failed and replace it
+                        exception = RuntimeError("Worker process exited unexpectedly")
+                        elapsed = time.perf_counter() - worker['started']
+                        result = exit_result(elapsed, exception) if exit_result else {'exception': exception}
+                        _stop_worker(worker, graceful=False)
+                        worker = workers[index] = _start_worker(context)
+                    worker['key'] = None
+                    yield key, result
+                    dispatch(worker)
+                elif time.perf_counter() - worker['started'] >= timeout:
+                    # Over budget: terminate the worker and give its slot to a fresh one
+                    _stop_worker(worker, graceful=False)
+                    worker = workers[index] = _start_worker(context)
+                    yield key, None
+                    dispatch(worker)
+    finally:
+        for worker in workers:
+            _stop_worker(worker)
+
+
+def _failed_fit(fit_time, exception):
+    return {'forecast': None, 'fit_time': fit_time, 'summary': None, 'shock_params': None, 'exception': exception}
+
+
+def run_timed_fits(tasks, forecast_period, fit_timeout, n_workers=None, orders=None):
+    """
+    Fits ARIMA models in worker processes, each fit within a time budget (see `run_timed_tasks`).
+
+    Parameters:
+    - tasks (list of (key, numpy array)): Series to fit, each with a key identifying it.
+    - forecast_period (int): Number of days to forecast.
+    - fit_timeout (float): Time budget of a single fit (s).
+    - n_workers (int, optional): Number of worker processes (default: the number of CPUs).
+    - orders (dict, optional): ARIMA order of the tasks by key (default: DEFAULT_ARIMA_ORDER).
+
+    Yields:
+    - (key, dict or None): The result of `fit_arima` for each task in completion order, or None when the
+      fit timed out.
+    """
+    jobs = [(key, fit_arima, (series, forecast_period, (orders or {}).get(key, DEFAULT_ARIMA_ORDER)))
+            for key, series in tasks]
+    yield from run_timed_tasks(jobs, fit_timeout, n_workers, exit_result=_failed_fit)
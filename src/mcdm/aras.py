@@ -1,8 +1,22 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
 
-def aras(decision_matrix, weights, criteria_types):
+from src.mcdm.workspace import working_copy
+from src.profiling.tracing import traced
+
+def aras_standardize(matrix):
+    """
+    Standardizes a decision matrix in place (as sklearn's StandardScaler: population std, constant
+    columns are only centered).
+    """
+    matrix -= matrix.mean(axis=0)
+    std = np.sqrt(np.einsum('ij,ij->j', matrix, matrix) / matrix.shape[0])
+    std[std < 10 * np.finfo(std.dtype).eps] = 1.0
+    matrix /= std
+    return matrix
+
+@traced(rows_arg=0)
+def aras(decision_matrix, weights, criteria_types, dtype=None, workspace=None):
     """
     Implements the ARAS (Additive Ratio Assessment) method for multi-criteria decision-making.
     
@@ -10,31 +24,33 @@ def aras(decision_matrix, weights, criteria_types):
     - decision_matrix (numpy array): The decision matrix (rows = alternatives, cols = criteria).
     - weights (numpy array): Weights for each criterion.
     - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
     
     Returns:
-    - rankings (numpy array): Indices of alternatives sorted by their scores (descending).
+    - rankings (numpy array): Indices of alternatives sorted by their scores (descending, ties keep their original order).
     - scores (numpy array): Utility scores for each alternative.
     """
-    # Step 1: Standardize the decision matrix (using StandardScaler)
-    scaler = StandardScaler()
-    norm_matrix = scaler.fit_transform(decision_matrix)
+    workspace, weighted_matrix, weights = working_copy(decision_matrix, weights, dtype, workspace)
+    benefit = np.array([criterion == 'benefit' for criterion in criteria_types])
+
+    # Step 1: Standardize the decision matrix in place
+    aras_standardize(weighted_matrix)
     
     # Step 2: Apply weights to the standardized matrix
-    weighted_matrix = norm_matrix * weights
+    weighted_matrix *= weights
     
     # Step 3: Determine the ideal (best) solutions for each criterion
-    ideal_best = np.array([
-        weighted_matrix[:, i].max() if criteria_types[i] == 'benefit' else weighted_matrix[:, i].min()
-        for i in range(weighted_matrix.shape[1])
-    ])
+    ideal_best = np.where(benefit, weighted_matrix.max(axis=0), weighted_matrix.min(axis=0))
     
     # Step 4: Ensure no zero division errors (avoid divide by zero)
-    ideal_best = np.where(ideal_best == 0, 1e-10, ideal_best)
+    ideal_best = np.where(ideal_best == 0, 1e-10, ideal_best).astype(workspace.dtype)
     
     # Step 5: Calculate the utility degree for each alternative
-    utility_scores = np.sum(weighted_matrix / ideal_best, axis=1)  # sum of ratios
+    weighted_matrix /= ideal_best
+    utility_scores = np.sum(weighted_matrix, axis=1)  # sum of ratios
     
     # Step 6: Rank alternatives based on their utility scores (higher is better)
-    rankings = utility_scores.argsort()[::-1]  # Sort in descending order
+    rankings = np.argsort(-utility_scores, kind='stable')  # Sort in descending order
     
-    return rankings, utility_scores
\ No newline at end of file
+    return rankings, utility_scores
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+from src.mcdm.topsis import topsis
+from src.mcdm.aras import aras
+from src.mcdm.vikor import vikor
+from src.mcdm.copras import copras
+from src.mcdm.waspas import waspas
+from src.mcdm.taxonomy import taxonomy
+from src.mcdm.promethee import promethee
+from src.mcdm.workspace import Workspace
+from src.mcdm.pareto import efficient_set
+from src.mcdm.weighting import objective_weights
+from src.mcdm.kernels import topsis_scores, vikor_scores, taxonomy_scores
+from src.data_preprocessing.criteria_schema import schema_defaults
+from src.profiling.tracing import traced
+from src.aggregation.aggregation_methods import (
+    calculate_ranks, mean_rank_method, borda_count_method, copeland_method, kemeny_method, markov_chain_method
+)
+
+# Method name -> (function, whether a higher score is better). The score is the second value
+# returned by every method; the direction matches how the method pages sort their results.
+MCDM_METHODS = {
+    "TOPSIS": (topsis, True),
+    "ARAS": (aras, True),
+    "VIKOR": (vikor, True),
+    "COPRAS": (copras, True),
+    "WASPAS": (waspas, True),
+    "TAXONOMY": (taxonomy, False),
+    "PROMETHEE": (promethee, True),
+}
+
+AGGREGATION_METHODS = {
+    "Mean Rank": mean_rank_method,
+    "Borda": borda_count_method,
+    "Copeland": copeland_method,
+    "Kemeny": kemeny_method,
+    "Markov Chain": markov_chain_method,
+}
+# Aggregators of the backtest strategies, run at every rebalance date: the closed-form ones only
+# (Kemeny's local search spends up to its time budget per call, and MC4 iterates to convergence)
+BACKTEST_AGGREGATION_METHODS = ["Mean Rank", "Borda", "Copeland"]
+
+
+def _vikor_q(decision_matrix, weights, criteria_types, dtype=None):
+    return vikor_scores(decision_matrix, weights, criteria_types, dtype=dtype)[0]
+
+
+# Fused single-pass kernels returning the same score vector as the method (see kernels.py)
+FUSED_KERNELS = {
+    "TOPSIS": topsis_scores,
+    "VIKOR": _vikor_q,
+    "TAXONOMY": taxonomy_scores,
+}
+
+def default_criteria():
+    """
+    Returns the default criteria of the decision matrix built by the preprocessing (the company and
+    indicator criteria of config/criteria_schema.json).
+
+    The schema is read on every call (from the parsed copy while the file is unchanged, see
+    `load_criteria_schema`), so edits of the schema apply without restarting the app.
+
+    Returns:
+    - columns (list of str): Criteria columns.
+    - weights (list of float): Default weight of each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    """
+    return schema_defaults()
+
+
+def method_scores(method_name, decision_matrix, weights, criteria_types, dtype=None, workspace=None, fused=False):
+    """
+    Runs one MCDM method and returns its score vector.
+
+    Parameters:
+    - method_name (str): Key of MCDM_METHODS.
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
+    - fused (bool): Use the fused kernel of the method when it has one (FUSED_KERNELS).
+
+    Returns:
+    - scores (numpy array): Score of each alternative.
+    """
+    if fused and method_name in FUSED_KERNELS:
+        if dtype is None and workspace is not None:
+            dtype = workspace.dtype
+        return FUSED_KERNELS[method_name](decision_matrix, weights, criteria_types, dtype=dtype)
+    method, _ = MCDM_METHODS[method_name]
+    return method(decision_matrix, weights, criteria_types, dtype=dtype, workspace=workspace)[1]
+
+
+@traced(rows_arg=0)
+def rank_all_methods(decision_matrix, weights, criteria_types, method_names=None, dtype=None, workspace=None,
+                     fused=False, max_front=None):
+    """
+    Scores the decision matrix with several MCDM methods and converts the scores to ranks.
+
+    All methods share one workspace, so the scratch buffers are allocated once per call (or once
+    overall when a workspace is passed in, e.g. across the windows of a backtest).
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array or str): Weights for each criterion, or an objective weighting scheme of
+      WEIGHTING_SCHEMES ('entropy', 'critic', 'std') computed from the decision matrix (see weighting.py).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - method_names (list of str): Methods to run (default: all of MCDM_METHODS).
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
+    - fused (bool): Use the fused kernels of TOPSIS, VIKOR and TAXONOMY.
+    - max_front (int, optional): Score only the alternatives in the first `max_front` non-dominated
+      (Pareto) fronts; the others share the last rank. Normalizations then only see the kept alternatives.
+
+    Returns:
+    - ranking_matrix (numpy array): Matrix of ranks (starting from 1), rows = alternatives, cols = methods.
+    """
+    if method_names is None:
+        method_names = list(MCDM_METHODS)
+    decision_matrix = np.asarray(decision_matrix)
+    if isinstance(weights, str):
+        # Weights of the whole matrix, also when only its efficient set is scored
+        weights = objective_weights(decision_matrix, weights, criteria_types)
+    if max_front is not None:
+        kept = efficient_set(decision_matrix, criteria_types, max_fronts=max_front)
+        ranking_matrix = np.full((decision_matrix.shape[0], len(method_names)), len(kept) + 1, dtype=np.int64)
+        ranking_matrix[kept] = rank_all_methods(decision_matrix[kept], weights, criteria_types, method_names,
+                                                dtype=dtype, workspace=workspace, fused=fused)
+        return ranking_matrix
+    if workspace is None:
+        workspace = Workspace(np.float64 if dtype is None else dtype)
+
+    ranking_matrix = np.empty((decision_matrix.shape[0], len(method_names)), dtype=np.int64)
+    # Min-max normalized columns contain zeros, which the cost normalizations divide by
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j, name in enumerate(method_names):
+            higher_is_better = MCDM_METHODS[name][1]
+            scores = method_scores(name, decision_matrix, weights, criteria_types, workspace=workspace, fused=fused)
+            ranking_matrix[:, j] = calculate_ranks(scores, reverse=higher_is_better)
+    return ranking_matrix
+
+
+@traced(rows_arg=0)
+def aggregate_rankings(ranking_matrix, aggregation_names=None):
+    """
+    Aggregates a ranking matrix with the rank aggregation methods.
+
+    Returns:
+    - pd.DataFrame: One column of final ranks per aggregation method.
+    """
+    if aggregation_names is None:
+        aggregation_names = list(AGGREGATION_METHODS)
+    return pd.DataFrame({
+        name: AGGREGATION_METHODS[name](ranking_matrix)[0] for name in aggregation_names
+    })
+
+
+def precision_rank_agreement(decision_matrix, weights, criteria_types, dtype=np.float32, method_names=None):
+    """
+    Compares the ranks computed in a reduced precision with the float64 ranks.
+
+    Use it to check that a float32 workspace is accurate enough for a given decision matrix
+    before running a large sweep in float32.
+
+    Returns:
+    - pd.DataFrame: One row per method with the share of alternatives whose rank is identical
+      (Identical Ranks (%)) and the largest absolute rank difference (Max Rank Difference).
+    """
+    if method_names is None:
+        method_names = list(MCDM_METHODS)
+    reference = rank_all_methods(decision_matrix, weights, criteria_types, method_names)
+    reduced = rank_all_methods(decision_matrix, weights, criteria_types, method_names, dtype=dtype)
+    return pd.DataFrame({
+        'Identical Ranks (%)': (reference == reduced).mean(axis=0) * 100,
+        'Max Rank Difference': np.abs(reference - reduced).max(axis=0),
+    }, index=pd.Index(method_names, name='Method'))
@@ -1,6 +1,10 @@
 import numpy as np
 
-def copras(decision_matrix, weights, criteria_types):
+from src.mcdm.workspace import working_copy
+from src.profiling.tracing import traced
+
+@traced(rows_arg=0)
+def copras(decision_matrix, weights, criteria_types, dtype=None, workspace=None):
     """
     Implements the COPRAS method for multi-criteria decision-making.
     
@@ -8,28 +12,27 @@ def copras(decision_matrix, weights, criteria_types):
     - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
     - weights (numpy array): Weights for each criterion.
     - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
     
     Returns:
-    - rankings (numpy array): Indices of alternatives sorted by their scores (descending).
+    - rankings (numpy array): Indices of alternatives sorted by their scores (descending, ties keep their original order).
     - utility_scores (numpy array): Utility degree scores for each alternative.
     """
-    # Step 1: Normalize the decision matrix
-    norm_matrix = decision_matrix / np.sum(decision_matrix, axis=0)
-
-    # Step 2: Apply weights to the normalized matrix
-    weighted_matrix = norm_matrix * weights
+    workspace, norm_matrix, weights = working_copy(decision_matrix, weights, dtype, workspace)
+    signs = np.array([1.0 if c == "benefit" else -1.0 if c == "cost" else 0.0 for c in criteria_types])
 
-    # Step 3: Separate benefit and cost criteria
-    benefit_scores = np.sum(weighted_matrix[:, [i for i, c in enumerate(criteria_types) if c == "benefit"]], axis=1)
-    cost_scores = np.sum(weighted_matrix[:, [i for i, c in enumerate(criteria_types) if c == "cost"]], axis=1)
+    # Step 1: Normalize the decision matrix (in place)
+    norm_matrix /= np.sum(norm_matrix, axis=0)
 
-    # Step 4: Calculate the relative significance (Ri)
-    relative_significance = benefit_scores - cost_scores
+    # Steps 2-4: Weighted sum of benefit criteria minus weighted sum of cost criteria (Ri),
+    # as one product with the signed weights
+    relative_significance = norm_matrix @ (weights * signs.astype(workspace.dtype))
 
     # Step 5: Calculate the utility degree (Qi) for each alternative
     Q = relative_significance / np.max(relative_significance) * 100  # Normalize to percentage scale
 
     # Step 6: Rank alternatives (higher Q is better)
-    rankings = Q.argsort()[::-1]
+    rankings = np.argsort(-Q, kind='stable')
 
     return rankings, Q
@@ -0,0 +1,254 @@
+import numpy as np
+
+from src.profiling.tracing import traced
+
+try:
+    import numba
+except ImportError:  # Numba is optional; the NumPy kernels are used without it
+    numba = None
+
+# Rows per block of the NumPy kernels: small enough for a block of a wide matrix to stay in cache
+DEFAULT_CHUNK_ROWS = 4096
+
+
+def _row_blocks(n_rows, chunk_rows):
+    for start in range(0, n_rows, chunk_rows):
+        yield slice(start, min(start + chunk_rows, n_rows))
+
+
+def _prepare(decision_matrix, weights, criteria_types, dtype):
+    """Converts the inputs of a kernel to arrays of a common floating point dtype."""
+    matrix = np.asarray(decision_matrix)
+    if dtype is None:
+        dtype = matrix.dtype if matrix.dtype.kind == 'f' else np.float64
+    matrix = np.ascontiguousarray(matrix, dtype=dtype)
+    weights = np.asarray(weights, dtype=dtype)
+    benefit = np.array([criterion == 'benefit' for criterion in criteria_types])
+    return matrix, weights, benefit
+
+
+def _column_statistics(matrix, chunk_rows, sum_of_squares=False):
+    """
+    Computes the column minimum and maximum (and optionally the sum of squares) in one blocked pass.
+    """
+    n_columns = matrix.shape[1]
+    column_min = np.full(n_columns, np.inf, dtype=matrix.dtype)
+    column_max = np.full(n_columns, -np.inf, dtype=matrix.dtype)
+    squares = np.zeros(n_columns, dtype=matrix.dtype)
+    for rows in _row_blocks(matrix.shape[0], chunk_rows):
+        block = matrix[rows]
+        np.minimum(column_min, block.min(axis=0), out=column_min)
+        np.maximum(column_max, block.max(axis=0), out=column_max)
+        if sum_of_squares:
+            squares += np.einsum('ij,ij->j', block, block)
+    return column_min, column_max, squares
+
+
+def _use_numba(use_numba):
+    if use_numba is None:
+        return numba is not None
+    if use_numba and numba is None:
+        raise ImportError("use_numba=True requires the numba package (pip install numba).")
+    return use_numba
+
+
+if numba is not None:
+    # error_model='numpy' keeps NumPy's inf/NaN results for divisions by zero
+    @numba.njit(parallel=True, error_model='numpy', cache=True)
+    def _topsis_rows(matrix, norm, weights, ideal_best, ideal_worst, scores):
+        n_rows, n_columns = matrix.shape
+        for i in numba.prange(n_rows):
+            best = 0.0
+            worst = 0.0
+            for j in range(n_columns):
+                value = matrix[i, j] / norm[j] * weights[j]
+                best += (value - ideal_best[j]) ** 2
+                worst += (value - ideal_worst[j]) ** 2
+            best = np.sqrt(best)
+            worst = np.sqrt(worst)
+            scores[i] = worst / (best + worst)
+
+    @numba.njit(parallel=True, error_model='numpy', cache=True)
+    def _vikor_rows(matrix, benefit, column_max, min_value, epsilon, weights, S, R):
+        n_rows, n_columns = matrix.shape
+        for i in numba.prange(n_rows):
+            total = 0.0
+            largest = -np.inf
+            for j in range(n_columns):
+                x = matrix[i, j]
+                if benefit[j]:
+                    value = x / column_max[j]
+                elif x <= epsilon:
+                    value = 1.0
+                else:
+                    value = min_value[j] / x
+                value = value * weights[j]
+                total += value
+                if value > largest or np.isnan(value):
+                    largest = value
+            S[i] = total
+            R[i] = largest
+
+    @numba.njit(parallel=True, error_model='numpy', cache=True)
+    def _taxonomy_rows(matrix, benefit, column_max, column_min, constant, weights, ideal_point, distances):
+        n_rows, n_columns = matrix.shape
+        for i in numba.prange(n_rows):
+            total = 0.0
+            for j in range(n_columns):
+                x = matrix[i, j]
+                if benefit[j]:
+                    value = x / (column_max[j] + 1e-10)
+                elif constant[j]:
+                    value = 1.0
+                else:
+                    value = column_min[j] / (x + 1e-10)
+                total += (value * weights[j] - ideal_point[j]) ** 2
+            distances[i] = np.sqrt(total)
+
+
+@traced(rows_arg=0)
+def topsis_scores(decision_matrix, weights, criteria_types, dtype=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                  use_numba=None):
+    """
+    Fused TOPSIS kernel: the same closeness scores as `topsis`, without full-size temporaries.
+
+    A first blocked pass collects the column sums of squares, minima and maxima. The ideal and
+    anti-ideal solutions follow from them directly (normalizing and weighting are monotone per column),
+    so a second pass normalizes, weights and measures both distances of every row in one go.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in (default: the matrix dtype or float64).
+    - chunk_rows (int): Rows per block of the NumPy kernel.
+    - use_numba (bool, optional): Use the compiled Numba kernel (default: when numba is installed).
+
+    Returns:
+    - scores (numpy array): Closeness scores for each alternative.
+    """
+    matrix, weights, benefit = _prepare(decision_matrix, weights, criteria_types, dtype)
+
+    # Pass 1: Column statistics
+    column_min, column_max, squares = _column_statistics(matrix, chunk_rows, sum_of_squares=True)
+    norm = np.sqrt(squares)
+    high = column_max / norm * weights
+    low = column_min / norm * weights
+    column_best, column_worst = np.maximum(high, low), np.minimum(high, low)
+    ideal_best = np.where(benefit, column_best, column_worst)
+    ideal_worst = np.where(benefit, column_worst, column_best)
+
+    # Pass 2: Normalize, weight and measure both distances block by block
+    scores = np.empty(matrix.shape[0], dtype=matrix.dtype)
+    if _use_numba(use_numba):
+        _topsis_rows(matrix, norm, weights, ideal_best, ideal_worst, scores)
+        return scores
+
+    for rows in _row_blocks(matrix.shape[0], chunk_rows):
+        block = matrix[rows] / norm
+        block *= weights
+        difference = block - ideal_best
+        dist_best = np.sqrt(np.einsum('ij,ij->i', difference, difference))
+        np.subtract(block, ideal_worst, out=difference)
+        dist_worst = np.sqrt(np.einsum('ij,ij->i', difference, difference))
+        scores[rows] = dist_worst / (dist_best + dist_worst)
+    return scores
+
+
+@traced(rows_arg=0)
+def vikor_scores(decision_matrix, weights, criteria_types, dtype=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                 use_numba=None):
+    """
+    Fused VIKOR kernel: the same Q, S and R as `vikor`, without full-size temporaries.
+
+    A first blocked pass collects the column minima and maxima used by the normalization; a second
+    pass normalizes and weights every block and reduces it to the group utility S and the individual
+    regret R right away.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in (default: the matrix dtype or float64).
+    - chunk_rows (int): Rows per block of the NumPy kernel.
+    - use_numba (bool, optional): Use the compiled Numba kernel (default: when numba is installed).
+
+    Returns:
+    - Q (numpy array): Compromise solution scores for each alternative.
+    - S (numpy array): Group utility scores for each alternative.
+    - R (numpy array): Individual regret scores for each alternative.
+    """
+    matrix, weights, benefit = _prepare(decision_matrix, weights, criteria_types, dtype)
+    epsilon = 1e-10  # Small value to avoid division by zero, as in `vikor`
+
+    # Pass 1: Column statistics
+    column_min, column_max, _ = _column_statistics(matrix, chunk_rows)
+    min_value = np.maximum(column_min, epsilon).astype(matrix.dtype)
+
+    # Pass 2: Normalize, weight and reduce to S and R block by block
+    S = np.empty(matrix.shape[0], dtype=matrix.dtype)
+    R = np.empty(matrix.shape[0], dtype=matrix.dtype)
+    if _use_numba(use_numba):
+        _vikor_rows(matrix, benefit, column_max, min_value, epsilon, weights, S, R)
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for rows in _row_blocks(matrix.shape[0], chunk_rows):
+                block = matrix[rows]
+                normalized = np.where(benefit, block / column_max, min_value / block)
+                normalized[(block <= epsilon) & ~benefit] = 1
+                normalized *= weights
+                S[rows] = normalized.sum(axis=1)
+                R[rows] = normalized.max(axis=1)
+
+    v = 0.5  # Weight of the strategy of majority rule (S)
+    Q = v * (S - S.min()) / (S.max() - S.min()) + (1 - v) * (R - R.min()) / (R.max() - R.min())
+    return Q, S, R
+
+
+@traced(rows_arg=0)
+def taxonomy_scores(decision_matrix, weights, criteria_types, dtype=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                    use_numba=None):
+    """
+    Fused TAXONOMY kernel: the same distances as `taxonomy`, without full-size temporaries.
+
+    A first blocked pass collects the column minima and maxima, from which the normalization and the
+    ideal point follow; a second pass normalizes, weights and measures the distance of every row.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in (default: the matrix dtype or float64).
+    - chunk_rows (int): Rows per block of the NumPy kernel.
+    - use_numba (bool, optional): Use the compiled Numba kernel (default: when numba is installed).
+
+    Returns:
+    - distances (numpy array): Distance scores for each alternative (lower is better).
+    """
+    matrix, weights, benefit = _prepare(decision_matrix, weights, criteria_types, dtype)
+
+    # Pass 1: Column statistics and the ideal point
+    column_min, column_max, _ = _column_statistics(matrix, chunk_rows)
+    constant = ~benefit & ~(column_max - column_min > 0)
+    norm_high = column_max / (column_max + 1e-10)
+    norm_low = column_min / (column_max + 1e-10)
+    for j in np.flatnonzero(~benefit):
+        # The cost normalization min / (x + 1e-10) is not linear in x: reduce its column exactly
+        normalized = np.ones(1) if constant[j] else column_min[j] / (matrix[:, j] + 1e-10)
+        norm_high[j], norm_low[j] = normalized.max(), normalized.min()
+    ideal_point = np.maximum(norm_high * weights, norm_low * weights)
+
+    # Pass 2: Normalize, weight and measure the distance block by block
+    distances = np.empty(matrix.shape[0], dtype=matrix.dtype)
+    if _use_numba(use_numba):
+        _taxonomy_rows(matrix, benefit, column_max, column_min, constant, weights, ideal_point, distances)
+        return distances
+
+    for rows in _row_blocks(matrix.shape[0], chunk_rows):
+        block = matrix[rows]
+        normalized = np.where(benefit, block / (column_max + 1e-10), column_min / (block + 1e-10))
+        normalized[:, constant] = 1
+        normalized *= weights
+        normalized -= ideal_point
+        distances[rows] = np.sqrt(np.einsum('ij,ij->i', normalized, normalized))
+    return distances
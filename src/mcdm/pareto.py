@@ -0,0 +1,111 @@
+import numpy as np
+
+from src.profiling.tracing import traced
+
+# Rows x skyline rows x criteria compared at once by the block-nested-loop filter
+MAX_BLOCK_ELEMENTS = 2 ** 22
+
+
+def oriented_matrix(decision_matrix, criteria_types):
+    """
+    Returns a copy of the decision matrix in which a larger value is better on every criterion
+    (cost criteria are negated).
+    """
+    matrix = np.array(decision_matrix, dtype=float)
+    matrix *= np.array([1 if criterion == 'benefit' else -1 for criterion in criteria_types])
+    return matrix
+
+
+def _dominated_by(candidates, others):
+    """
+    Marks the candidates dominated by at least one row of `others` (at least as good on every
+    criterion and strictly better on one), comparing in memory-bounded blocks.
+    """
+    dominated = np.zeros(len(candidates), dtype=bool)
+    if len(others) == 0 or len(candidates) == 0:
+        return dominated
+    n_criteria = candidates.shape[1]
+    block_rows = max(1, MAX_BLOCK_ELEMENTS // (len(others) * n_criteria))
+    for start in range(0, len(candidates), block_rows):
+        block = candidates[start:start + block_rows, None, :]
+        at_least_as_good = np.all(others[None, :, :] >= block, axis=2)
+        strictly_better = np.any(others[None, :, :] > block, axis=2)
+        dominated[start:start + block_rows] = np.any(at_least_as_good & strictly_better, axis=1)
+    return dominated
+
+
+def _skyline(matrix, block_rows):
+    """
+    Sort-filter-skyline: indices of the non-dominated rows of an oriented matrix.
+
+    Rows are visited by decreasing sum of their values. A row can only be dominated by a row with a
+    larger sum, so every row that survives the comparison with the skyline found so far (and with the
+    earlier rows of its own block) belongs to the skyline, and the skyline never has to be revisited.
+    """
+    order = np.lexsort(matrix.T[::-1])[::-1]  # Lexicographic tie-break for equal sums
+    order = order[np.argsort(-matrix[order].sum(axis=1), kind='stable')]
+
+    skyline = np.empty(0, dtype=np.int64)
+    for start in range(0, len(order), block_rows):
+        block = order[start:start + block_rows]
+        # Discard the rows dominated by the skyline so far, then the rows dominated within the block
+        block = block[~_dominated_by(matrix[block], matrix[skyline])]
+        block = block[~_dominated_by(matrix[block], matrix[block])]
+        skyline = np.concatenate([skyline, block])
+    return np.sort(skyline)
+
+
+@traced(rows_arg=0)
+def non_dominated_mask(decision_matrix, criteria_types, block_rows=256):
+    """
+    Finds the non-dominated (Pareto-optimal) alternatives of a decision matrix.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - block_rows (int): Candidates compared against the skyline at once.
+
+    Returns:
+    - numpy array (bool): True for the alternatives that no other alternative dominates.
+    """
+    matrix = oriented_matrix(decision_matrix, criteria_types)
+    mask = np.zeros(len(matrix), dtype=bool)
+    mask[_skyline(matrix, block_rows)] = True
+    return mask
+
+
+@traced(rows_arg=0)
+def pareto_fronts(decision_matrix, criteria_types, max_fronts=None, block_rows=256):
+    """
+    Sorts the alternatives into non-dominated fronts: front 1 is the Pareto-optimal set, front 2 is the
+    Pareto-optimal set of the remaining alternatives, and so on.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - max_fronts (int, optional): Number of fronts to compute (default: all).
+    - block_rows (int): Candidates compared against the skyline at once.
+
+    Returns:
+    - numpy array (int): Front of each alternative (starting from 1), or 0 for the alternatives beyond
+      the first `max_fronts` fronts.
+    """
+    matrix = oriented_matrix(decision_matrix, criteria_types)
+    fronts = np.zeros(len(matrix), dtype=np.int64)
+    remaining = np.arange(len(matrix))
+    front = 1
+    while len(remaining) > 0 and (max_fronts is None or front <= max_fronts):
+        skyline = remaining[_skyline(matrix[remaining], block_rows)]
+        fronts[skyline] = front
+        remaining = np.setdiff1d(remaining, skyline, assume_unique=True)
+        front += 1
+    return fronts
+
+
+def efficient_set(decision_matrix, criteria_types, max_fronts=1):
+    """
+    Returns the indices of the alternatives in the first `max_fronts` non-dominated fronts, in their
+    original order, for restricting the scoring and aggregation to them.
+    """
+    fronts = pareto_fronts(decision_matrix, criteria_types, max_fronts=max_fronts)
+    return np.flatnonzero(fronts > 0)
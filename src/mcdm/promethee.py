@@ -0,0 +1,166 @@
+import numpy as np
+
+from src.mcdm.workspace import working_copy
+from src.profiling.tracing import traced
+
+PREFERENCE_FUNCTIONS = ('usual', 'linear', 'gaussian')
+PROMETHEE_ALGORITHMS = ('auto', 'sorted', 'blocked')
+# Elements of the pairwise difference block (rows x alternatives x criteria) of the blocked algorithm
+MAX_BLOCK_ELEMENTS = 2 ** 22
+
+
+def _thresholds(matrix, q, p):
+    """Per-criterion indifference (q) and preference (p) thresholds; by default q = 0 and p = column std."""
+    n_criteria = matrix.shape[1]
+    q = np.zeros(n_criteria) if q is None else np.broadcast_to(np.asarray(q, dtype=float), (n_criteria,))
+    p = matrix.std(axis=0) if p is None else np.broadcast_to(np.asarray(p, dtype=float), (n_criteria,))
+    return q.astype(matrix.dtype), p.astype(matrix.dtype)
+
+
+def _sorted_criterion_flows(matrix, preference_function, q, p):
+    """
+    Unweighted net flow sums of every criterion for the usual and linear preference functions, in
+    O(m n log n) from sorted columns.
+
+    For a criterion, the sum over all j of the odd preference difference P(x_i - x_j) - P(x_j - x_i)
+    only depends on how many values lie in each threshold band around x_i and on their sum, which
+    binary searches in the sorted column and its prefix sums give directly.
+    """
+    n = matrix.shape[0]
+    flows = np.empty(matrix.shape)
+    for k in range(matrix.shape[1]):
+        values = matrix[:, k].astype(float)
+        column = np.sort(values)
+        prefix = np.concatenate([[0.0], np.cumsum(column)])
+        q_k, p_k = float(q[k]), float(p[k])
+
+        if preference_function == 'usual' or p_k <= q_k:
+            # Strict preference beyond the indifference threshold
+            better = np.searchsorted(column, values - q_k, side='left')
+            worse = n - np.searchsorted(column, values + q_k, side='right')
+            flow = better - worse
+        else:
+            spread = p_k - q_k
+            # Alternatives j with x_i - x_j >= p (full preference) and q < x_i - x_j < p (linear part)
+            full_low = np.searchsorted(column, values - p_k, side='right')
+            partial_low = np.searchsorted(column, values - q_k, side='left')
+            # Alternatives j with x_j - x_i >= p and q < x_j - x_i < p
+            partial_high = np.searchsorted(column, values + q_k, side='right')
+            full_high = np.searchsorted(column, values + p_k, side='left')
+            low_sum = prefix[partial_low] - prefix[full_low]
+            high_sum = prefix[full_high] - prefix[partial_high]
+            flow = (full_low - (n - full_high)
+                    + ((values - q_k) * (partial_low - full_low) - low_sum) / spread
+                    - (high_sum - (values + q_k) * (full_high - partial_high)) / spread)
+        flows[:, k] = flow
+    return flows
+
+
+def _blocked_criterion_flows(matrix, preference_function, q, p, workspace):
+    """
+    Unweighted net flow sums of every criterion for any preference function, from the pairwise
+    differences computed in row blocks.
+
+    Every block holds the differences of `block_rows` alternatives to all alternatives on all criteria
+    (at most MAX_BLOCK_ELEMENTS values), so memory stays bounded for any number of alternatives.
+    """
+    n, n_criteria = matrix.shape
+    block_rows = max(1, MAX_BLOCK_ELEMENTS // (n * n_criteria))
+    spread = np.where(p > q, p - q, np.finfo(matrix.dtype).tiny)
+    scale = np.where(p > 0, 2 * p * p, np.finfo(matrix.dtype).tiny)
+    flows = np.empty(matrix.shape)
+    for start in range(0, n, block_rows):
+        rows = slice(start, min(start + block_rows, n))
+        block = matrix[rows]
+        difference = workspace.get('pairwise', (block.shape[0], n, n_criteria))
+        np.subtract(block[:, None, :], matrix[None, :, :], out=difference)
+
+        # P(d) - P(-d) is odd in d: apply P to |d| and restore the sign
+        negative = difference < 0
+        np.abs(difference, out=difference)
+        if preference_function == 'usual':
+            np.greater(difference, q, out=difference, casting='unsafe')
+        elif preference_function == 'linear':
+            difference -= q
+            np.clip(difference, 0, spread, out=difference)
+            difference /= spread
+        else:  # gaussian, with the preference threshold as its standard deviation
+            np.square(difference, out=difference)
+            difference /= -scale
+            np.exp(difference, out=difference)
+            np.subtract(1, difference, out=difference)
+        np.negative(difference, out=difference, where=negative)
+
+        flows[rows] = difference.sum(axis=1)
+    return flows
+
+
+def promethee_flows(decision_matrix, criteria_types, preference_function='linear', q=None, p=None,
+                    algorithm='auto', dtype=None, workspace=None):
+    """
+    Computes the net flow of every alternative on every criterion, before weighting.
+
+    The PROMETHEE II net flows are the weighted sums of these per-criterion flows, so they can be
+    reweighted without comparing the alternatives again. The parameters are those of `promethee`.
+
+    Returns:
+    - flows (numpy array): Per-criterion net flows (rows = alternatives, cols = criteria), each between -1 and 1.
+    """
+    if preference_function not in PREFERENCE_FUNCTIONS:
+        raise ValueError(f"Unknown preference function '{preference_function}'. "
+                         f"Use one of: {', '.join(PREFERENCE_FUNCTIONS)}.")
+    if algorithm not in PROMETHEE_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}'. Use one of: {', '.join(PROMETHEE_ALGORITHMS)}.")
+    if algorithm == 'sorted' and preference_function == 'gaussian':
+        raise ValueError("The sorted algorithm supports the usual and linear preference functions only.")
+
+    workspace, matrix, _ = working_copy(decision_matrix, np.ones(np.shape(decision_matrix)[1]), dtype, workspace)
+
+    # Orient the criteria so that a larger value is always preferred
+    matrix *= np.array([1 if criterion == 'benefit' else -1 for criterion in criteria_types], dtype=matrix.dtype)
+    q, p = _thresholds(matrix, q, p)
+
+    # Sum the preference differences over all pairs of alternatives, averaged over the other alternatives
+    if algorithm == 'blocked' or (algorithm == 'auto' and preference_function == 'gaussian'):
+        flows = _blocked_criterion_flows(matrix, preference_function, q, p, workspace)
+    else:
+        flows = _sorted_criterion_flows(matrix, preference_function, q, p)
+    flows /= max(matrix.shape[0] - 1, 1)
+    return flows.astype(matrix.dtype, copy=False)
+
+
+@traced(rows_arg=0)
+def promethee(decision_matrix, weights, criteria_types, preference_function='linear', q=None, p=None,
+              algorithm='auto', dtype=None, workspace=None):
+    """
+    Implements the PROMETHEE II method for multi-criteria decision-making.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - preference_function (str): 'usual' (any difference above q is a full preference), 'linear'
+      (preference grows linearly from q to p) or 'gaussian' (1 - exp(-d^2 / 2p^2)).
+    - q (float or numpy array, optional): Indifference threshold of each criterion (default: 0).
+    - p (float or numpy array, optional): Preference threshold of each criterion (default: the column
+      standard deviation).
+    - algorithm (str): 'sorted' (sort-based, usual and linear only), 'blocked' (pairwise differences in
+      memory-bounded row blocks) or 'auto' (sorted when possible).
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
+
+    Returns:
+    - rankings (numpy array): Indices of alternatives sorted by their scores (descending, ties keep their original order).
+    - net_flows (numpy array): Net outranking flow of each alternative (between -1 and 1).
+    """
+    # Steps 1-2: Orient the criteria and sum the preference differences over all pairs of alternatives,
+    # criterion by criterion
+    flows = promethee_flows(decision_matrix, criteria_types, preference_function, q, p, algorithm, dtype, workspace)
+
+    # Step 3: Net flow = (positive flow - negative flow), weighted over the criteria
+    net_flows = flows @ np.asarray(weights, dtype=flows.dtype)
+
+    # Step 4: Rank alternatives based on net flows (higher is better)
+    rankings = np.argsort(-net_flows, kind='stable')
+
+    return rankings, net_flows
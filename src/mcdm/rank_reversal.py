@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+from src.mcdm.topsis import topsis
+from src.mcdm.aras import aras
+from src.mcdm.vikor import vikor
+from src.mcdm.copras import copras
+from src.mcdm.waspas import waspas
+from src.mcdm.taxonomy import taxonomy
+from src.aggregation.aggregation_methods import calculate_ranks
+from src.profiling.tracing import traced
+
+# Method name -> (function, whether a higher score is better), as in batch.MCDM_METHODS
+RANK_REVERSAL_METHODS = {
+    "TOPSIS": (topsis, True),
+    "ARAS": (aras, True),
+    "VIKOR": (vikor, True),
+    "COPRAS": (copras, True),
+    "WASPAS": (waspas, True),
+    "TAXONOMY": (taxonomy, False),
+}
+# Methods normalizing by column maxima / minima only: removing an alternative that holds no column
+# extreme leaves every other score unchanged
+EXTREME_NORMALIZED_METHODS = ("VIKOR", "WASPAS", "TAXONOMY")
+# Removals x alternatives x criteria evaluated at once by the vectorized leave-one-out scorings
+MAX_BLOCK_ELEMENTS = 2 ** 22
+
+
+def leave_one_out_aggregates(decision_matrix):
+    """
+    Column aggregates of the decision matrix without each alternative, updated from the full-matrix
+    aggregates in O(n m): sums and sums of squares minus the removed row, and maxima / minima replaced
+    by the second largest / smallest value when the removed row holds the (unique) extreme.
+
+    Returns:
+    - dict: 'sum', 'sumsq', 'mean', 'std' (population), 'max' and 'min', each an (alternatives x criteria)
+      array whose row r describes the matrix without alternative r.
+    """
+    matrix = np.asarray(decision_matrix, dtype=float)
+    n = matrix.shape[0]
+    total = matrix.sum(axis=0)
+    total_squares = np.einsum('ij,ij->j', matrix, matrix)
+
+    # Largest and second largest (smallest and second smallest) value of every column
+    ordered = np.sort(matrix, axis=0)
+    largest, second_largest = ordered[-1], ordered[-2]
+    smallest, second_smallest = ordered[0], ordered[1]
+
+    sums = total - matrix
+    sums_of_squares = total_squares - matrix * matrix
+    means = sums / (n - 1)
+    variances = np.maximum(sums_of_squares / (n - 1) - means * means, 0.0)
+    return {
+        'sum': sums,
+        'sumsq': sums_of_squares,
+        'mean': means,
+        'std': np.sqrt(variances),
+        # A value equal to the largest is only replaced when it is the single largest
+        'max': np.where(matrix == largest, second_largest, largest),
+        'min': np.where(matrix == smallest, second_smallest, smallest),
+    }
+
+
+def _topsis_scores(matrix, weights, benefit, aggregates):
+    norm = np.sqrt(aggregates['sumsq'])[:, None, :]
+    weighted = matrix[None, :, :] / norm * weights
+    high = aggregates['max'][:, None, :] / norm * weights
+    low = aggregates['min'][:, None, :] / norm * weights
+    ideal_best = np.where(benefit, np.maximum(high, low), np.minimum(high, low))
+    ideal_worst = np.where(benefit, np.minimum(high, low), np.maximum(high, low))
+    dist_best = np.sqrt(((weighted - ideal_best) ** 2).sum(axis=2))
+    dist_worst = np.sqrt(((weighted - ideal_worst) ** 2).sum(axis=2))
+    return dist_worst / (dist_best + dist_worst)
+
+
+def _aras_scores(matrix, weights, benefit, aggregates):
+    mean = aggregates['mean'][:, None, :]
+    std = aggregates['std'][:, None, :]
+    std = np.where(std < 10 * np.finfo(float).eps, 1.0, std)
+    weighted = (matrix[None, :, :] - mean) / std * weights
+    high = (aggregates['max'][:, None, :] - mean) / std * weights
+    low = (aggregates['min'][:, None, :] - mean) / std * weights
+    ideal_best = np.where(benefit, np.maximum(high, low), np.minimum(high, low))
+    ideal_best = np.where(ideal_best == 0, 1e-10, ideal_best)
+    return (weighted / ideal_best).sum(axis=2)
+
+
+def _copras_scores(matrix, weights, benefit, aggregates, removed):
+    signs = np.where(benefit, 1.0, -1.0)
+    relative_significance = matrix @ (weights * signs / aggregates['sum']).T  # (alternatives x removals)
+    relative_significance = relative_significance.T
+    relative_significance[np.arange(len(removed)), removed] = np.nan
+    return relative_significance / np.nanmax(relative_significance, axis=1, keepdims=True) * 100
+
+
+def _vikor_scores(S, R, removed):
+    """VIKOR Q of the other alternatives when S and R are unchanged (only their ranges move)."""
+    S = np.broadcast_to(S, (len(removed), len(S))).copy()
+    R = np.broadcast_to(R, (len(removed), len(R))).copy()
+    S[np.arange(len(removed)), removed] = np.nan
+    R[np.arange(len(removed)), removed] = np.nan
+    S_min, S_max = np.nanmin(S, axis=1, keepdims=True), np.nanmax(S, axis=1, keepdims=True)
+    R_min, R_max = np.nanmin(R, axis=1, keepdims=True), np.nanmax(R, axis=1, keepdims=True)
+    v = 0.5  # Weight of the strategy of majority rule (S), as in `vikor`
+    return v * (S - S_min) / (S_max - S_min) + (1 - v) * (R - R_min) / (R_max - R_min)
+
+
+def _method_without(method_name, matrix, weights, criteria_types, removed_row):
+    """Scores of all alternatives except `removed_row` with the method itself (NaN for the removed one)."""
+    method, _ = RANK_REVERSAL_METHODS[method_name]
+    keep = np.arange(matrix.shape[0]) != removed_row
+    scores = np.full(matrix.shape[0], np.nan)
+    scores[keep] = method(matrix[keep], weights, criteria_types)[1]
+    return scores
+
+
+def _extreme_rows(matrix):
+    """Alternatives holding the maximum or the minimum of at least one column."""
+    return np.flatnonzero(((matrix == matrix.max(axis=0)) | (matrix == matrix.min(axis=0))).any(axis=1))
+
+
+@traced(rows_arg=0)
+def leave_one_out_scores(decision_matrix, weights, criteria_types, method_name):
+    """
+    Scores every alternative with each other alternative removed in turn.
+
+    TOPSIS, ARAS and COPRAS are rescored from the leave-one-out column aggregates (no renormalization
+    of the reduced matrix), in memory-bounded blocks of removals. VIKOR, WASPAS and TAXONOMY only
+    depend on column maxima and minima, so only the removals of alternatives holding an extreme are
+    rescored; for VIKOR the other removals only move the ranges of S and R.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - method_name (str): Key of RANK_REVERSAL_METHODS.
+
+    Returns:
+    - scores (numpy array): (removed alternatives x alternatives) scores; row r holds the scores without
+      alternative r, with NaN for r itself.
+    """
+    matrix = np.asarray(decision_matrix, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    benefit = np.array([criterion == 'benefit' for criterion in criteria_types])
+    n, n_criteria = matrix.shape
+    method, _ = RANK_REVERSAL_METHODS[method_name]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method_name in EXTREME_NORMALIZED_METHODS:
+            full_scores = method(matrix, weights, criteria_types)
+            if method_name == "VIKOR":
+                scores = _vikor_scores(full_scores[2], full_scores[3], np.arange(n))
+            else:
+                scores = np.broadcast_to(full_scores[1], (n, n)).copy()
+                scores[np.arange(n), np.arange(n)] = np.nan
+            for removed_row in _extreme_rows(matrix):
+                scores[removed_row] = _method_without(method_name, matrix, weights, criteria_types, removed_row)
+            return scores
+
+        aggregates = leave_one_out_aggregates(matrix)
+        scores = np.empty((n, n))
+        block_rows = max(1, MAX_BLOCK_ELEMENTS // (n * n_criteria))
+        for start in range(0, n, block_rows):
+            removed = np.arange(start, min(start + block_rows, n))
+            block = {name: values[removed] for name, values in aggregates.items()}
+            if method_name == "TOPSIS":
+                scores[removed] = _topsis_scores(matrix, weights, benefit, block)
+            elif method_name == "ARAS":
+                scores[removed] = _aras_scores(matrix, weights, benefit, block)
+            else:
+                scores[removed] = _copras_scores(matrix, weights, benefit, block, removed)
+        scores[np.arange(n), np.arange(n)] = np.nan
+        return scores
+
+
+def rank_reversal_report(decision_matrix, weights, criteria_types, method_names=None, labels=None, top_k=10):
+    """
+    Leave-one-out rank-reversal audit: removes each alternative in turn and compares the ranks of the
+    others with their ranks in the full ranking (with the removed alternative left out).
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - method_names (list of str, optional): Methods to audit (default: all of RANK_REVERSAL_METHODS).
+    - labels (list, optional): Name of each alternative (e.g. its symbol) used in the report.
+    - top_k (int): Size of the top group checked for membership changes.
+
+    Returns:
+    - pd.DataFrame: One row per method and removed alternative with the number of other alternatives
+      whose rank changed, the largest rank shift and whether the first place or the top-k set changed.
+    """
+    if method_names is None:
+        method_names = list(RANK_REVERSAL_METHODS)
+    matrix = np.asarray(decision_matrix, dtype=float)
+    n = matrix.shape[0]
+    labels = np.arange(n) if labels is None else np.asarray(labels)
+    method_reports = []
+
+    for method_name in method_names:
+        _, higher_is_better = RANK_REVERSAL_METHODS[method_name]
+        method, _ = RANK_REVERSAL_METHODS[method_name]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            full_scores = np.asarray(method(matrix, weights, criteria_types)[1], dtype=float)
+        reference = np.broadcast_to(full_scores, (n, n)).copy()
+        reference[np.arange(n), np.arange(n)] = np.nan
+        loo_scores = leave_one_out_scores(matrix, weights, criteria_types, method_name)
+
+        # NaN (the removed alternative) is ranked last in both rankings
+        keys = (lambda scores: -scores) if higher_is_better else (lambda scores: scores)
+        reference_ranks = calculate_ranks(keys(reference))
+        loo_ranks = calculate_ranks(keys(loo_scores))
+        shift = np.abs(loo_ranks - reference_ranks)
+        shift[np.arange(n), np.arange(n)] = 0
+
+        method_reports.append(pd.DataFrame({
+            'Method': method_name,
+            'Removed': labels,
+            'Rank Changes': (shift > 0).sum(axis=1),
+            'Max Rank Shift': shift.max(axis=1),
+            'First Place Changed': (np.argmin(reference_ranks, axis=1) != np.argmin(loo_ranks, axis=1)),
+            f'Top {top_k} Changed': ((reference_ranks <= top_k) != (loo_ranks <= top_k)).any(axis=1),
+        }))
+    return pd.concat(method_reports, ignore_index=True)
+
+
+def summarize_rank_reversal(report):
+    """
+    Summarizes a leave-one-out report per method.
+
+    Returns:
+    - pd.DataFrame: Per method, the share of removals that reorder the others (%), the mean number of
+      rank changes, the largest rank shift and the share of removals changing the first place (%).
+    """
+    top_column = [column for column in report.columns if column.startswith('Top ')][0]
+    summary = report.groupby('Method', sort=False).agg(
+        reordering=('Rank Changes', lambda changes: (changes > 0).mean() * 100),
+        mean_changes=('Rank Changes', 'mean'),
+        max_shift=('Max Rank Shift', 'max'),
+        first_place=('First Place Changed', lambda changed: changed.mean() * 100),
+        top=(top_column, lambda changed: changed.mean() * 100),
+    )
+    summary.columns = ['Removals Causing Reversal (%)', 'Mean Rank Changes', 'Max Rank Shift',
+                       'First Place Changed (%)', f'{top_column} (%)']
+    return summary.reset_index()
@@ -0,0 +1,179 @@
+import numpy as np
+
+from src.mcdm.topsis import topsis
+from src.mcdm.aras import aras_standardize
+from src.mcdm.vikor import vikor_normalize
+from src.mcdm.waspas import waspas_normalize
+from src.mcdm.taxonomy import taxonomy
+from src.mcdm.promethee import promethee_flows
+
+# Methods whose scores are rescored from cached weight-independent matrices; TOPSIS and TAXONOMY
+# (distances to weight-dependent ideal points) are recomputed in full
+INCREMENTAL_METHODS = ('WASPAS', 'COPRAS', 'VIKOR', 'ARAS', 'PROMETHEE')
+FULL_RECOMPUTE_METHODS = {'TOPSIS': topsis, 'TAXONOMY': taxonomy}
+# Linear terms are recomputed exactly after this many incremental updates, to bound rounding drift
+RESYNC_UPDATES = 64
+
+
+def _linear_term(basis, coefficients):
+    """A score term linear in its coefficients: value = basis @ coefficients."""
+    return {'basis': basis, 'coefficients': coefficients.copy(), 'value': basis @ coefficients}
+
+
+def _weight_change(old, new):
+    """
+    Expresses the new coefficients as scale * old + a sparse change.
+
+    Changing one raw weight on a page renormalizes all weights (they sum to 1), which scales every
+    other weight by the same factor, so only the edited criterion is left in the sparse part.
+
+    Returns:
+    - changed (numpy array): Indices of the coefficients not explained by the common scale.
+    - scale (float): Common scale of the unchanged coefficients.
+    """
+    nonzero = old != 0
+    scale = float(np.median(new[nonzero] / old[nonzero])) if nonzero.any() else 1.0
+    changed = np.flatnonzero(~np.isclose(new, scale * old, rtol=1e-12, atol=0))
+    return changed, scale
+
+
+def _update_term(term, coefficients, resync=False):
+    """
+    Updates a linear term for new coefficients with a low-rank correction of its value:
+    basis @ new = scale * (basis @ old) + basis[:, changed] @ (new - scale * old)[changed].
+    """
+    old = term['coefficients']
+    changed, scale = _weight_change(old, coefficients)
+    if resync or len(changed) > max(1, len(old) // 2):
+        term['value'] = term['basis'] @ coefficients
+    elif len(changed) > 0 or scale != 1.0:
+        delta = coefficients[changed] - scale * old[changed]
+        term['value'] = scale * term['value'] + term['basis'][:, changed] @ delta
+    term['coefficients'] = coefficients.copy()
+    return term['value']
+
+
+def init_rescoring(method_name, decision_matrix, weights, criteria_types, **method_kwargs):
+    """
+    Prepares the incremental rescoring of one MCDM method for a fixed decision matrix and criteria types.
+
+    The weight-independent part of the method (normalized matrix, PROMETHEE per-criterion flows) is
+    computed once. The parts of the score that are linear in the weights (WASPAS weighted sum, COPRAS
+    weighted sums, VIKOR group utility, ARAS utility, PROMETHEE net flow, and the logarithm of the WASPAS
+    weighted product when every normalized value is positive) are then updated with a rank-1 correction
+    when one weight changes. The non-linear parts (VIKOR regret, a WASPAS weighted product of zero or
+    infinite values) are recomputed from the cached matrix, and TOPSIS and TAXONOMY are recomputed in full.
+
+    Parameters:
+    - method_name (str): 'TOPSIS', 'ARAS', 'VIKOR', 'COPRAS', 'WASPAS', 'TAXONOMY' or 'PROMETHEE'.
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Initial weights for each criterion.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - method_kwargs: Extra arguments of the method (e.g. lambda_param for WASPAS, preference_function
+      for PROMETHEE).
+
+    Returns:
+    - state (dict): Rescoring state, passed to `rescore`.
+    """
+    if method_name not in INCREMENTAL_METHODS and method_name not in FULL_RECOMPUTE_METHODS:
+        raise ValueError(f"Unknown MCDM method '{method_name}'.")
+    matrix = np.array(decision_matrix, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    criteria_types = list(criteria_types)
+    state = {
+        'method': method_name,
+        'criteria_types': criteria_types,
+        'method_kwargs': method_kwargs,
+        'updates': 0,
+        'terms': {},
+    }
+
+    if method_name in FULL_RECOMPUTE_METHODS:
+        state['matrix'] = matrix
+    elif method_name == 'WASPAS':
+        normalized = waspas_normalize(matrix, criteria_types)
+        state['normalized'] = normalized
+        state['terms']['wsm'] = _linear_term(normalized, weights)
+        if np.all(np.isfinite(normalized) & (normalized > 0)):
+            # The weighted product is linear in the weights in log space: log Q2 = log(normalized) @ weights
+            state['terms']['log_wpm'] = _linear_term(np.log(normalized), weights)
+    elif method_name == 'COPRAS':
+        signs = np.array([1.0 if c == "benefit" else -1.0 if c == "cost" else 0.0 for c in criteria_types])
+        matrix /= np.sum(matrix, axis=0)
+        matrix *= signs
+        state['terms']['relative_significance'] = _linear_term(matrix, weights)
+    elif method_name == 'VIKOR':
+        normalized = vikor_normalize(matrix, criteria_types)
+        state['normalized'] = normalized
+        state['terms']['S'] = _linear_term(normalized, weights)
+    elif method_name == 'ARAS':
+        # The weights cancel in (weighted value / weighted ideal): a criterion contributes its
+        # standardized value over its ideal when its weight is positive and nothing otherwise
+        standardized = aras_standardize(matrix)
+        benefit = np.array([criterion == 'benefit' for criterion in criteria_types])
+        ideal = np.where(benefit, standardized.max(axis=0), standardized.min(axis=0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(ideal != 0, standardized / ideal, 0.0)
+        state['terms']['utility'] = _linear_term(ratios, (weights > 0).astype(float))
+    elif method_name == 'PROMETHEE':
+        flows = promethee_flows(matrix, criteria_types, **method_kwargs).astype(float)
+        state['terms']['net_flows'] = _linear_term(flows, weights)
+
+    state['weights'] = weights.copy()
+    return state
+
+
+def rescore(state, weights):
+    """
+    Rescores the alternatives for new weights, reusing the cached state of `init_rescoring`.
+
+    Parameters:
+    - state (dict): Rescoring state from `init_rescoring` (updated in place).
+    - weights (numpy array): New weights for each criterion.
+
+    Returns:
+    - The same values as the method itself, e.g. (rankings, W, Q1, Q2) for WASPAS or (rankings, Q, S, R)
+      for VIKOR.
+    """
+    method_name = state['method']
+    weights = np.asarray(weights, dtype=float)
+    criteria_types = state['criteria_types']
+    if method_name in FULL_RECOMPUTE_METHODS:
+        state['weights'] = weights.copy()
+        return FULL_RECOMPUTE_METHODS[method_name](state['matrix'], weights, criteria_types, **state['method_kwargs'])
+
+    state['updates'] += 1
+    resync = state['updates'] % RESYNC_UPDATES == 0
+    terms = state['terms']
+    state['weights'] = weights.copy()
+
+    if method_name == 'WASPAS':
+        lambda_param = state['method_kwargs'].get('lambda_param', 0.5)
+        Q1 = _update_term(terms['wsm'], weights, resync)
+        if 'log_wpm' in terms:
+            Q2 = np.exp(_update_term(terms['log_wpm'], weights, resync))
+        else:
+            # Zero or infinite normalized values have no logarithm: recompute the product from the cached matrix
+            Q2 = np.prod(np.power(state['normalized'], weights), axis=1)
+        W = lambda_param * Q1 + (1 - lambda_param) * Q2
+        return np.argsort(-W, kind='stable'), W, Q1, Q2
+
+    if method_name == 'COPRAS':
+        relative_significance = _update_term(terms['relative_significance'], weights, resync)
+        Q = relative_significance / np.max(relative_significance) * 100
+        return np.argsort(-Q, kind='stable'), Q
+
+    if method_name == 'VIKOR':
+        S = _update_term(terms['S'], weights, resync)
+        # The individual regret is a maximum, not linear in the weights: recompute it from the cached matrix
+        R = np.max(state['normalized'] * weights, axis=1)
+        v = 0.5  # Weight of the strategy of majority rule (S), as in `vikor`
+        Q = v * (S - S.min()) / (S.max() - S.min()) + (1 - v) * (R - R.min()) / (R.max() - R.min())
+        return np.argsort(Q, kind='stable'), Q, S, R
+
+    if method_name == 'ARAS':
+        scores = _update_term(terms['utility'], (weights > 0).astype(float), resync)
+        return np.argsort(-scores, kind='stable'), scores
+
+    net_flows = _update_term(terms['net_flows'], weights, resync)  # PROMETHEE
+    return np.argsort(-net_flows, kind='stable'), net_flows
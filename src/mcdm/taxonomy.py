@@ -1,6 +1,30 @@
 import numpy as np
 
-def taxonomy(decision_matrix, weights, criteria_types):
+from src.mcdm.workspace import working_copy
+from src.profiling.tracing import traced
+
+def taxonomy_normalize(norm_matrix, criteria_types):
+    """
+    Normalizes a decision matrix in place: x / max for benefit criteria, min / x for cost criteria
+    (1 for a constant cost criterion).
+    """
+    for i, criterion in enumerate(criteria_types):
+        column = norm_matrix[:, i]
+        min_value = np.min(column)
+        max_value = np.max(column)
+        if criterion == "cost":
+            # Prevent division by zero
+            if max_value - min_value > 0:  # Range > 0
+                column += 1e-10
+                np.divide(min_value, column, out=column)
+            else:
+                column[:] = 1  # If range is zero (all values are the same), set norm to 1
+        else:
+            column /= max_value + 1e-10  # Prevent division by zero in benefit criteria
+    return norm_matrix
+
+@traced(rows_arg=0)
+def taxonomy(decision_matrix, weights, criteria_types, dtype=None, workspace=None):
     """
     Implements the TAXONOMY method for multi-criteria decision-making.
     
@@ -8,35 +32,33 @@ def taxonomy(decision_matrix, weights, criteria_types):
     - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
     - weights (numpy array): Weights for each criterion.
     - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls. The returned
+      normalized matrix is then a view of a workspace buffer.
     
     Returns:
-    - rankings (numpy array): Indices of alternatives sorted by their distances (ascending).
+    - rankings (numpy array): Indices of alternatives sorted by their distances (ascending, ties keep their original order).
     - distances (numpy array): Distance scores for each alternative (lower is better).
     - normalized_matrix (numpy array): Normalized decision matrix.
     - ideal_point (numpy array): Ideal point in the criteria space.
     """
-    # Step 1: Normalize the decision matrix
-    norm_matrix = decision_matrix / (np.max(decision_matrix, axis=0) + 1e-10)  # Prevent division by zero in benefit criteria
-    for i, criterion in enumerate(criteria_types):
-        if criterion == "cost":
-            min_value = np.min(decision_matrix[:, i])
-            max_value = np.max(decision_matrix[:, i])
-            # Prevent division by zero
-            if max_value - min_value > 0:  # Range > 0
-                norm_matrix[:, i] = min_value / (decision_matrix[:, i] + 1e-10)
-            else:
-                norm_matrix[:, i] = 1  # If range is zero (all values are the same), set norm to 1
+    workspace, norm_matrix, weights = working_copy(decision_matrix, weights, dtype, workspace)
+
+    # Step 1: Normalize the decision matrix (column by column, in place)
+    taxonomy_normalize(norm_matrix, criteria_types)
 
     # Step 2: Calculate the weighted normalized matrix
-    weighted_matrix = norm_matrix * weights
+    weighted_matrix = workspace.get('weighted', norm_matrix.shape)
+    np.multiply(norm_matrix, weights, out=weighted_matrix)
 
     # Step 3: Compute the ideal point (Z*) for all criteria
     ideal_point = np.max(weighted_matrix, axis=0)  # Ideal point (maximum values)
 
     # Step 4: Calculate the Euclidean distance from the ideal point for each alternative
-    distances = np.sqrt(np.sum((weighted_matrix - ideal_point) ** 2, axis=1))
+    weighted_matrix -= ideal_point
+    distances = np.sqrt(np.einsum('ij,ij->i', weighted_matrix, weighted_matrix))
 
     # Step 5: Rank alternatives (lower distance is better)
-    rankings = distances.argsort()
+    rankings = np.argsort(distances, kind='stable')
 
     return rankings, distances, norm_matrix, ideal_point
@@ -1,7 +1,18 @@
 import numpy as np
 import pandas as pd
 
-def topsis(decision_matrix, weights, criteria_types):
+from src.mcdm.workspace import working_copy
+from src.profiling.tracing import traced
+
+def topsis_normalize(norm_matrix):
+    """
+    Normalizes a decision matrix in place: every column divided by its Euclidean norm.
+    """
+    norm_matrix /= np.sqrt(np.einsum('ij,ij->j', norm_matrix, norm_matrix))
+    return norm_matrix
+
+@traced(rows_arg=0)
+def topsis(decision_matrix, weights, criteria_types, dtype=None, workspace=None):
     """
     Implements the TOPSIS method for multi-criteria decision-making.
     
@@ -9,35 +20,39 @@ def topsis(decision_matrix, weights, criteria_types):
     - decision_matrix (numpy array): The decision matrix (rows = alternatives, cols = criteria).
     - weights (numpy array): Weights for each criterion.
     - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
     
     Returns:
-    - rankings (numpy array): Indices of alternatives sorted by their scores (descending).
+    - rankings (numpy array): Indices of alternatives sorted by their scores (descending, ties keep their original order).
     - scores (numpy array): Closeness scores for each alternative.
     """
-    # Step 1: Normalize the decision matrix
-    norm_matrix = decision_matrix / np.sqrt((decision_matrix ** 2).sum(axis=0))
+    workspace, weighted_matrix, weights = working_copy(decision_matrix, weights, dtype, workspace)
+    benefit = np.array([criterion == 'benefit' for criterion in criteria_types])
+
+    # Step 1: Normalize the decision matrix (in place)
+    topsis_normalize(weighted_matrix)
     
     # Step 2: Apply weights to the normalized matrix
-    weighted_matrix = norm_matrix * weights
+    weighted_matrix *= weights
     
     # Step 3: Determine the ideal (best) and anti-ideal (worst) solutions
-    ideal_best = np.array([
-        weighted_matrix[:, i].max() if criteria_types[i] == 'benefit' else weighted_matrix[:, i].min()
-        for i in range(weighted_matrix.shape[1])
-    ])
-    ideal_worst = np.array([
-        weighted_matrix[:, i].min() if criteria_types[i] == 'benefit' else weighted_matrix[:, i].max()
-        for i in range(weighted_matrix.shape[1])
-    ])
+    column_max = weighted_matrix.max(axis=0)
+    column_min = weighted_matrix.min(axis=0)
+    ideal_best = np.where(benefit, column_max, column_min)
+    ideal_worst = np.where(benefit, column_min, column_max)
     
     # Step 4: Calculate distances to the ideal and anti-ideal solutions
-    dist_best = np.sqrt(((weighted_matrix - ideal_best) ** 2).sum(axis=1))
-    dist_worst = np.sqrt(((weighted_matrix - ideal_worst) ** 2).sum(axis=1))
+    difference = workspace.get('difference', weighted_matrix.shape)
+    np.subtract(weighted_matrix, ideal_best, out=difference)
+    dist_best = np.sqrt(np.einsum('ij,ij->i', difference, difference))
+    np.subtract(weighted_matrix, ideal_worst, out=difference)
+    dist_worst = np.sqrt(np.einsum('ij,ij->i', difference, difference))
     
     # Step 5: Calculate the relative closeness to the ideal solution
     scores = dist_worst / (dist_best + dist_worst)
     
     # Step 6: Rank alternatives based on scores (higher is better)
-    rankings = scores.argsort()[::-1]
+    rankings = np.argsort(-scores, kind='stable')
     
     return rankings, scores
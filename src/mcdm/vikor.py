@@ -1,6 +1,27 @@
 import numpy as np
 
-def vikor(decision_matrix, weights, criteria_types):
+from src.mcdm.workspace import working_copy
+from src.profiling.tracing import traced
+
+def vikor_normalize(norm_matrix, criteria_types):
+    """
+    Normalizes a decision matrix in place: x / max for benefit criteria, min / x for cost criteria
+    (values near zero are set to 1).
+    """
+    for i, criterion in enumerate(criteria_types):
+        column = norm_matrix[:, i]
+        if criterion == "benefit":
+            column /= np.max(column)  # Benefit normalization
+        elif criterion == "cost":
+            epsilon = 1e-10  # Small value to avoid division by zero
+            min_val = max(np.min(column), epsilon)
+            near_zero = column <= epsilon
+            np.divide(min_val, column, out=column)
+            column[near_zero] = 1  # Avoid division by zero
+    return norm_matrix
+
+@traced(rows_arg=0)
+def vikor(decision_matrix, weights, criteria_types, dtype=None, workspace=None):
     """
     Implements the VIKOR method for multi-criteria decision-making.
 
@@ -8,27 +29,23 @@ def vikor(decision_matrix, weights, criteria_types):
     - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
     - weights (numpy array): Weights for each criterion.
     - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
 
     Returns:
-    - rankings (numpy array): Indices of alternatives sorted by their scores (ascending).
+    - rankings (numpy array): Indices of alternatives sorted by their scores (ascending, ties keep their original order).
     - Q (numpy array): Compromise solution scores for each alternative.
     - S (numpy array): Group utility scores for each alternative.
     - R (numpy array): Individual regret scores for each alternative.
     """
-    # Step 1: Normalize the decision matrix
-    norm_matrix = np.zeros_like(decision_matrix, dtype=float)
+    workspace, norm_matrix, weights = working_copy(decision_matrix, weights, dtype, workspace)
 
-    for i, criterion in enumerate(criteria_types):
-        column = decision_matrix[:, i]
-        if criterion == "benefit":
-            norm_matrix[:, i] = column / np.max(column)  # Benefit normalization
-        elif criterion == "cost":
-            epsilon = 1e-10  # Small value to avoid division by zero
-            min_val = max(np.min(column), epsilon)
-            norm_matrix[:, i] = np.where(column <= epsilon, 1, min_val / column)  # Avoid division by zero
+    # Step 1: Normalize the decision matrix (column by column, in place)
+    vikor_normalize(norm_matrix, criteria_types)
 
     # Step 2: Compute the weighted normalized matrix
-    weighted_matrix = norm_matrix * weights
+    weighted_matrix = norm_matrix
+    weighted_matrix *= weights
 
     # Step 3: Calculate S (group utility) and R (individual regret)
     S = np.sum(weighted_matrix, axis=1)  # Sum of weighted normalized values
@@ -43,6 +60,6 @@ def vikor(decision_matrix, weights, criteria_types):
     Q = v * (S - S_min) / (S_max - S_min) + (1 - v) * (R - R_min) / (R_max - R_min)
 
     # Step 6: Rank alternatives by Q (ascending order, higher is better)
-    rankings = Q.argsort()
+    rankings = np.argsort(Q, kind='stable')
 
     return rankings, Q, S, R
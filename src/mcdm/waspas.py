@@ -1,6 +1,22 @@
 import numpy as np
 
-def waspas(decision_matrix, weights, criteria_types, lambda_param=0.5):
+from src.mcdm.workspace import working_copy
+from src.profiling.tracing import traced
+
+def waspas_normalize(norm_matrix, criteria_types):
+    """
+    Normalizes a decision matrix in place: x / max for benefit criteria, min / x for cost criteria.
+    """
+    for i, criterion in enumerate(criteria_types):
+        column = norm_matrix[:, i]
+        if criterion == "cost":
+            np.divide(np.min(column), column, out=column)  # Cost normalization
+        else:
+            column /= np.max(column)  # Benefit normalization
+    return norm_matrix
+
+@traced(rows_arg=0)
+def waspas(decision_matrix, weights, criteria_types, lambda_param=0.5, dtype=None, workspace=None):
     """
     Implements the WASPAS method for multi-criteria decision-making.
 
@@ -9,29 +25,31 @@ def waspas(decision_matrix, weights, criteria_types, lambda_param=0.5):
     - weights (numpy array): Weights for each criterion.
     - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
     - lambda_param (float): Weighting coefficient for WASPAS, typically 0.5.
+    - dtype (numpy dtype, optional): Floating point type to compute in, e.g. np.float32 (default: float64).
+    - workspace (Workspace, optional): Preallocated scratch buffers reused across calls.
 
     Returns:
-    - rankings (numpy array): Indices of alternatives sorted by their scores (descending).
+    - rankings (numpy array): Indices of alternatives sorted by their scores (descending, ties keep their original order).
     - W (numpy array): Combined WASPAS scores for each alternative.
     - Q1 (numpy array): Scores from the weighted sum model.
     - Q2 (numpy array): Scores from the weighted product model.
     """
-    # Step 1: Normalize the decision matrix
-    norm_matrix = decision_matrix / np.max(decision_matrix, axis=0)  # Benefit normalization
-    for i, criterion in enumerate(criteria_types):
-        if criterion == "cost":
-            norm_matrix[:, i] = np.min(decision_matrix[:, i]) / decision_matrix[:, i]  # Cost normalization
+    workspace, norm_matrix, weights = working_copy(decision_matrix, weights, dtype, workspace)
+
+    # Step 1: Normalize the decision matrix (column by column, in place)
+    waspas_normalize(norm_matrix, criteria_types)
 
     # Step 2: Calculate the Weighted Sum Model (WSM) scores (Q1)
-    Q1 = np.sum(norm_matrix * weights, axis=1)
+    Q1 = norm_matrix @ weights
 
-    # Step 3: Calculate the Weighted Product Model (WPM) scores (Q2)
-    Q2 = np.prod(np.power(norm_matrix, weights), axis=1)
+    # Step 3: Calculate the Weighted Product Model (WPM) scores (Q2), raising the matrix in place
+    np.power(norm_matrix, weights, out=norm_matrix)
+    Q2 = np.prod(norm_matrix, axis=1)
 
     # Step 4: Calculate the combined WASPAS score (W)
     W = lambda_param * Q1 + (1 - lambda_param) * Q2
 
     # Step 5: Rank alternatives (higher W is better)
-    rankings = W.argsort()[::-1]
+    rankings = np.argsort(-W, kind='stable')
 
     return rankings, W, Q1, Q2
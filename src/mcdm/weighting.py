@@ -0,0 +1,126 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from src.profiling.tracing import trace_span
+
+# Objective weighting schemes, computed from the decision matrix itself:
+# - entropy: Shannon entropy of every criterion (a criterion whose values are spread more unevenly over
+#   the alternatives discriminates more and gets a larger weight),
+# - critic: CRITIC, the standard deviation of every criterion times its conflict with the others
+#   (sum of 1 - correlation),
+# - std: standard deviation of every criterion.
+WEIGHTING_SCHEMES = ('entropy', 'critic', 'std')
+# Decision matrices whose weights are kept in memory (least recently used ones are dropped)
+MAX_CACHED_MATRICES = 16
+
+# In-memory cache kept alive across Streamlit reruns (the module is imported once per process):
+# fingerprint of (decision matrix, criteria types) -> weights of every scheme.
+_weights_cache = OrderedDict()
+
+
+def matrix_fingerprint(decision_matrix, criteria_types):
+    """
+    Returns a key identifying the content of a decision matrix and its criteria types.
+    """
+    matrix = np.ascontiguousarray(decision_matrix, dtype=float)
+    return (hashlib.blake2b(matrix.tobytes(), digest_size=16).hexdigest(), matrix.shape, tuple(criteria_types))
+
+
+def normalize_criteria(decision_matrix, criteria_types):
+    """
+    Min-max normalizes every criterion to [0, 1] with 1 as the best value (cost criteria are reversed).
+    A constant criterion is all zeros. Missing values are ignored by the column statistics and stay NaN.
+    """
+    matrix = np.asarray(decision_matrix, dtype=float)
+    benefit = np.array([criterion == 'benefit' for criterion in criteria_types])
+    column_min = np.nanmin(matrix, axis=0)
+    column_max = np.nanmax(matrix, axis=0)
+    spread = column_max - column_min
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = np.where(benefit, matrix - column_min, column_max - matrix) / spread
+    return np.where(spread > 0, normalized, 0.0)
+
+
+def _normalize_weights(values):
+    values = np.nan_to_num(np.maximum(values, 0.0))
+    total = values.sum()
+    if total == 0:
+        return np.full(len(values), 1.0 / len(values))  # No criterion discriminates: equal weights
+    return values / total
+
+
+def entropy_weights(normalized):
+    """
+    Shannon entropy weights: w_j proportional to 1 - E_j, with E_j = -sum_i p_ij ln p_ij / ln m
+    and p_ij the share of alternative i in the column sum of criterion j.
+
+    Parameters:
+    - normalized (numpy array): Normalized decision matrix (see `normalize_criteria`).
+
+    Returns:
+    - numpy array: Weights (sum = 1).
+    """
+    n_alternatives = np.sum(~np.isnan(normalized), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = normalized / np.nansum(normalized, axis=0)
+        plogp = np.where(shares > 0, shares * np.log(shares), 0.0)  # 0 ln 0 = 0
+        entropy = -plogp.sum(axis=0) / np.log(n_alternatives)
+    # A constant criterion (no shares) carries no information
+    entropy = np.where(np.nansum(normalized, axis=0) > 0, entropy, 1.0)
+    return _normalize_weights(1.0 - entropy)
+
+
+def std_weights(normalized):
+    """
+    Standard deviation weights: w_j proportional to the standard deviation of the normalized criterion j.
+    """
+    return _normalize_weights(np.nanstd(normalized, axis=0))
+
+
+def critic_weights(normalized):
+    """
+    CRITIC weights: w_j proportional to sigma_j * sum_k (1 - r_jk), the standard deviation of the
+    normalized criterion j times its conflict with the other criteria (r = Pearson correlation).
+    """
+    std = np.nanstd(normalized, axis=0)
+    centered = np.nan_to_num(normalized - np.nanmean(normalized, axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = (centered.T @ centered) / np.sum(~np.isnan(normalized), axis=0) / np.outer(std, std)
+    correlation = np.where(np.outer(std, std) > 0, correlation, 0.0)  # A constant criterion conflicts with none
+    return _normalize_weights(std * np.sum(1.0 - correlation, axis=0))
+
+
+_SCHEME_FUNCTIONS = {'entropy': entropy_weights, 'critic': critic_weights, 'std': std_weights}
+
+
+def objective_weights(decision_matrix, scheme, criteria_types):
+    """
+    Computes the objective weights of a decision matrix, cached per matrix fingerprint.
+
+    The first call for a matrix normalizes it once and computes the weights of every scheme from the
+    normalized matrix; later calls with the same content (any scheme) only hash the matrix.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - scheme (str): 'entropy', 'critic' or 'std'.
+    - criteria_types (list of str): 'benefit' or 'cost' for each criterion.
+
+    Returns:
+    - numpy array: Weights for each criterion (sum = 1).
+    """
+    if scheme not in WEIGHTING_SCHEMES:
+        raise ValueError(f"Unknown weighting scheme '{scheme}'. Use one of: {', '.join(WEIGHTING_SCHEMES)}.")
+    fingerprint = matrix_fingerprint(decision_matrix, criteria_types)
+    cached = _weights_cache.get(fingerprint)
+    if cached is None:
+        with trace_span('mcdm.objective_weights', rows=len(decision_matrix)):
+            normalized = normalize_criteria(decision_matrix, criteria_types)
+            cached = {name: function(normalized) for name, function in _SCHEME_FUNCTIONS.items()}
+        _weights_cache[fingerprint] = cached
+        if len(_weights_cache) > MAX_CACHED_MATRICES:
+            _weights_cache.popitem(last=False)
+    else:
+        _weights_cache.move_to_end(fingerprint)
+    return cached[scheme].copy()
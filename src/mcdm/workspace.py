@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class Workspace:
+    """
+    Preallocated scratch arrays shared by the MCDM methods.
+
+    Every method copies the decision matrix into a workspace buffer once and then normalizes,
+    weights and measures distances in place (NumPy `out=` operations), instead of creating a new
+    full-size temporary at every step. Buffers are kept between calls and only grow, so scoring many
+    scenarios or rolling windows with one workspace allocates the scratch memory once.
+
+    Note that arrays returned by a method (e.g. TAXONOMY's normalized matrix) may be views of a
+    workspace buffer and are overwritten by the next call using the same workspace.
+    """
+
+    def __init__(self, dtype=np.float32):
+        """
+        Parameters:
+        - dtype (numpy dtype): Floating point type of all buffers (np.float32 halves memory use).
+        """
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind != 'f':
+            raise ValueError(f"Workspace dtype must be a floating point type, got {self.dtype}.")
+        self._buffers = {}
+
+    def get(self, name, shape):
+        """
+        Returns an uninitialized array of the given shape backed by the buffer `name`.
+        """
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=self.dtype)
+            self._buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+    @property
+    def nbytes(self):
+        """Total size of all buffers in bytes."""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+
+def working_copy(decision_matrix, weights, dtype=None, workspace=None):
+    """
+    Prepares the arrays an MCDM method works on.
+
+    Parameters:
+    - decision_matrix (numpy array): Decision matrix (rows = alternatives, cols = criteria).
+    - weights (numpy array): Weights for each criterion.
+    - dtype (numpy dtype, optional): Floating point type to compute in (default: float64, or the
+      dtype of `workspace`).
+    - workspace (Workspace, optional): Workspace to reuse; a private one is created when omitted.
+
+    Returns:
+    - workspace (Workspace): The workspace holding the scratch buffers.
+    - matrix (numpy array): Copy of the decision matrix in the workspace, safe to modify in place.
+    - weights (numpy array): Weights converted to the workspace dtype.
+    """
+    if workspace is None:
+        workspace = Workspace(np.float64 if dtype is None else dtype)
+    elif dtype is not None and np.dtype(dtype) != workspace.dtype:
+        raise ValueError(f"dtype {np.dtype(dtype)} does not match the workspace dtype {workspace.dtype}.")
+
+    decision_matrix = np.asarray(decision_matrix)
+    matrix = workspace.get('matrix', decision_matrix.shape)
+    np.copyto(matrix, decision_matrix, casting='same_kind')
+    return workspace, matrix, np.asarray(weights, dtype=workspace.dtype)
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.price_panel import load_price_panel
+from src.data_preprocessing.portfolio_metrics import TRADING_DAYS_PER_YEAR, return_matrix, covariance_matrix
+
+# Rank column of the aggregated rankings file for every aggregation method
+AGGREGATED_RANK_COLUMNS = {
+    "mean_rank_method": "Rank (Mean Rank)",
+    "borda_count_method": "Rank (Borda)",
+    "copeland_method": "Rank (Copeland)",
+    "kemeny_method": "Rank (Kemeny)",
+    "markov_chain_method": "Rank (Markov Chain)",
+}
+
+
+def select_top_k(aggregated_df, aggregation_method, k):
+    """
+    Selects the k best alternatives of an aggregation method from the aggregated rankings.
+
+    Parameters:
+    - aggregated_df (pd.DataFrame): Contents of an aggregated rankings file (e.g. normal_aggregated_rankings.csv).
+    - aggregation_method (str): Key of AGGREGATED_RANK_COLUMNS, e.g. 'mean_rank_method' or 'borda_count_method'.
+    - k (int): Number of alternatives to select.
+
+    Returns:
+    - pd.DataFrame: The k rows with the best final rank of the method, best first.
+    """
+    rank_column = AGGREGATED_RANK_COLUMNS[aggregation_method]
+    return aggregated_df.sort_values(rank_column, kind='stable').head(k)
+
+
+def estimate_return_statistics(stocks, symbols, lookback_days=TRADING_DAYS_PER_YEAR):
+    """
+    Estimates annualized expected returns and the covariance matrix of the given symbols.
+
+    Parameters:
+    - stocks (pd.DataFrame): Cleaned stock data (e.g. sp500_stocks_clean.csv).
+    - symbols (list of str): Symbols of the portfolio candidates.
+    - lookback_days (int): Number of most recent trading days used for the estimates.
+
+    Returns:
+    - expected_returns (numpy array): Annualized mean daily return of every symbol.
+    - covariance (numpy array): Annualized covariance matrix.
+    """
+    stocks = stocks[stocks['Symbol'].isin(symbols)]
+    panel = load_price_panel(stocks=stocks)
+    returns = return_matrix(panel)[-lookback_days:]
+
+    order = pd.Index(panel['symbols']).get_indexer(symbols)
+    if (order < 0).any():
+        missing = [symbol for symbol, position in zip(symbols, order) if position < 0]
+        raise ValueError(f"No price data for: {', '.join(missing)}")
+    returns = returns[:, order]
+
+    expected_returns = np.nanmean(returns, axis=0) * TRADING_DAYS_PER_YEAR
+    return expected_returns, covariance_matrix(returns)
+
+
+def project_to_simplex(v):
+    """
+    Euclidean projection of a vector onto the probability simplex {w >= 0, sum(w) = 1}.
+    """
+    u = np.sort(v)[::-1]
+    cumulative = np.cumsum(u) - 1.0
+    index = np.arange(1, len(v) + 1)
+    rho = np.flatnonzero(u - cumulative / index > 0)[-1]
+    theta = cumulative[rho] / (rho + 1)
+    return np.maximum(v - theta, 0.0)
+
+
+def mean_variance_weights(expected_returns, covariance, risk_aversion, initial_weights=None,
+                          max_iter=5000, tol=1e-10):
+    """
+    Solves the long-only mean-variance problem with accelerated projected gradient.
+
+    Maximizes  mu' w - (risk_aversion / 2) w' Sigma w  subject to  w >= 0, sum(w) = 1.
+
+    Parameters:
+    - expected_returns (numpy array): Expected return of every asset.
+    - covariance (numpy array): Covariance matrix of the assets.
+    - risk_aversion (float): Risk-aversion coefficient (0 = maximize expected return).
+    - initial_weights (numpy array, optional): Warm start, e.g. the solution for a nearby risk aversion.
+    - max_iter (int): Maximum number of iterations.
+    - tol (float): Stop when the weights move less than this (max-norm) between iterations.
+
+    Returns:
+    - weights (numpy array): Optimal portfolio weights.
+    - n_iter (int): Number of iterations used.
+    """
+    n_assets = len(expected_returns)
+    weights = np.full(n_assets, 1.0 / n_assets) if initial_weights is None else project_to_simplex(initial_weights)
+
+    # Step size from the Lipschitz constant of the gradient
+    lipschitz = max(risk_aversion * np.linalg.eigvalsh(covariance)[-1], 1e-12)
+    if risk_aversion == 0:
+        lipschitz = 1.0 / max(np.ptp(expected_returns), 1e-12)
+
+    momentum_point, t = weights.copy(), 1.0
+    for n_iter in range(1, max_iter + 1):
+        gradient = risk_aversion * (covariance @ momentum_point) - expected_returns
+        new_weights = project_to_simplex(momentum_point - gradient / lipschitz)
+        new_t = (1.0 + np.sqrt(1.0 + 4.0 * t * t)) / 2.0
+        momentum_point = new_weights + ((t - 1.0) / new_t) * (new_weights - weights)
+        converged = np.max(np.abs(new_weights - weights)) < tol
+        weights, t = new_weights, new_t
+        if converged:
+            break
+    return weights, n_iter
+
+
+def risk_parity_weights(covariance, initial_weights=None, max_iter=1000, tol=1e-10):
+    """
+    Computes long-only equal-risk-contribution weights with cyclical coordinate descent.
+
+    Solves  min 0.5 x' Sigma x - sum(log x) / n  (x > 0); each coordinate update is the positive root
+    of a quadratic, and the normalized solution gives every asset the same risk contribution.
+
+    Parameters:
+    - covariance (numpy array): Covariance matrix of the assets.
+    - initial_weights (numpy array, optional): Warm start.
+    - max_iter (int): Maximum number of sweeps over the assets.
+    - tol (float): Stop when the normalized weights move less than this (max-norm) in a sweep.
+
+    Returns:
+    - weights (numpy array): Risk parity weights (sum = 1).
+    - n_iter (int): Number of sweeps used.
+    """
+    n_assets = covariance.shape[0]
+    budget = 1.0 / n_assets
+    variances = np.diag(covariance)
+    if initial_weights is None:
+        x = 1.0 / np.sqrt(variances)
+    else:
+        x = np.maximum(np.asarray(initial_weights, dtype=float), 1e-12)
+    # Rescale so the warm start sits at the optimum's scale (x' Sigma x = 1)
+    x = x / np.sqrt(x @ covariance @ x)
+
+    previous = x / x.sum()
+    for n_iter in range(1, max_iter + 1):
+        sigma_x = covariance @ x
+        for i in range(n_assets):
+            others = sigma_x[i] - variances[i] * x[i]
+            new_xi = (-others + np.sqrt(others * others + 4.0 * variances[i] * budget)) / (2.0 * variances[i])
+            sigma_x += covariance[:, i] * (new_xi - x[i])
+            x[i] = new_xi
+        weights = x / x.sum()
+        converged = np.max(np.abs(weights - previous)) < tol
+        previous = weights
+        if converged:
+            break
+    return previous, n_iter
+
+
+def efficient_frontier(expected_returns, covariance, risk_aversions, initial_weights=None):
+    """
+    Computes long-only mean-variance portfolios for a sweep of risk aversions.
+
+    The sweep runs from the highest to the lowest risk aversion and warm-starts every solve
+    from the previous solution, so neighbouring points need only a few iterations.
+
+    Parameters:
+    - expected_returns (numpy array): Expected return of every asset.
+    - covariance (numpy array): Covariance matrix of the assets.
+    - risk_aversions (array-like): Risk-aversion coefficients of the frontier points.
+    - initial_weights (numpy array, optional): Warm start of the first solve.
+
+    Returns:
+    - frontier (pd.DataFrame): Risk Aversion, Expected Return, Volatility and Iterations of every point.
+    - weights (numpy array): (points x assets) matrix of portfolio weights, in the order of `frontier`.
+    """
+    risk_aversions = np.sort(np.asarray(risk_aversions, dtype=float))[::-1]
+    weights = np.empty((len(risk_aversions), len(expected_returns)))
+    iterations = np.empty(len(risk_aversions), dtype=int)
+
+    current = initial_weights
+    for p, risk_aversion in enumerate(risk_aversions):
+        current, iterations[p] = mean_variance_weights(expected_returns, covariance, risk_aversion, current)
+        weights[p] = current
+
+    frontier = pd.DataFrame({
+        'Risk Aversion': risk_aversions,
+        'Expected Return': weights @ expected_returns,
+        'Volatility': np.sqrt(np.einsum('pi,ij,pj->p', weights, covariance, weights)),
+        'Iterations': iterations,
+    })
+    return frontier, weights
+
+
+def pad_weights(weights, n_assets):
+    """
+    Extends a weight vector of the top-k assets to the top-(k + j) assets (new assets get zero weight),
+    for warm-starting a solve after k was increased.
+    """
+    padded = np.zeros(n_assets)
+    kept = min(len(weights), n_assets)
+    padded[:kept] = weights[:kept]
+    total = padded.sum()
+    return padded / total if total > 0 else np.full(n_assets, 1.0 / n_assets)
@@ -0,0 +1,270 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+class TraceSession:
+    """
+    Tracing settings and recorded spans of one user session (e.g. one Streamlit browser session).
+
+    Each session is switched on and off on its own, so one user enabling tracing does not trace (or
+    slow down) the work of the other sessions served by the same process.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.spans = []  # Completed spans, in completion order
+        self.stack = []  # Open spans, innermost last
+        self.origin = time.perf_counter()
+
+
+# Session of the current context, set by `configure_tracing` (None: tracing off). A context variable
+# rather than a module global, so that concurrent sessions (threads) each see their own session.
+_session = contextvars.ContextVar('trace_session', default=None)
+# tracemalloc is process-wide: it runs while at least one live session tracks memory
+_memory_sessions = weakref.WeakSet()
+_memory_lock = threading.Lock()
+_tracemalloc = {'started': False}
+
+
+def configure_tracing(enabled=True, memory=False, session=None):
+    """
+    Turns tracing on or off for a session and makes it the session of the current context.
+
+    Parameters:
+    - enabled (bool): Record spans. When False, traced functions run with a single flag check of overhead.
+    - memory (bool): Also record the peak traced memory of every span with tracemalloc. This slows down
+      allocation-heavy code noticeably, so it is off by default. tracemalloc measures the whole process,
+      so sessions tracking memory at the same time see each other's allocations.
+    - session (TraceSession, optional): Session to configure, e.g. one kept in `st.session_state`
+      (default: the session of the current context, or a new one).
+
+    Returns:
+    - TraceSession: The configured session.
+    """
+    if session is None:
+        session = _session.get() or TraceSession()
+    session.enabled = enabled
+    session.memory = memory
+    _session.set(session)
+
+    with _memory_lock:
+        if memory:
+            _memory_sessions.add(session)
+        else:
+            _memory_sessions.discard(session)
+        if len(_memory_sessions) > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc['started'] = True
+        elif len(_memory_sessions) == 0 and _tracemalloc['started']:
+            tracemalloc.stop()
+            _tracemalloc['started'] = False
+    return session
+
+
+def reset_trace():
+    """Starts a new trace for the current session, discarding the recorded spans."""
+    session = _session.get()
+    if session is not None:
+        session.spans = []
+        session.stack = []
+        session.origin = time.perf_counter()
+
+
+def _row_count(value):
+    shape = np.shape(value) if hasattr(value, 'shape') or isinstance(value, (list, tuple)) else ()
+    return int(shape[0]) if len(shape) > 0 else None
+
+
+@contextmanager
+def trace_span(name, rows=None, **attributes):
+    """
+    Records a span around a block of code: wall time, CPU time, peak memory (when enabled) and rows.
+
+    The yielded dict may be updated inside the block, e.g. `span['rows'] = len(data)`.
+
+    Parameters:
+    - name (str): Name of the span (e.g. the stage or function name).
+    - rows (int, optional): Number of rows processed.
+    - attributes: Extra values stored with the span.
+    """
+    state = _session.get()
+    if state is None or not state.enabled:
+        yield {}
+        return
+
+    memory = state.memory and tracemalloc.is_tracing()
+    span = {
+        'name': name,
+        'depth': len(state.stack),
+        'parent': state.stack[-1]['name'] if state.stack else None,
+        'thread': threading.get_ident(),
+        'rows': rows,
+        'attributes': attributes,
+    }
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if state.stack:
+            # Keep the peak reached so far by the parent before resetting it for this span
+            parent = state.stack[-1]
+            parent['_peak'] = max(parent.get('_peak', 0), peak)
+        span['_start_memory'] = current
+        span['_peak'] = current
+        tracemalloc.reset_peak()
+
+    state.stack.append(span)
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    try:
+        yield span
+    finally:
+        span['wall_time'] = time.perf_counter() - start_wall
+        span['cpu_time'] = time.process_time() - start_cpu
+        span['start'] = start_wall - state.origin
+        state.stack.pop()
+        if memory:
+            peak = max(span.pop('_peak'), tracemalloc.get_traced_memory()[1])
+            span['peak_memory'] = peak - span.pop('_start_memory')
+            if state.stack:
+                parent = state.stack[-1]
+                parent['_peak'] = max(parent.get('_peak', 0), peak)
+        else:
+            span['peak_memory'] = None
+        state.spans.append(span)
+
+
+def annotate_span(**values):
+    """
+    Updates the innermost open span of the current session, e.g. `annotate_span(rows=len(data))`.
+    """
+    state = _session.get()
+    if state is not None and state.enabled and state.stack:
+        span = state.stack[-1]
+        for key, value in values.items():
+            if key == 'rows':
+                span['rows'] = value
+            else:
+                span['attributes'][key] = value
+
+
+def traced(name=None, rows_arg=None):
+    """
+    Decorator recording a span around every call of the function.
+
+    Parameters:
+    - name (str, optional): Span name (default: module.function).
+    - rows_arg (int or str, optional): Positional index or keyword name of the argument whose length
+      is recorded as the row count (e.g. 0 for the decision matrix of the MCDM methods).
+    """
+    def decorator(function):
+        span_name = name or f"{function.__module__.split('.')[-1]}.{function.__name__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            session = _session.get()
+            if session is None or not session.enabled:
+                return function(*args, **kwargs)
+            rows = None
+            if isinstance(rows_arg, int) and rows_arg < len(args):
+                rows = _row_count(args[rows_arg])
+            elif isinstance(rows_arg, str) and rows_arg in kwargs:
+                rows = _row_count(kwargs[rows_arg])
+            with trace_span(span_name, rows=rows):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def last_trace():
+    """
+    Returns the spans recorded by the current session since the last `reset_trace`, in completion order.
+    """
+    session = _session.get()
+    spans = session.spans if session is not None else []
+    return [{key: value for key, value in span.items() if not key.startswith('_')} for span in spans]
+
+
+def trace_summary(spans=None):
+    """
+    Summarizes spans by name.
+
+    Returns:
+    - pd.DataFrame: One row per span name with the number of calls, total wall and CPU time (s),
+      largest peak memory (MB), total rows and the share of the traced wall time spent in top-level spans.
+    """
+    if spans is None:
+        spans = last_trace()
+    columns = ['Span', 'Calls', 'Wall Time (s)', 'CPU Time (s)', 'Peak Memory (MB)', 'Rows', 'Share of Run (%)']
+    if not spans:
+        return pd.DataFrame(columns=columns)
+
+    frame = pd.DataFrame(spans)
+    frame['peak_memory'] = pd.to_numeric(frame['peak_memory']) / 1e6
+    frame['rows'] = pd.to_numeric(frame['rows'])
+    top_level_time = frame.loc[frame['depth'] == 0, 'wall_time'].sum()
+    summary = frame.groupby('name', sort=False).agg(
+        calls=('name', 'size'),
+        wall=('wall_time', 'sum'),
+        cpu=('cpu_time', 'sum'),
+        memory=('peak_memory', 'max'),
+        rows=('rows', 'sum'),
+    ).reset_index()
+    summary['share'] = summary['wall'] / top_level_time * 100 if top_level_time > 0 else np.nan
+    summary.columns = columns
+    return summary.sort_values('Wall Time (s)', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def trace_to_json(spans=None):
+    """Serializes spans to a JSON string (a list of span objects)."""
+    if spans is None:
+        spans = last_trace()
+    return json.dumps(spans, default=_json_default, indent=1)
+
+
+def trace_to_chrome(spans=None):
+    """
+    Serializes spans to the Chrome trace event format, viewable in chrome://tracing or Perfetto.
+    """
+    if spans is None:
+        spans = last_trace()
+    events = [{
+        'name': span['name'],
+        'cat': span['parent'] or 'root',
+        'ph': 'X',
+        'ts': span['start'] * 1e6,
+        'dur': span['wall_time'] * 1e6,
+        'pid': os.getpid(),
+        'tid': span['thread'],
+        'args': {
+            'cpu_time_s': span['cpu_time'],
+            'peak_memory_bytes': span['peak_memory'],
+            'rows': span['rows'],
+            **span['attributes'],
+        },
+    } for span in spans]
+    return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, default=_json_default)
+
+
+def export_trace(path, spans=None, trace_format='chrome'):
+    """
+    Writes spans to a file as 'json' (list of spans) or 'chrome' (Chrome trace event format).
+    """
+    content = trace_to_chrome(spans) if trace_format == 'chrome' else trace_to_json(spans)
+    with open(path, 'w') as file:
+        file.write(content)
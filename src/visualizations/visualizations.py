@@ -4,6 +4,8 @@ import pandas as pd
 from math import pi
 from io import BytesIO
 
+from src.profiling.tracing import traced
+
 def plot_mcdm_heatmap(rankings_df, method_names, top_n=10, data_type="Normal"):
     """
     Creates an interactive heatmap comparing rankings across MCDM methods using Plotly.
@@ -79,6 +81,7 @@ def plot_radar_chart(company_name, aggregated_df, data_type="Normal"):
     )
     return fig
 
+@traced()
 def save_plot_to_bytes(fig):
     """
     Saves a Plotly figure to a BytesIO object in PNG format.
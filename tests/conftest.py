@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Adding the project root directory to sys.path, as the app pages do
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
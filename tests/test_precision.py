@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from src.mcdm.batch import MCDM_METHODS, method_scores, rank_all_methods, precision_rank_agreement
+from src.mcdm.workspace import Workspace
+
+CRITERIA_TYPES = ['benefit', 'cost'] * 4
+
+
+@pytest.fixture
+def decision_matrix():
+    return np.random.default_rng(2024).uniform(1.0, 100.0, (200, 8))
+
+
+@pytest.fixture
+def weights():
+    return np.random.default_rng(7).dirichlet(np.ones(8))
+
+
+def assert_scores_close(reduced, reference):
+    """float32 scores agree with the float64 ones up to float32 rounding, relative to the score scale."""
+    scale = np.max(np.abs(reference))
+    np.testing.assert_allclose(reduced, reference, rtol=1e-4, atol=1e-4 * scale)
+
+
+@pytest.mark.parametrize('method_name', list(MCDM_METHODS))
+def test_float32_scores_match_float64(method_name, decision_matrix, weights):
+    reference = method_scores(method_name, decision_matrix, weights, CRITERIA_TYPES)
+    reduced = method_scores(method_name, decision_matrix, weights, CRITERIA_TYPES, dtype=np.float32)
+    assert reduced.dtype == np.float32
+    assert_scores_close(reduced, reference)
+
+
+def test_float32_ranks_match_float64(decision_matrix, weights):
+    agreement = precision_rank_agreement(decision_matrix, weights, CRITERIA_TYPES)
+    assert (agreement['Identical Ranks (%)'] == 100).all()
+    assert (agreement['Max Rank Difference'] == 0).all()
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_reused_workspace_matches_fresh_runs(dtype, decision_matrix, weights):
+    # Matrices of different shapes grow and shrink the views of the shared buffers between calls
+    rng = np.random.default_rng(11)
+    matrices = [decision_matrix, rng.uniform(1.0, 100.0, (50, 8)), rng.uniform(1.0, 100.0, (400, 8)), decision_matrix]
+    workspace = Workspace(dtype)
+    for matrix in matrices:
+        reused = rank_all_methods(matrix, weights, CRITERIA_TYPES, dtype=dtype, workspace=workspace)
+        fresh = rank_all_methods(matrix, weights, CRITERIA_TYPES, dtype=dtype)
+        np.testing.assert_array_equal(reused, fresh)
+        np.testing.assert_array_equal(reused, rank_all_methods(matrix, weights, CRITERIA_TYPES))
+
+
+@pytest.mark.parametrize('method_name', list(MCDM_METHODS))
+def test_reused_workspace_scores(method_name, decision_matrix, weights):
+    workspace = Workspace(np.float32)
+    first = method_scores(method_name, decision_matrix, weights, CRITERIA_TYPES, workspace=workspace).copy()
+    method_scores(method_name, decision_matrix[::-1] * 3.0, weights, CRITERIA_TYPES, workspace=workspace)
+    again = method_scores(method_name, decision_matrix, weights, CRITERIA_TYPES, workspace=workspace)
+    np.testing.assert_array_equal(again, first)
+    assert_scores_close(first, method_scores(method_name, decision_matrix, weights, CRITERIA_TYPES))
+
+
+def test_workspace_rejects_mismatched_dtype(decision_matrix, weights):
+    with pytest.raises(ValueError):
+        method_scores('TOPSIS', decision_matrix, weights, CRITERIA_TYPES, dtype=np.float32,
+                      workspace=Workspace(np.float64))